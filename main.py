@@ -7,93 +7,62 @@ Usage:
     python main.py                    # Process all files in data/raw/
     python main.py --input ./docs     # Process files from custom directory
     python main.py --output ./out     # Output to custom directory
+    python main.py --partition 0/4    # Process one partition of a distributed run
+    python main.py merge --output ./out   # Merge partial outputs
+    python main.py sweep --chunk-configs 500:50,1000:200   # Compare chunk configs
+    python main.py benchmark          # Retrieval benchmark over the FAQ docs
+    python main.py vector-benchmark   # Quantized vector store vs float32
 
 Author: RAG Preprocessor System
 Version: 1.0.0
 """
 
-import json
 import argparse
+import json
+import tempfile
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, Optional
 
+import numpy as np
 from tqdm import tqdm
 
-# Import drivers
-from src.drivers.pdf_driver import process_pdf
-from src.drivers.excel_driver import process_excel
-from src.drivers.markdown_driver import process_markdown
+# Import pipeline API
+from src.pipeline import (
+    Pipeline,
+    PipelineConfig,
+    EMBEDDINGS_FILENAME
+)
 
-# Import utilities
-from src.utils.chunker import create_chunker
-from src.utils.file_detector import (
-    detect_file_type,
-    get_files_from_directory,
-    get_supported_extensions
+from src.distributed import parse_partition, merge_partials
+from src.drivers.json_driver import parse_record_path
+from src.embedding import load_embedder
+from src.sweep import ChunkSweep, parse_chunk_configs
+from src.benchmark import RETRIEVERS, RetrievalBenchmark
+from src.vector_store import (
+    STORE_METHODS, benchmark_vector_store, check_store_config, sample_queries, synthetic_vectors
 )
 
+# Import utilities
+from src.utils.file_detector import get_supported_extensions
+from src.utils.sandbox import DEFAULT_TIMEOUT, DEFAULT_MEMORY_LIMIT_MB
+
 
 # Configuration
 DEFAULT_INPUT_DIR = "./data/raw"
 DEFAULT_OUTPUT_DIR = "./data/processed"
-OUTPUT_FILENAME = "knowledge_base.json"
+BENCHMARK_INPUT_DIR = "./_development_files/docs"
 
 # Chunking configuration
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
 
 
-def get_driver(file_type: str):
-    """
-    Get the appropriate driver function for a file type.
-    """
-    drivers = {
-        'pdf': process_pdf,
-        'excel': process_excel,
-        'markdown': process_markdown,
-    }
-    return drivers.get(file_type)
-
-
-def process_file(file_path: str) -> Dict[str, Any]:
-    """
-    Process a single file using the appropriate driver.
-
-    Args:
-        file_path: Path to the file
-
-    Returns:
-        Processed document dict or None if processing failed
-    """
-    file_type = detect_file_type(file_path)
-
-    if not file_type:
-        print(f"  ⚠️  Unsupported file type: {file_path}")
-        return None
-
-    driver = get_driver(file_type)
-
-    if not driver:
-        print(f"  ⚠️  No driver found for: {file_type}")
-        return None
-
-    try:
-        document = driver(file_path)
-        return document
-    except Exception as e:
-        print(f"  ❌ Error processing {file_path}: {str(e)}")
-        return None
-
-
-def run_pipeline(input_dir: str, output_dir: str, recursive: bool = True) -> Dict[str, Any]:
+def run_pipeline(config: PipelineConfig) -> Dict[str, Any]:
     """
-    Run the complete ETL pipeline.
+    Run the complete ETL pipeline with console progress reporting.
 
     Args:
-        input_dir: Directory containing raw files
-        output_dir: Directory for processed output
-        recursive: Whether to search subdirectories
+        config: Pipeline configuration
 
     Returns:
         Pipeline results summary
@@ -103,113 +72,325 @@ def run_pipeline(input_dir: str, output_dir: str, recursive: bool = True) -> Dic
     print("=" * 60)
 
     # Validate directories
-    input_path = Path(input_dir)
-    output_path = Path(output_dir)
+    input_path = Path(config.input_dir)
 
     if not input_path.exists():
-        print(f"\n❌ Input directory not found: {input_dir}")
-        print(f"   Creating directory: {input_dir}")
+        print(f"\n❌ Input directory not found: {config.input_dir}")
+        print(f"   Creating directory: {config.input_dir}")
         input_path.mkdir(parents=True, exist_ok=True)
         return {"status": "error", "message": "Input directory was empty"}
 
-    output_path.mkdir(parents=True, exist_ok=True)
-
     # Discover files
-    print(f"\n📁 Input Directory:  {input_dir}")
-    print(f"📁 Output Directory: {output_dir}")
+    print(f"\n📁 Input Directory:  {config.input_dir}")
+    print(f"📁 Output Directory: {config.output_dir}")
     print(f"📄 Supported Types:  {', '.join(get_supported_extensions())}")
 
-    files = get_files_from_directory(input_dir, recursive=recursive)
+    pipeline = Pipeline(config)
+    unique_files = pipeline.discover()
 
-    if not files:
-        print(f"\n⚠️  No supported files found in {input_dir}")
+    if not pipeline.files:
+        print(f"\n⚠️  No supported files found in {config.input_dir}")
         return {"status": "warning", "message": "No files to process"}
 
-    print(f"\n📊 Found {len(files)} file(s) to process")
-    print("-" * 60)
+    print(f"\n📊 Found {len(pipeline.files)} file(s) to process")
+
+    duplicate_count = len(pipeline.files) - len(unique_files)
+    if duplicate_count:
+        print(f"🔁 Skipping {duplicate_count} duplicate file(s)")
 
-    # Initialize chunker
-    chunker = create_chunker(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    server = pipeline.start_metrics_server()
+    if server:
+        print(f"📈 Metrics at http://127.0.0.1:{server.port}/metrics")
+
+    print("-" * 60)
 
     # Process files with progress bar
-    all_chunks = []
-    processed_count = 0
-    error_count = 0
-    file_summaries = []
-
-    for file_path in tqdm(files, desc="Processing files", unit="file"):
-        filename = Path(file_path).name
-        tqdm.write(f"  📄 Processing: {filename}")
-
-        document = process_file(file_path)
-
-        if document:
-            # Chunk the document
-            chunks = chunker.chunk_document(document)
-            all_chunks.extend(chunks)
-
-            file_summaries.append({
-                "filename": filename,
-                "file_type": document.get("file_type", "unknown"),
-                "chunks_created": len(chunks),
-                "status": "success"
-            })
-            processed_count += 1
-            tqdm.write(f"      ✅ Created {len(chunks)} chunks")
-        else:
-            file_summaries.append({
-                "filename": filename,
-                "status": "error"
-            })
-            error_count += 1
+    results = []
+
+    try:
+        for result in tqdm(pipeline.process_files(), total=len(unique_files), desc="Processing files", unit="file"):
+            results.append(result)
+            tqdm.write(f"  📄 Processed: {result['filename']}")
+
+            if result.get("resumed"):
+                tqdm.write(f"      ♻️  Resumed from journal ({len(result['chunks'])} chunks)")
+            elif result["status"] == "success":
+                tqdm.write(f"      ✅ Created {len(result['chunks'])} chunks")
+                if result.get("warning"):
+                    tqdm.write(f"      ⚠️  {result['warning']}")
+            else:
+                tqdm.write(f"  ❌ Error processing {result['file_path']}: {result['error']}")
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        return {"status": "error", "message": str(e)}
+    finally:
+        if server:
+            server.stop()
 
     # Build output
     print("\n" + "-" * 60)
     print("📦 Building knowledge base...")
 
-    knowledge_base = {
-        "metadata": {
-            "created_at": datetime.now().isoformat(),
-            "pipeline_version": "1.0.0",
-            "source_directory": str(input_dir),
-            "chunk_config": {
-                "chunk_size": CHUNK_SIZE,
-                "chunk_overlap": CHUNK_OVERLAP
-            },
-            "statistics": {
-                "total_files_found": len(files),
-                "files_processed": processed_count,
-                "files_errored": error_count,
-                "total_chunks": len(all_chunks)
-            },
-            "file_summaries": file_summaries
-        },
-        "chunks": all_chunks
-    }
-
-    # Save output
-    output_file = output_path / OUTPUT_FILENAME
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(knowledge_base, f, indent=2, ensure_ascii=False)
+    try:
+        summary = pipeline.write_output(results)
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        return {"status": "error", "message": str(e)}
+    statistics = summary["statistics"]
+    delta = summary["delta"]
+    schedule = summary["schedule"]
+    output_file = Path(summary["output_file"])
 
     # Print summary
     print("\n" + "=" * 60)
     print("✅ PIPELINE COMPLETE")
     print("=" * 60)
     print(f"\n📊 Results Summary:")
-    print(f"   • Files processed:  {processed_count}/{len(files)}")
-    print(f"   • Errors:           {error_count}")
-    print(f"   • Total chunks:     {len(all_chunks)}")
+    print(f"   • Files processed:  {statistics['files_processed']}/{len(unique_files)}")
+    print(f"   • Duplicates:       {statistics['duplicates_skipped']}")
+    print(f"   • Errors:           {statistics['files_errored']}")
+    print(f"   • Total chunks:     {statistics['total_chunks']}")
+    print_filter_stats(statistics)
+    if delta:
+        print(f"   • Delta:            +{delta['added']} -{delta['removed']} ={delta['unchanged']}")
+    print_embedding_stats(summary["embeddings"])
+    print_vector_store_stats(summary["vector_store"])
+    print_sqlite_stats(summary)
+    if schedule["files"]:
+        print(f"   • Extraction time:  {schedule['actual_makespan_seconds']:.2f}s on {schedule['workers']} worker(s) "
+              f"(predicted {schedule['predicted_makespan_seconds']:.2f}s)")
     print(f"\n📁 Output saved to: {output_file}")
     print(f"   File size: {output_file.stat().st_size / 1024:.1f} KB")
+    if config.metrics_textfile:
+        print(f"📈 Metrics written to: {config.metrics_textfile}")
     print("\n" + "=" * 60 + "\n")
 
-    return {
-        "status": "success",
-        "output_file": str(output_file),
-        "files_processed": processed_count,
-        "total_chunks": len(all_chunks)
-    }
+    return summary
+
+
+def print_filter_stats(statistics: Dict[str, Any]) -> None:
+    """
+    Print the low-information chunk filter line, if it changed anything.
+    """
+    merged = statistics.get("chunks_merged", 0)
+    dropped = statistics.get("chunks_dropped", 0)
+    if merged or dropped:
+        print(f"   • Low-info chunks:  {merged} merged, {dropped} dropped")
+
+
+def print_embedding_stats(embeddings: Optional[Dict[str, Any]]) -> None:
+    """
+    Print the embedding stage summary line, if embeddings were written.
+    """
+    if not embeddings:
+        return
+    cache = embeddings["cache"]
+    print(f"   • Embeddings:       {embeddings['chunks']} vectors, {embeddings['embedded']} newly embedded "
+          f"(cache hit rate {cache['hit_rate']:.0%}, {cache['entries']} cached)")
+
+
+def print_vector_store_stats(vector_store: Optional[Dict[str, Any]]) -> None:
+    """
+    Print the quantized vector store summary line, if one was written.
+    """
+    if not vector_store:
+        return
+    print(f"   • Vector store:     {vector_store['method']}, {vector_store['code_bytes'] / 1024 / 1024:.1f} MB of codes "
+          f"({vector_store['float32_bytes'] / max(vector_store['code_bytes'], 1):.0f}x smaller than float32)")
+
+
+def print_sqlite_stats(summary: Dict[str, Any]) -> None:
+    """
+    Print the SQLite upsert summary line, if a database was written.
+    """
+    stats = summary["sqlite"]
+    if not stats:
+        return
+    print(f"   • SQLite:           {stats['files_upserted']} file(s) upserted, {stats['files_unchanged']} unchanged, "
+          f"{stats['files_removed']} removed (+{stats['chunks_inserted']} -{stats['chunks_deleted']} chunks) "
+          f"in {summary['sqlite_db']}")
+
+
+def run_merge(config: PipelineConfig) -> Dict[str, Any]:
+    """
+    Merge the partial outputs of a distributed run into the final knowledge base.
+
+    Args:
+        config: Pipeline configuration (output_dir holds the partials)
+
+    Returns:
+        Pipeline results summary
+    """
+    print("\n" + "=" * 60)
+    print("🔗 RAG PREPROCESSOR - Merge Partial Outputs")
+    print("=" * 60)
+
+    try:
+        knowledge_base = merge_partials(config.output_dir)
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        return {"status": "error", "message": str(e)}
+
+    statistics = knowledge_base["metadata"]["statistics"]
+    print(f"\n📦 Merged {knowledge_base['metadata']['merged_partitions']} partial output(s)")
+
+    summary = Pipeline(config).write_knowledge_base(knowledge_base)
+    delta = summary["delta"]
+
+    print(f"\n📊 Results Summary:")
+    print(f"   • Files processed:  {statistics['files_processed']}")
+    print(f"   • Errors:           {statistics['files_errored']}")
+    print(f"   • Total chunks:     {statistics['total_chunks']}")
+    print_filter_stats(statistics)
+    print(f"   • Delta:            +{delta['added']} -{delta['removed']} ={delta['unchanged']}")
+    print_embedding_stats(summary["embeddings"])
+    print_vector_store_stats(summary["vector_store"])
+    print_sqlite_stats(summary)
+    print(f"\n📁 Output saved to: {summary['output_file']}")
+    print("\n" + "=" * 60 + "\n")
+
+    return summary
+
+
+def run_sweep(config: PipelineConfig, chunk_configs: list) -> Dict[str, Any]:
+    """
+    Chunk every file under several configs from a single extraction pass.
+
+    Args:
+        config: Pipeline configuration (chunk settings come from chunk_configs)
+        chunk_configs: (chunk_size, chunk_overlap) pairs to compare
+
+    Returns:
+        Sweep report
+    """
+    print("\n" + "=" * 60)
+    print("🧪 RAG PREPROCESSOR - Chunk Config Sweep")
+    print("=" * 60)
+    print(f"\n📂 Input directory:  {config.input_dir}")
+    print(f"⚙️  Configs:          {', '.join(f'{s}:{o}' for s, o in chunk_configs)}")
+
+    report = ChunkSweep(config, chunk_configs).run()
+    if report["status"] != "success":
+        print(f"\n❌ {report['message']}")
+        return report
+
+    print(f"\n📊 {report['files']} file(s) extracted once in {report['extraction_seconds']:.2f}s, "
+          f"chunked on {report['workers']} worker(s)\n")
+    print(f"   {'size:overlap':>14} {'chunks':>8} {'p50':>6} {'p90':>6} {'max':>6} {'time':>8}")
+    for entry in report["configs"]:
+        sizes = entry["chunk_chars"]
+        print(f"   {entry['chunk_size']:>8}:{entry['chunk_overlap']:<5} {entry['total_chunks']:>8} "
+              f"{sizes['p50']:>6} {sizes['p90']:>6} {sizes['max']:>6} {entry['chunk_seconds']:>7.2f}s")
+    print(f"\n📁 Report saved to: {report['report_file']}")
+    print("\n" + "=" * 60 + "\n")
+
+    return report
+
+
+def run_benchmark(config: PipelineConfig, chunk_configs: list, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Benchmark retrieval quality and latency for each chunk config and retriever.
+
+    Args:
+        config: Pipeline configuration (input_dir holds the FAQ corpus)
+        chunk_configs: (chunk_size, chunk_overlap) pairs to compare
+        args: Parsed CLI arguments (retrievers, embedder, results file, label)
+
+    Returns:
+        Benchmark run record
+    """
+    print("\n" + "=" * 60)
+    print("🎯 RAG PREPROCESSOR - Retrieval Benchmark")
+    print("=" * 60)
+    print(f"\n📂 Corpus:           {config.input_dir}")
+
+    benchmark = RetrievalBenchmark(
+        config,
+        chunk_configs,
+        retrievers=args.retrievers.split(","),
+        embedder=args.embedder,
+        results_file=args.results_file,
+        label=args.label
+    )
+    report = benchmark.run()
+    if report["status"] != "success":
+        print(f"\n❌ {report['message']}")
+        return report
+
+    print(f"❓ Queries:          {report['queries']} FAQ questions")
+    if report["embedder"]:
+        print(f"🧮 Embedder:         {report['embedder']}")
+    print(f"\n   {'size:overlap':>14} {'retriever':<9} {'chunks':>6} {'R@1':>6} {'R@5':>6} {'MRR':>6} "
+          f"{'ΔMRR':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for entry in report["results"]:
+        previous = entry["previous_mrr"]
+        change = f"{entry['mrr'] - previous:+.3f}" if previous is not None else "-"
+        print(f"   {entry['chunk_size']:>8}:{entry['chunk_overlap']:<5} {entry['retriever']:<9} {entry['chunks']:>6} "
+              f"{entry.get('recall@1', 0):>6.3f} {entry.get('recall@5', 0):>6.3f} {entry['mrr']:>6.3f} {change:>7} "
+              f"{entry['latency_ms']['p50']:>8.3f} {entry['latency_ms']['p95']:>8.3f}")
+    print(f"\n📁 Results appended to: {report['results_file']}")
+    print("\n" + "=" * 60 + "\n")
+
+    return report
+
+
+def run_vector_benchmark(config: PipelineConfig, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Compare int8 and PQ vector stores against exact float32 search.
+
+    Args:
+        config: Pipeline configuration (output_dir holds the embeddings and the report)
+        args: Parsed CLI arguments (vectors file or synthetic size, queries, PQ subvectors)
+
+    Returns:
+        Benchmark report
+    """
+    print("\n" + "=" * 60)
+    print("📐 RAG PREPROCESSOR - Vector Store Benchmark")
+    print("=" * 60)
+
+    output_path = Path(config.output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        if args.synthetic:
+            vectors_file = Path(work_dir) / "synthetic.npy"
+            np.save(vectors_file, synthetic_vectors(args.synthetic))
+            source = f"{args.synthetic} synthetic vectors"
+        else:
+            vectors_file = Path(args.vectors_file or output_path / EMBEDDINGS_FILENAME)
+            if not vectors_file.exists():
+                message = f"Embeddings not found: {vectors_file} (run with --embedder, or use --synthetic N)"
+                print(f"\n❌ {message}")
+                return {"status": "error", "message": message}
+            source = str(vectors_file)
+
+        vectors = np.load(vectors_file, mmap_mode='r')
+        print(f"\n📂 Vectors:          {source} ({vectors.shape[0]} x {vectors.shape[1]})")
+        try:
+            check_store_config("pq", vectors.shape[1], args.pq_subvectors)
+        except ValueError as e:
+            print(f"\n❌ {e}")
+            return {"status": "error", "message": str(e)}
+        queries = sample_queries(vectors, args.queries)
+        results = benchmark_vector_store(str(vectors_file), queries, work_dir, subvectors=args.pq_subvectors)
+
+    recall_key = next(key for key in results[0] if key.startswith("recall@"))
+    print(f"❓ Queries:          {len(queries)}\n")
+    print(f"   {'store':<14} {'memory MB':>10} {'build s':>8} {'QPS':>8} {recall_key:>10}")
+    for entry in results:
+        name = entry["method"] + (" +rerank" if entry["rerank"] else "")
+        print(f"   {name:<14} {entry['memory_bytes'] / 1024 / 1024:>10.1f} {entry['build_seconds']:>8.2f} "
+              f"{entry['qps']:>8.1f} {entry[recall_key]:>10.3f}")
+
+    report = {"status": "success", "vectors": source, "queries": len(queries), "results": results}
+    report_file = output_path / "vector_benchmark.json"
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📁 Report saved to: {report_file}")
+    print("\n" + "=" * 60 + "\n")
+
+    return report
 
 
 def main():
@@ -225,14 +406,39 @@ Examples:
   python main.py --input ./documents       Process from custom directory
   python main.py --output ./processed      Output to custom directory
   python main.py --no-recursive            Don't search subdirectories
+  python main.py --isolate --timeout 120   Sandbox each file with a 2 minute limit
+  python main.py --shards 8                Write 8 JSONL shards plus an index
+  python main.py --sqlite ./kb.sqlite      Also upsert into a searchable SQLite database
+  python main.py --partition 2/4 -o ./out  Process partition 2 of 4 (partial output)
+  python main.py merge -o ./out            Merge partial outputs into the knowledge base
+  python main.py sweep --chunk-configs 500:50,1000:200
+                                           Compare chunk configs from one extraction pass
+  python main.py benchmark --chunk-configs 500:50,1000:200 --label "new splitter"
+                                           Score retrieval on the FAQ docs, tracked over runs
+  python main.py --embedder hashing --vector-store pq
+                                           Also write PQ codes for memory-mapped search
+  python main.py vector-benchmark --synthetic 1000000
+                                           Memory, QPS and recall of int8/PQ vs float32
+  python main.py --resume                  Continue a run that crashed part-way
         """
     )
 
+    parser.add_argument(
+        "command",
+        nargs="?",
+        default="run",
+        choices=["run", "merge", "sweep", "benchmark", "vector-benchmark"],
+        help="'run' processes files (default); 'merge' combines partial outputs; "
+             "'sweep' compares chunk configs; 'benchmark' scores retrieval; "
+             "'vector-benchmark' compares quantized vector stores"
+    )
+
     parser.add_argument(
         "--input", "-i",
         type=str,
-        default=DEFAULT_INPUT_DIR,
-        help=f"Input directory containing raw files (default: {DEFAULT_INPUT_DIR})"
+        default=None,
+        help=f"Input directory containing raw files (default: {DEFAULT_INPUT_DIR}, "
+             f"or {BENCHMARK_INPUT_DIR} for benchmark)"
     )
 
     parser.add_argument(
@@ -262,20 +468,287 @@ Examples:
         help=f"Overlap between chunks (default: {CHUNK_OVERLAP})"
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "--isolate",
+        action="store_true",
+        help="Run each extraction in an isolated worker process with time/memory limits"
+    )
 
-    # Update global config if custom values provided
-    global CHUNK_SIZE, CHUNK_OVERLAP
-    CHUNK_SIZE = args.chunk_size
-    CHUNK_OVERLAP = args.chunk_overlap
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help=f"Per-file time limit in seconds with --isolate (default: {DEFAULT_TIMEOUT})"
+    )
 
-    # Run pipeline
-    result = run_pipeline(
-        input_dir=args.input,
+    parser.add_argument(
+        "--memory-limit",
+        type=int,
+        default=DEFAULT_MEMORY_LIMIT_MB,
+        help=f"Per-file memory limit in MB with --isolate (default: {DEFAULT_MEMORY_LIMIT_MB})"
+    )
+
+    parser.add_argument(
+        "--low-info",
+        choices=["merge", "drop", "keep"],
+        default="merge",
+        help="Low-information chunks (page markers, table rules, near-empty text): merge into a "
+             "neighbour, drop, or keep (default: merge)"
+    )
+
+    parser.add_argument(
+        "--keep-boilerplate",
+        action="store_true",
+        help="Keep HTML blocks repeated across pages (site header, menus, footer)"
+    )
+
+    parser.add_argument(
+        "--json-path",
+        action="append",
+        default=None,
+        metavar="SPEC",
+        help="Record spec for JSON/JSONL files, e.g. faqs[].question/answer (repeatable)"
+    )
+
+    parser.add_argument(
+        "--chunk-configs",
+        type=str,
+        default=None,
+        metavar="S:O,...",
+        help="Chunk size:overlap pairs for sweep/benchmark, e.g. 500:50,1000:200"
+    )
+
+    parser.add_argument(
+        "--retrievers",
+        type=str,
+        default=",".join(RETRIEVERS),
+        help=f"Retrievers to benchmark (default: {','.join(RETRIEVERS)})"
+    )
+
+    parser.add_argument(
+        "--results-file",
+        type=str,
+        default=None,
+        help="Benchmark results file to append to (default: <output>/benchmark_results.jsonl)"
+    )
+
+    parser.add_argument(
+        "--label",
+        type=str,
+        default=None,
+        help="Label recorded with the benchmark run, e.g. the change being measured"
+    )
+
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Hold chunks as offsets into one copy of each document (less memory, same output)"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Extract files in parallel on N workers, longest predicted first (default: 1)"
+    )
+
+    parser.add_argument(
+        "--chunk-workers",
+        type=int,
+        default=1,
+        help="Split a single huge document text on N processes; chunks are identical "
+             "to serial splitting (default: 1, ignored with --isolate)"
+    )
+
+    parser.add_argument(
+        "--keep-duplicates",
+        action="store_true",
+        help="Process byte-identical files separately instead of as aliases"
+    )
+
+    parser.add_argument(
+        "--previous",
+        type=str,
+        default=None,
+        help="Previous knowledge base to diff chunk ids against (default: existing output)"
+    )
+
+    parser.add_argument(
+        "--embedder",
+        type=str,
+        default=None,
+        metavar="SPEC",
+        help="Embed chunks after writing: 'hashing[:dim]' or 'module:attribute'"
+    )
+
+    parser.add_argument(
+        "--embedding-cache",
+        type=str,
+        default=None,
+        help="Embedding cache file (default: <output>/embedding_cache.sqlite)"
+    )
+
+    parser.add_argument(
+        "--embedding-cache-size",
+        type=int,
+        default=1024,
+        metavar="MB",
+        help="Evict least recently used cached vectors beyond this size (default: 1024)"
+    )
+
+    parser.add_argument(
+        "--vector-store",
+        choices=STORE_METHODS,
+        default=None,
+        help="Also write quantized embeddings for memory-mapped search (requires --embedder)"
+    )
+
+    parser.add_argument(
+        "--pq-subvectors",
+        type=int,
+        default=None,
+        help="Product quantization subvectors; must divide the embedding size (default: size / 8)"
+    )
+
+    parser.add_argument(
+        "--vectors-file",
+        type=str,
+        default=None,
+        help="Embeddings (.npy) for vector-benchmark (default: <output>/knowledge_base.embeddings.npy)"
+    )
+
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Benchmark N synthetic clustered vectors instead of the embeddings file"
+    )
+
+    parser.add_argument(
+        "--queries",
+        type=int,
+        default=200,
+        help="Queries for vector-benchmark (default: 200)"
+    )
+
+    parser.add_argument(
+        "--sqlite",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Also upsert the knowledge base into this SQLite database (FTS5-indexed), file by file"
+    )
+
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=0,
+        help="Write N size-balanced JSONL shards plus an index file instead of one JSON file"
+    )
+
+    parser.add_argument(
+        "--partition",
+        type=str,
+        default=None,
+        metavar="K/N",
+        help="Process only hash-partition K of N (0-based) and write a partial output"
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume a failed run from its journal instead of starting over"
+    )
+
+    parser.add_argument(
+        "--no-checkpoint",
+        action="store_true",
+        help="Don't journal completed files (disables --resume for this run)"
+    )
+
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics during the run"
+    )
+
+    parser.add_argument(
+        "--metrics-textfile",
+        type=str,
+        default=None,
+        help="Write Prometheus metrics to this file at the end of the run"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        partition = parse_partition(args.partition) if args.partition else None
+        for spec in args.json_path or []:
+            parse_record_path(spec)
+        if args.embedder:
+            embedder = load_embedder(args.embedder)
+            # Catch a PQ config that doesn't fit the embedding size before any file is processed
+            if args.vector_store and getattr(embedder, "dim", None):
+                check_store_config(args.vector_store, embedder.dim, args.pq_subvectors)
+        if args.command == "sweep" and not args.chunk_configs:
+            raise ValueError("sweep requires --chunk-configs")
+        if args.command in ("sweep", "benchmark"):
+            if partition:
+                raise ValueError(f"{args.command} does not support --partition")
+            chunk_configs = parse_chunk_configs(args.chunk_configs or f"{args.chunk_size}:{args.chunk_overlap}")
+        if args.vector_store and not args.embedder:
+            raise ValueError("--vector-store requires --embedder")
+        for name in args.retrievers.split(","):
+            if name not in RETRIEVERS:
+                raise ValueError(f"Unknown retriever '{name}' (choose from {', '.join(RETRIEVERS)})")
+    except ValueError as e:
+        parser.error(str(e))
+
+    config = PipelineConfig(
+        input_dir=args.input or (BENCHMARK_INPUT_DIR if args.command == "benchmark" else DEFAULT_INPUT_DIR),
         output_dir=args.output,
-        recursive=not args.no_recursive
+        recursive=not args.no_recursive,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        compact=args.compact,
+        json_paths=args.json_path,
+        chunk_filter=None if args.low_info == "keep" else args.low_info,
+        strip_boilerplate=not args.keep_boilerplate,
+        isolate=args.isolate,
+        timeout=args.timeout,
+        memory_limit_mb=args.memory_limit,
+        workers=args.workers,
+        chunk_workers=args.chunk_workers,
+        dedupe=not args.keep_duplicates,
+        previous_file=args.previous,
+        embedder=args.embedder,
+        embedding_cache=args.embedding_cache,
+        embedding_cache_max_bytes=args.embedding_cache_size * 1024 * 1024,
+        vector_store=args.vector_store,
+        pq_subvectors=args.pq_subvectors,
+        num_shards=args.shards,
+        sqlite_db=args.sqlite,
+        partition=partition,
+        checkpoint=not args.no_checkpoint,
+        resume=args.resume,
+        metrics_port=args.metrics_port,
+        metrics_textfile=args.metrics_textfile
     )
 
+    # Run pipeline
+    if args.command == "merge":
+        result = run_merge(config)
+    elif args.command == "sweep":
+        result = run_sweep(config, chunk_configs)
+    elif args.command == "benchmark":
+        result = run_benchmark(config, chunk_configs, args)
+    elif args.command == "vector-benchmark":
+        result = run_vector_benchmark(config, args)
+    else:
+        result = run_pipeline(config)
+
     return 0 if result["status"] == "success" else 1
 
 
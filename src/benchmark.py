@@ -0,0 +1,414 @@
+"""
+RAG Preprocessor - Retrieval Benchmark
+Measures retrieval quality and query latency of the knowledge base.
+
+The evaluation set is built from the FAQ question/answer pairs in the
+corpus (markdown '## Question' sections and JSON records with 'question'
+and 'answer' keys). Each question is a query; a chunk is relevant to it
+when it carries answer content: it contains one of the answer's
+sentences, or its section path names the question and it contains a
+run of the answer's words. Relevance therefore survives any chunk config,
+while a chunk holding only the question heading never counts.
+
+For every chunk config and retriever the benchmark reports recall@k,
+MRR and p50/p95 query latency, and appends the run to a JSONL results
+file so quality and speed can be tracked across changes.
+
+Example:
+    benchmark = RetrievalBenchmark(PipelineConfig(input_dir="_development_files/docs"), [(1000, 200)])
+    report = benchmark.run()
+"""
+
+import json
+import re
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .embedding import TOKEN_PATTERN, embed_chunks, load_embedder
+from .pipeline import PIPELINE_VERSION, PipelineConfig
+from .sweep import ChunkSweep
+from .utils.kb_sqlite import KnowledgeBaseDB
+
+
+RESULTS_FILENAME = "benchmark_results.jsonl"
+
+RETRIEVERS = ("dense", "fts")
+DEFAULT_EMBEDDER = "hashing"
+K_VALUES = (1, 3, 5, 10)
+
+# Answer sentences shorter than this are too generic to mark relevance
+MIN_SENTENCE_CHARS = 40
+
+# Consecutive answer words that mark a chunk under the question's section as answer text
+ANSWER_FRAGMENT_WORDS = 6
+
+QUESTION_HEADING = re.compile(r"^#{2,6}\s+(?:\d+[.)]\s*)?(.+?)\s*$")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def answer_keys(answer: str) -> List[str]:
+    """
+    Get the answer sentences used to recognize relevant chunks.
+    """
+    sentences = [normalize_text(s) for s in SENTENCE_END.split(answer)]
+    keys = [s for s in sentences if len(s) >= MIN_SENTENCE_CHARS]
+    return keys or [normalize_text(answer)]
+
+
+def answer_fragments(answer: str) -> List[str]:
+    """
+    Get every run of ANSWER_FRAGMENT_WORDS consecutive answer words.
+    """
+    words = answer.split()
+    if len(words) <= ANSWER_FRAGMENT_WORDS:
+        return [" ".join(words)]
+    return [" ".join(words[i:i + ANSWER_FRAGMENT_WORDS]) for i in range(len(words) - ANSWER_FRAGMENT_WORDS + 1)]
+
+
+def iter_markdown_faqs(file_path: Path):
+    """
+    Yield (question, answer) pairs from '## Question?' sections of a markdown file.
+    """
+    question, answer = None, []
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            match = QUESTION_HEADING.match(line)
+            if match:
+                if question and answer:
+                    yield question, "\n".join(answer)
+                text = match.group(1)
+                question, answer = (text, []) if text.endswith("?") else (None, [])
+            elif question and line.strip():
+                answer.append(line.strip())
+
+    if question and answer:
+        yield question, "\n".join(answer)
+
+
+def iter_json_faqs(value: Any):
+    """
+    Yield (question, answer) pairs from any objects with 'question' and 'answer' string fields.
+    """
+    if isinstance(value, dict):
+        if isinstance(value.get("question"), str) and isinstance(value.get("answer"), str):
+            yield value["question"], value["answer"]
+            return
+        for item in value.values():
+            yield from iter_json_faqs(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from iter_json_faqs(item)
+
+
+def build_eval_set(docs_dir: str) -> List[Dict[str, Any]]:
+    """
+    Collect FAQ question/answer pairs from markdown and JSON files.
+
+    Questions are de-duplicated, so the same FAQ published as both
+    markdown and JSON is one query with relevant chunks in both files.
+
+    Args:
+        docs_dir: Directory containing the FAQ files (searched recursively)
+
+    Returns:
+        List of dicts with 'question', 'answer', 'keys', 'fragments' and 'source'
+    """
+    queries: Dict[str, Dict[str, Any]] = {}
+
+    for file_path in sorted(Path(docs_dir).rglob("*")):
+        suffix = file_path.suffix.lower()
+        if suffix == ".md":
+            pairs = iter_markdown_faqs(file_path)
+        elif suffix == ".json":
+            with open(file_path, 'r', encoding='utf-8') as f:
+                pairs = list(iter_json_faqs(json.load(f)))
+        else:
+            continue
+
+        for question, answer in pairs:
+            key = normalize_text(question).lower()
+            if key not in queries:
+                queries[key] = {
+                    "question": normalize_text(question),
+                    "answer": answer,
+                    "keys": answer_keys(answer),
+                    "fragments": answer_fragments(answer),
+                    "source": str(file_path)
+                }
+
+    return list(queries.values())
+
+
+def find_relevant(chunks: Sequence[Dict[str, Any]], eval_set: List[Dict[str, Any]]) -> List[Set[int]]:
+    """
+    Get, per query, the positions of chunks that carry its answer: chunks
+    containing one of its answer sentences, and chunks whose section path
+    ('header_path' provenance, as in '[Section: ...]' lines) names the
+    question and that contain a run of its answer words.
+    """
+    contents = [normalize_text(chunk["content"]) for chunk in chunks]
+    paths = [
+        " | ".join(
+            normalize_text(meta["header_path"]).lower()
+            for meta in chunk.get("metadata", {}).get("provenance") or []
+            if meta.get("header_path")
+        )
+        for chunk in chunks
+    ]
+
+    relevant = []
+    for query in eval_set:
+        question = query["question"].lower()
+        relevant.append({
+            i for i, content in enumerate(contents)
+            if any(key in content for key in query["keys"])
+            or (question in paths[i] and any(fragment in content for fragment in query["fragments"]))
+        })
+    return relevant
+
+
+class DenseRetriever:
+    """
+    Brute-force cosine retrieval over chunk embeddings.
+    """
+
+    name = "dense"
+
+    def __init__(self, chunks: Sequence[Dict[str, Any]], embedder):
+        self.embedder = embedder
+        self.matrix, _ = embed_chunks(chunks, embedder)
+
+    def search(self, query: str, k: int) -> List[int]:
+        scores = self.matrix @ np.asarray(self.embedder([query]), dtype=np.float32)[0]
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])].tolist()
+
+
+class FTSRetriever:
+    """
+    BM25 keyword retrieval through the SQLite FTS5 knowledge base.
+    """
+
+    name = "fts"
+
+    def __init__(self, knowledge_base: Dict[str, Any], db_file: str):
+        self.db = KnowledgeBaseDB(db_file)
+        self.db.sync(knowledge_base)
+        self.positions = {chunk["chunk_id"]: i for i, chunk in enumerate(knowledge_base["chunks"])}
+
+    def search(self, query: str, k: int) -> List[int]:
+        # Quote every term so question punctuation is never parsed as FTS5 syntax
+        terms = dict.fromkeys(TOKEN_PATTERN.findall(query.lower()))
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in terms)
+        return [self.positions[hit["chunk_id"]] for hit in self.db.search(match, k)]
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def evaluate(
+    retriever,
+    eval_set: List[Dict[str, Any]],
+    relevant: List[Set[int]],
+    k_values: Sequence[int] = K_VALUES
+) -> Dict[str, Any]:
+    """
+    Run every query against a retriever and score the rankings.
+
+    Recall@k is the share of queries with a relevant chunk in the top k;
+    MRR is the mean reciprocal rank of the first relevant chunk within the
+    top max(k_values). Latency covers the whole search call, including
+    query embedding.
+
+    Returns:
+        Dict of recall@k values, mrr and latency percentiles (ms)
+    """
+    k_max = max(k_values)
+    if eval_set:
+        retriever.search(eval_set[0]["question"], k_max)  # warm-up
+
+    hits = {k: 0 for k in k_values}
+    reciprocal_ranks = []
+    latencies = []
+
+    for query, relevant_positions in zip(eval_set, relevant):
+        started = time.perf_counter()
+        ranked = retriever.search(query["question"], k_max)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        rank = next((i + 1 for i, position in enumerate(ranked) if position in relevant_positions), None)
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+        for k in k_values:
+            if rank and rank <= k:
+                hits[k] += 1
+
+    total = len(eval_set) or 1
+    latency = np.asarray(latencies or [0.0])
+    return {
+        **{f"recall@{k}": round(hits[k] / total, 4) for k in k_values},
+        "mrr": round(sum(reciprocal_ranks) / total, 4),
+        "latency_ms": {
+            "p50": round(float(np.percentile(latency, 50)), 3),
+            "p95": round(float(np.percentile(latency, 95)), 3),
+            "mean": round(float(latency.mean()), 3)
+        }
+    }
+
+
+def git_revision(cwd: Optional[str] = None) -> Optional[str]:
+    """
+    Get the current git commit (short hash), or None outside a repository.
+    """
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=cwd, capture_output=True, text=True, timeout=5, check=True
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def load_results(results_file: str) -> List[Dict[str, Any]]:
+    """
+    Load previous benchmark runs from a results file (oldest first).
+    """
+    path = Path(results_file)
+    if not path.exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class RetrievalBenchmark:
+    """
+    Retrieval benchmark job.
+    - Builds the evaluation set from FAQ pairs in config.input_dir
+    - Runs the pipeline once per chunk config over a shared extraction pass
+    - Scores each (chunk config, retriever) pair: recall@k, MRR, p50/p95 latency
+    - Appends the run to the results file, with the previous run's MRR for comparison
+    """
+
+    def __init__(
+        self,
+        config: PipelineConfig,
+        chunk_configs: List[Tuple[int, int]],
+        retrievers: Sequence[str] = RETRIEVERS,
+        embedder: Optional[str] = None,
+        k_values: Sequence[int] = K_VALUES,
+        results_file: Optional[str] = None,
+        label: Optional[str] = None
+    ):
+        self.config = config
+        self.chunk_configs = chunk_configs
+        self.retrievers = list(retrievers)
+        self.embedder_spec = embedder or DEFAULT_EMBEDDER
+        self.k_values = sorted(k_values)
+        self.results_file = results_file or str(Path(config.output_dir) / RESULTS_FILENAME)
+        self.label = label
+
+        unknown = [name for name in self.retrievers if name not in RETRIEVERS]
+        if unknown:
+            raise ValueError(f"Unknown retriever(s): {', '.join(unknown)} (choose from {', '.join(RETRIEVERS)})")
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run the benchmark and append it to the results file.
+
+        Returns:
+            Benchmark run record (as written), plus 'results_file'
+        """
+        config = self.config
+        if not Path(config.input_dir).exists():
+            return {"status": "error", "message": f"Input directory not found: {config.input_dir}"}
+
+        eval_set = build_eval_set(config.input_dir)
+        if not eval_set:
+            return {"status": "warning", "message": f"No FAQ question/answer pairs found in {config.input_dir}"}
+
+        sweep = ChunkSweep(config, self.chunk_configs)
+        sweep.pipeline.discover()
+        results = sweep.process_files()
+        embedder = load_embedder(self.embedder_spec) if "dense" in self.retrievers else None
+
+        previous = self.previous_mrr(getattr(embedder, "embedder_id", None))
+        entries = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for (chunk_size, chunk_overlap), config_results in results.items():
+                knowledge_base = sweep.config_pipeline(chunk_size, chunk_overlap).build_knowledge_base(config_results)
+                chunks = knowledge_base["chunks"]
+                relevant = find_relevant(chunks, eval_set)
+
+                for name in self.retrievers:
+                    started = time.perf_counter()
+                    if name == "dense":
+                        retriever = DenseRetriever(chunks, embedder)
+                    else:
+                        retriever = FTSRetriever(knowledge_base, str(Path(tmp_dir) / f"{chunk_size}-{chunk_overlap}.sqlite"))
+                    index_seconds = time.perf_counter() - started
+
+                    try:
+                        scores = evaluate(retriever, eval_set, relevant, self.k_values)
+                    finally:
+                        if hasattr(retriever, "close"):
+                            retriever.close()
+
+                    key = (chunk_size, chunk_overlap, name)
+                    entries.append({
+                        "chunk_size": chunk_size,
+                        "chunk_overlap": chunk_overlap,
+                        "retriever": name,
+                        "chunks": len(chunks),
+                        "unanswerable_queries": sum(1 for positions in relevant if not positions),
+                        **scores,
+                        "index_seconds": round(index_seconds, 3),
+                        "previous_mrr": previous.get(key)
+                    })
+
+        record = {
+            "status": "success",
+            "created_at": datetime.now().isoformat(),
+            "label": self.label,
+            "git_revision": git_revision(),
+            "pipeline_version": PIPELINE_VERSION,
+            "source_directory": str(config.input_dir),
+            "embedder": getattr(embedder, "embedder_id", None),
+            "queries": len(eval_set),
+            "extraction_seconds": round(sweep.extraction_seconds, 3),
+            "results": entries
+        }
+
+        results_path = Path(self.results_file)
+        results_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(results_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        return {**record, "results_file": str(results_path)}
+
+    def previous_mrr(self, embedder_id: Optional[str]) -> Dict[Tuple[int, int, str], float]:
+        """
+        Get the most recent recorded MRR per (chunk_size, chunk_overlap, retriever)
+        for the same corpus (and, for dense retrieval, the same embedder).
+        """
+        latest = {}
+        for run in load_results(self.results_file):
+            if run.get("source_directory") != str(self.config.input_dir):
+                continue
+            for entry in run["results"]:
+                if entry["retriever"] == "dense" and run.get("embedder") != embedder_id:
+                    continue
+                latest[(entry["chunk_size"], entry["chunk_overlap"], entry["retriever"])] = entry["mrr"]
+        return latest
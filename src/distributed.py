@@ -0,0 +1,177 @@
+"""
+RAG Preprocessor - Distributed Run Utilities
+Deterministic hash-partitioning of input files and merging of partial outputs.
+
+Each worker runs the pipeline with a partition (index, count): it discovers
+and de-duplicates the full input tree, keeps only the files that hash into
+its partition, and writes a partial knowledge base. merge_partials() then
+combines all partials into one knowledge base in discovery order.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .utils.compact_chunks import json_default
+
+
+PARTIAL_FILENAME_TEMPLATE = "knowledge_base.part-{index:05d}-of-{count:05d}.json"
+PARTIAL_FILENAME_GLOB = "knowledge_base.part-?????-of-?????.json"
+
+
+def parse_partition(spec: str) -> Tuple[int, int]:
+    """
+    Parse a 'k/N' partition spec (k is 0-based).
+
+    Raises:
+        ValueError: If the spec is malformed or k is out of range
+    """
+    try:
+        index_str, count_str = spec.split("/")
+        index, count = int(index_str), int(count_str)
+    except ValueError:
+        raise ValueError(f"Invalid partition '{spec}', expected k/N (e.g. 0/4)")
+
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid partition '{spec}': k must be in [0, N)")
+
+    return index, count
+
+
+def partition_of(file_path: str, input_dir: str, count: int) -> int:
+    """
+    Get the partition a file belongs to.
+
+    The hash uses the path relative to the input directory, so nodes that
+    mount the archive at different locations still agree.
+    """
+    relative = Path(file_path).relative_to(input_dir).as_posix()
+    digest = hashlib.blake2b(relative.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count
+
+
+def partition_files(files: List[str], input_dir: str, index: int, count: int) -> List[str]:
+    """
+    Keep only the files that hash into partition index of count.
+    """
+    return [f for f in files if partition_of(f, input_dir, count) == index]
+
+
+def write_partial(
+    knowledge_base: Dict[str, Any],
+    output_dir: str,
+    partition: Tuple[int, int],
+    file_positions: List[int]
+) -> Path:
+    """
+    Write a partial knowledge base for one partition.
+
+    Args:
+        knowledge_base: Knowledge base dict for this partition's files
+        output_dir: Shared output directory
+        partition: (index, count)
+        file_positions: Global discovery position of each file summary
+
+    Returns:
+        Path to the partial file
+    """
+    index, count = partition
+    knowledge_base["metadata"]["partition"] = {
+        "index": index,
+        "count": count,
+        "file_positions": file_positions
+    }
+
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    partial_file = output_path / PARTIAL_FILENAME_TEMPLATE.format(index=index, count=count)
+
+    with open(partial_file, 'w', encoding='utf-8') as f:
+        json.dump(knowledge_base, f, ensure_ascii=False, default=json_default)
+
+    return partial_file
+
+
+def merge_partials(output_dir: str) -> Dict[str, Any]:
+    """
+    Combine partial knowledge bases into the final knowledge base.
+
+    Files are restored to global discovery order, so the result matches a
+    single-node run over the same input.
+
+    Args:
+        output_dir: Directory containing knowledge_base.part-*.json files
+
+    Returns:
+        Merged knowledge base dict
+
+    Raises:
+        ValueError: If partials are missing, mixed or inconsistent
+    """
+    partial_files = sorted(Path(output_dir).glob(PARTIAL_FILENAME_GLOB))
+    if not partial_files:
+        raise ValueError(f"No partial outputs found in {output_dir}")
+
+    partials = []
+    for partial_file in partial_files:
+        with open(partial_file, 'r', encoding='utf-8') as f:
+            partials.append(json.load(f))
+
+    counts = {p["metadata"]["partition"]["count"] for p in partials}
+    if len(counts) != 1:
+        raise ValueError(f"Partials from different partition counts: {sorted(counts)}")
+
+    count = counts.pop()
+    indices = sorted(p["metadata"]["partition"]["index"] for p in partials)
+    if indices != list(range(count)):
+        missing = sorted(set(range(count)) - set(indices))
+        raise ValueError(f"Missing partials for partitions: {missing}")
+
+    chunk_configs = {json.dumps(p["metadata"]["chunk_config"], sort_keys=True) for p in partials}
+    if len(chunk_configs) != 1:
+        raise ValueError("Partials were produced with different chunk configs")
+
+    # Group chunks by source so whole files can be put back in order
+    files = []
+    for partial in partials:
+        metadata = partial["metadata"]
+        chunks_by_source: Dict[str, List[Dict[str, Any]]] = {}
+        for chunk in partial["chunks"]:
+            chunks_by_source.setdefault(chunk["source"], []).append(chunk)
+
+        for position, summary in zip(metadata["partition"]["file_positions"], metadata["file_summaries"]):
+            files.append((position, summary, chunks_by_source.get(summary["source"], [])))
+
+    files.sort(key=lambda item: item[0])
+
+    all_chunks = []
+    file_summaries = []
+    for _, summary, chunks in files:
+        file_summaries.append(summary)
+        all_chunks.extend(chunks)
+
+    first = partials[0]["metadata"]
+    statistics = {
+        "total_files_found": first["statistics"]["total_files_found"],
+        "files_processed": sum(p["metadata"]["statistics"]["files_processed"] for p in partials),
+        "files_errored": sum(p["metadata"]["statistics"]["files_errored"] for p in partials),
+        "duplicates_skipped": first["statistics"]["duplicates_skipped"],
+        "chunks_merged": sum(p["metadata"]["statistics"].get("chunks_merged", 0) for p in partials),
+        "chunks_dropped": sum(p["metadata"]["statistics"].get("chunks_dropped", 0) for p in partials),
+        "total_chunks": len(all_chunks)
+    }
+
+    return {
+        "metadata": {
+            "created_at": datetime.now().isoformat(),
+            "pipeline_version": first["pipeline_version"],
+            "source_directory": first["source_directory"],
+            "chunk_config": first["chunk_config"],
+            "statistics": statistics,
+            "file_summaries": file_summaries,
+            "merged_partitions": count
+        },
+        "chunks": all_chunks
+    }
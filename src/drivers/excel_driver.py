@@ -4,7 +4,7 @@ Linearizes Excel data into natural language sentences for RAG ingestion.
 """
 
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterator
 from pathlib import Path
 
 
@@ -14,68 +14,98 @@ class ExcelDriver:
     - Uses pandas for Excel parsing
     - Linearizes each row into natural language sentences
     - Uses column headers as context keys
+    - Returns one section per row, tagged with sheet name and row number
     """
 
+    # Common identifier column patterns
+    ID_PATTERNS = ['name', 'id', 'title', 'item', 'product', 'category', 'date', 'period']
+
     def __init__(self, file_path: str):
         self.file_path = Path(file_path)
         self.filename = self.file_path.name
 
+        # Per-column lookups, computed once instead of for every row
+        self._sentence_prefixes: Dict[str, str] = {}
+        self._identifier_columns: Dict[tuple, List[str]] = {}
+
     def extract(self) -> Dict[str, Any]:
         """
         Main extraction method.
         Returns structured document with linearized content and metadata.
         """
-        # Read all sheets from Excel file
-        excel_file = pd.ExcelFile(self.file_path)
-        sheet_names = excel_file.sheet_names
-
-        all_content = []
-        total_rows = 0
-
-        for sheet_name in sheet_names:
-            df = pd.read_excel(excel_file, sheet_name=sheet_name)
-
-            if df.empty:
-                continue
+        document = self.stream()
+        document["sections"] = list(document["sections"])
+        return document
 
-            # Clean column names
-            df.columns = [str(col).strip() for col in df.columns]
-
-            # Linearize the sheet
-            linearized = self._linearize_dataframe(df, sheet_name)
-            if linearized:
-                all_content.append(f"## Sheet: {sheet_name}\n\n{linearized}")
-                total_rows += len(df)
-
-        full_content = "\n\n".join(all_content)
+    def stream(self) -> Dict[str, Any]:
+        """
+        Streaming extraction method.
+        Returns the document with 'sections' as a generator. Metadata is
+        filled in as the generator is consumed.
+        """
+        metadata = {
+            "sheet_count": 0,
+            "sheet_names": [],
+            "total_rows": 0,
+            "extraction_method": "pandas linearization"
+        }
 
         return {
             "source": str(self.file_path),
             "filename": self.filename,
             "file_type": "excel",
-            "content": full_content,
-            "metadata": {
-                "sheet_count": len(sheet_names),
-                "sheet_names": sheet_names,
-                "total_rows": total_rows,
-                "extraction_method": "pandas linearization"
-            }
+            "sections": self.iter_sections(metadata),
+            "metadata": metadata
         }
 
-    def _linearize_dataframe(self, df: pd.DataFrame, sheet_name: str) -> str:
+    def iter_sections(self, metadata: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield row sections one sheet at a time.
+        Only the sheet currently being linearized is held in memory.
+        """
+        # Read sheets lazily from the Excel file
+        with pd.ExcelFile(self.file_path) as excel_file:
+            sheet_names = excel_file.sheet_names
+            metadata["sheet_count"] = len(sheet_names)
+            metadata["sheet_names"] = sheet_names
+
+            for sheet_name in sheet_names:
+                df = pd.read_excel(excel_file, sheet_name=sheet_name)
+
+                if df.empty:
+                    continue
+
+                # Clean column names
+                df.columns = [str(col).strip() for col in df.columns]
+
+                # Linearize the sheet
+                first_row = True
+                for section in self._linearize_dataframe(df, sheet_name):
+                    if first_row:
+                        section["content"] = f"## Sheet: {sheet_name}\n\n" + section["content"]
+                        metadata["total_rows"] += len(df)
+                        first_row = False
+                    yield section
+
+    def _linearize_dataframe(self, df: pd.DataFrame, sheet_name: str) -> Iterator[Dict[str, Any]]:
         """
         Convert each row into a natural language sentence.
         Example: "The Revenue for Q1 was 500k"
+        Yields one section per non-empty row.
         """
-        linearized_rows = []
         columns = df.columns.tolist()
 
         for idx, row in df.iterrows():
             sentences = self._row_to_sentences(row, columns, idx)
             if sentences:
-                linearized_rows.append(sentences)
-
-        return "\n\n".join(linearized_rows)
+                yield {
+                    "content": sentences,
+                    "metadata": {
+                        "sheet_name": sheet_name,
+                        "row_start": idx + 1,
+                        "row_end": idx + 1
+                    }
+                }
 
     def _row_to_sentences(self, row: pd.Series, columns: List[str], row_idx: int) -> str:
         """
@@ -88,17 +118,19 @@ class ExcelDriver:
         primary_key = None
         primary_value = None
 
-        # Common identifier column patterns
-        id_patterns = ['name', 'id', 'title', 'item', 'product', 'category', 'date', 'period']
+        key = tuple(columns)
+        if key not in self._identifier_columns:
+            self._identifier_columns[key] = [
+                col for col in columns
+                if any(pattern in col.lower() for pattern in self.ID_PATTERNS)
+            ]
 
-        for col in columns:
-            col_lower = col.lower()
-            if any(pattern in col_lower for pattern in id_patterns):
-                val = row[col]
-                if pd.notna(val) and str(val).strip():
-                    primary_key = col
-                    primary_value = self._format_value(val)
-                    break
+        for col in self._identifier_columns[key]:
+            val = row[col]
+            if pd.notna(val) and str(val).strip():
+                primary_key = col
+                primary_value = self._format_value(val)
+                break
 
         # If no identifier found, use row number
         if primary_key is None:
@@ -153,6 +185,14 @@ class ExcelDriver:
         """
         Construct a natural language sentence from column and value.
         """
+        if col not in self._sentence_prefixes:
+            self._sentence_prefixes[col] = self._sentence_prefix(col)
+        return self._sentence_prefixes[col] + value
+
+    def _sentence_prefix(self, col: str) -> str:
+        """
+        Get the sentence lead-in for a column, e.g. 'The price is '.
+        """
         # Clean column name for readability
         col_clean = col.replace('_', ' ').replace('-', ' ')
 
@@ -161,30 +201,30 @@ class ExcelDriver:
 
         # Amount/Value patterns
         if any(word in col_lower for word in ['amount', 'total', 'sum', 'revenue', 'cost', 'price', 'value']):
-            return f"The {col_clean} is {value}"
+            return f"The {col_clean} is "
 
         # Count/Quantity patterns
         if any(word in col_lower for word in ['count', 'quantity', 'qty', 'number', 'num']):
-            return f"The {col_clean} is {value}"
+            return f"The {col_clean} is "
 
         # Status patterns
         if any(word in col_lower for word in ['status', 'state', 'condition']):
-            return f"The {col_clean} is {value}"
+            return f"The {col_clean} is "
 
         # Date patterns
         if any(word in col_lower for word in ['date', 'time', 'created', 'updated', 'modified']):
-            return f"The {col_clean} is {value}"
+            return f"The {col_clean} is "
 
         # Percentage patterns
         if any(word in col_lower for word in ['percent', 'rate', 'ratio', '%']):
-            return f"The {col_clean} is {value}"
+            return f"The {col_clean} is "
 
         # Description patterns
         if any(word in col_lower for word in ['description', 'desc', 'note', 'comment', 'remarks']):
-            return f"{col_clean}: {value}"
+            return f"{col_clean}: "
 
         # Default pattern
-        return f"The {col_clean} is {value}"
+        return f"The {col_clean} is "
 
 
 def process_excel(file_path: str) -> Dict[str, Any]:
@@ -193,3 +233,11 @@ def process_excel(file_path: str) -> Dict[str, Any]:
     """
     driver = ExcelDriver(file_path)
     return driver.extract()
+
+
+def stream_excel(file_path: str) -> Dict[str, Any]:
+    """
+    Convenience function to stream an Excel file sheet by sheet.
+    """
+    driver = ExcelDriver(file_path)
+    return driver.stream()
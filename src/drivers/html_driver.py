@@ -0,0 +1,265 @@
+"""
+RAG Preprocessor - HTML Driver
+Streams main content out of HTML pages, dropping template blocks shared across pages.
+"""
+
+import hashlib
+from collections import deque
+from html.parser import HTMLParser
+from typing import Dict, Any, List, Iterator, Iterable, Optional, FrozenSet
+from pathlib import Path
+
+
+# Characters read from disk per parser feed
+READ_BLOCK_SIZE = 64 * 1024
+
+# A block is boilerplate when it appears on at least this share of pages...
+BOILERPLATE_MIN_SHARE = 0.5
+# ...and on at least this many pages
+BOILERPLATE_MIN_PAGES = 2
+
+# Elements whose text never reaches the knowledge base
+SKIP_TAGS = {"script", "style", "noscript", "svg", "template", "iframe", "canvas"}
+
+# Elements that start or end a text block
+BLOCK_TAGS = {
+    "p", "h1", "h2", "h3", "h4", "h5", "h6", "li", "dt", "dd", "td", "th",
+    "blockquote", "pre", "figcaption", "caption", "summary", "address",
+    "div", "section", "article", "header", "footer", "nav", "main", "aside",
+    "form", "ul", "ol", "dl", "table", "tr", "br", "hr", "button", "label"
+}
+
+# Headings that open a new section
+SECTION_HEADINGS = ("h1", "h2", "h3")
+
+
+def hash_block(text: str) -> str:
+    """
+    Hash a text block's whitespace-normalized text (BLAKE2b, 64-bit hex).
+    """
+    return hashlib.blake2b(" ".join(text.split()).encode('utf-8'), digest_size=8).hexdigest()
+
+
+class _BlockParser(HTMLParser):
+    """
+    HTML parser that turns a page into a queue of (tag, text) text blocks.
+    The block tag is the element that opened the block, e.g. 'h2' or 'p'.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = deque()
+        self.title = ""
+        self.description = ""
+        self._text: List[str] = []
+        self._tag = "p"
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "meta":
+            attributes = dict(attrs)
+            if (attributes.get("name") or "").lower() == "description":
+                self.description = (attributes.get("content") or "").strip()
+        elif tag in BLOCK_TAGS:
+            self._flush()
+            self._tag = tag
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in BLOCK_TAGS:
+            self._flush()
+            self._tag = "p"
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._in_title:
+            self.title += data.strip()
+        else:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def _flush(self):
+        text = " ".join("".join(self._text).split())
+        self._text = []
+        if text:
+            self.blocks.append((self._tag, text))
+
+
+def iter_blocks(file_path: str, parser: Optional[_BlockParser] = None) -> Iterator[tuple]:
+    """
+    Stream (tag, text) blocks from an HTML file, feeding the parser block by block.
+    """
+    parser = parser or _BlockParser()
+
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        for data in iter(lambda: f.read(READ_BLOCK_SIZE), ''):
+            parser.feed(data)
+            while parser.blocks:
+                yield parser.blocks.popleft()
+
+    parser.close()
+    while parser.blocks:
+        yield parser.blocks.popleft()
+
+
+def find_boilerplate(
+    file_paths: Iterable[str],
+    min_share: float = BOILERPLATE_MIN_SHARE,
+    min_pages: int = BOILERPLATE_MIN_PAGES
+) -> FrozenSet[str]:
+    """
+    Find text blocks repeated across a batch of pages (header, menus, footer).
+
+    Args:
+        file_paths: HTML files of the batch
+        min_share: Minimum share of pages a block must appear on
+        min_pages: Minimum number of pages a block must appear on
+
+    Returns:
+        Block hashes (hash_block) to strip from every page
+    """
+    page_counts: Dict[str, int] = {}
+    page_total = 0
+
+    for file_path in file_paths:
+        page_total += 1
+        for block_hash in {hash_block(text) for _, text in iter_blocks(file_path)}:
+            page_counts[block_hash] = page_counts.get(block_hash, 0) + 1
+
+    threshold = max(min_pages, min_share * page_total)
+    return frozenset(block_hash for block_hash, count in page_counts.items() if count >= threshold)
+
+
+class HTMLDriver:
+    """
+    HTML processing driver for RAG preprocessing.
+    - Uses the stdlib html.parser, fed incrementally
+    - Drops scripts, styles and other non-content elements
+    - Strips blocks that find_boilerplate() flagged as shared across pages
+    - Returns one section per h1-h3 heading, tagged with its header path
+    """
+
+    def __init__(self, file_path: str, boilerplate: Optional[FrozenSet[str]] = None):
+        self.file_path = Path(file_path)
+        self.filename = self.file_path.name
+        self.boilerplate = boilerplate or frozenset()
+
+    def extract(self) -> Dict[str, Any]:
+        """
+        Main extraction method.
+        Returns structured document with section content and metadata.
+        """
+        document = self.stream()
+        document["sections"] = list(document["sections"])
+        return document
+
+    def stream(self) -> Dict[str, Any]:
+        """
+        Streaming extraction method.
+        Returns the document with 'sections' as a generator. Metadata is
+        filled in as the generator is consumed.
+        """
+        metadata = {
+            "title": "",
+            "description": "",
+            "block_count": 0,
+            "boilerplate_blocks_removed": 0,
+            "extraction_method": "html.parser streaming"
+        }
+
+        return {
+            "source": str(self.file_path),
+            "filename": self.filename,
+            "file_type": "html",
+            "sections": self.iter_sections(metadata),
+            "metadata": metadata
+        }
+
+    def iter_sections(self, metadata: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield sections as headings close them, while the page is still being parsed.
+        """
+        parser = _BlockParser()
+        headers: Dict[str, str] = {}
+        lines: List[str] = []
+
+        for tag, text in iter_blocks(self.file_path, parser):
+            metadata["title"] = metadata["title"] or parser.title
+            metadata["description"] = metadata["description"] or parser.description
+
+            boilerplate = hash_block(text) in self.boilerplate
+            if boilerplate:
+                metadata["boilerplate_blocks_removed"] += 1
+            else:
+                metadata["block_count"] += 1
+
+            if tag in SECTION_HEADINGS:
+                # A boilerplate heading still closes the section above it,
+                # so the blocks below are not filed under the old path
+                section = self._build_section(headers, lines)
+                if section:
+                    yield section
+
+                # Drop same-or-deeper headings, then set this level
+                level = SECTION_HEADINGS.index(tag)
+                headers = {h: v for h, v in headers.items() if SECTION_HEADINGS.index(h) < level}
+                if not boilerplate:
+                    headers[tag] = text
+                lines = []
+                continue
+
+            if not boilerplate:
+                lines.append(text)
+
+        metadata["title"] = metadata["title"] or parser.title
+        metadata["description"] = metadata["description"] or parser.description
+
+        section = self._build_section(headers, lines)
+        if section:
+            yield section
+
+    def _build_section(self, headers: Dict[str, str], lines: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Build a chunker section from the blocks under one heading.
+        """
+        if not lines:
+            return None
+
+        content = "\n".join(lines)
+        header_context = [headers[h] for h in SECTION_HEADINGS if h in headers]
+
+        if header_context:
+            context_str = " > ".join(header_context)
+            return {
+                "content": f"[Section: {context_str}]\n{content}",
+                "metadata": {"header_path": context_str}
+            }
+        return {"content": content, "metadata": {}}
+
+
+def process_html(file_path: str, boilerplate: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+    """
+    Convenience function to process an HTML file.
+    """
+    driver = HTMLDriver(file_path, boilerplate)
+    return driver.extract()
+
+
+def stream_html(file_path: str, boilerplate: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+    """
+    Convenience function to stream an HTML file section by section.
+    """
+    driver = HTMLDriver(file_path, boilerplate)
+    return driver.stream()
@@ -0,0 +1,355 @@
+"""
+RAG Preprocessor - JSON Driver
+Streams records out of JSON and JSONL files as atomic chunker sections.
+"""
+
+import json
+import re
+from typing import Dict, Any, List, Iterator, Optional, Tuple
+from pathlib import Path
+
+
+# Record specs tried when none are configured: '<record path>.<field>/<field>'
+DEFAULT_RECORD_PATHS = (
+    "faqs[].question/answer",
+    "[].question/answer",
+)
+
+# Bytes read from disk per refill of the scanner buffer
+READ_BLOCK_SIZE = 64 * 1024
+
+JSON_WHITESPACE = " \t\n\r"
+
+# A whole string or a bracket; a lone '"' means the string runs past the buffer
+SKIP_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]|"', re.DOTALL)
+
+
+def parse_record_path(spec: str) -> Tuple[List[str], List[str]]:
+    """
+    Parse a record spec such as 'faqs[].question/answer'.
+
+    The part up to the last '[]' is the path to the record array, as dotted
+    object keys and '[]' array steps; the rest names the record fields.
+
+    Args:
+        spec: Record spec string
+
+    Returns:
+        Tuple of (path steps, field names), e.g. (['faqs', '[]'], ['question', 'answer'])
+
+    Raises:
+        ValueError: If the spec has no '[]' array step
+    """
+    cut = spec.rfind("[]")
+    if cut < 0:
+        raise ValueError(f"Invalid JSON record path '{spec}', expected e.g. faqs[].question/answer")
+
+    steps = []
+    for part in spec[:cut + 2].split("."):
+        key = part
+        arrays = 0
+        while key.endswith("[]"):
+            key = key[:-2]
+            arrays += 1
+        if key:
+            steps.append(key)
+        steps.extend(["[]"] * arrays)
+
+    fields = [field for field in spec[cut + 2:].lstrip(".").split("/") if field]
+    return steps, fields
+
+
+class _JsonScanner:
+    """
+    Incremental JSON reader that walks down to record arrays.
+
+    Containers on a record path are entered token by token and records are
+    decoded one at a time with raw_decode. Containers and strings off the
+    path are skipped with a depth- and string-aware scan, without decoding,
+    so only the current value is ever held in memory.
+    """
+
+    def __init__(self, fh):
+        self.fh = fh
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size: int = READ_BLOCK_SIZE) -> bool:
+        if self.eof:
+            return False
+        data = self.fh.read(max(size, READ_BLOCK_SIZE))
+        if not data:
+            self.eof = True
+            return False
+        # Drop consumed text before growing the buffer
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Return the next non-whitespace character without consuming it ('' at EOF).
+        """
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in JSON_WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Malformed JSON: expected '{char}' near offset {self.pos}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """
+        Decode the next complete JSON value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Double the unread text each retry, so a large value costs
+                # O(n) in total rather than one decode per block
+                if self._fill(len(self.buffer) - self.pos):
+                    continue
+                raise ValueError(f"Malformed JSON: {e.msg} near offset {self.pos}")
+
+            # A number at the end of the buffer may continue in the next block
+            if end == len(self.buffer) and self._fill():
+                continue
+
+            self.pos = end
+            return value
+
+    def skip(self) -> None:
+        """
+        Consume the next JSON value without decoding containers or strings.
+        """
+        char = self.peek()
+        if char not in "[{\"":
+            self.value()
+            return
+
+        # Scan position is kept relative to self.pos, which _fill() rebases to 0
+        offset = 0
+        depth = 0
+        while True:
+            match = SKIP_TOKEN.search(self.buffer, self.pos + offset)
+            if not match or match.group() == '"':
+                # Token or string cut off by the end of the buffer: read on,
+                # doubling the unread text so long strings stay linear
+                offset = match.start() - self.pos if match else len(self.buffer) - self.pos
+                if not self._fill(len(self.buffer) - self.pos):
+                    raise ValueError(f"Malformed JSON: unterminated value near offset {self.pos}")
+                continue
+
+            token = match.group()
+            offset = match.end() - self.pos
+            if token in "[{":
+                depth += 1
+            elif token in "]}":
+                depth -= 1
+            if depth == 0:
+                break
+
+        self.pos += offset
+
+    def records(self, candidates: List[Tuple[int, List[str]]]) -> Iterator[Tuple[int, Any]]:
+        """
+        Yield (spec_number, record) for every value reached by a candidate path.
+
+        Args:
+            candidates: (spec_number, remaining path steps) still matching here
+        """
+        done = [number for number, steps in candidates if not steps]
+        if done:
+            yield done[0], self.value()
+            return
+
+        char = self.peek()
+
+        if char == "{" and any(steps[0] != "[]" for _, steps in candidates):
+            self.pos += 1
+            if self.peek() == "}":
+                self.pos += 1
+                return
+            while True:
+                key = self.value()
+                self.expect(":")
+                matching = [(number, steps[1:]) for number, steps in candidates if steps[0] == key]
+                if matching:
+                    yield from self.records(matching)
+                else:
+                    self.skip()
+                if self.peek() == ",":
+                    self.pos += 1
+                    continue
+                self.expect("}")
+                return
+
+        if char == "[" and any(steps[0] == "[]" for _, steps in candidates):
+            self.pos += 1
+            matching = [(number, steps[1:]) for number, steps in candidates if steps[0] == "[]"]
+            if self.peek() == "]":
+                self.pos += 1
+                return
+            while True:
+                yield from self.records(matching)
+                if self.peek() == ",":
+                    self.pos += 1
+                    continue
+                self.expect("]")
+                return
+
+        self.skip()
+
+
+def _select(value: Any, candidates: List[Tuple[int, List[str]]]) -> Iterator[Tuple[int, Any]]:
+    """
+    In-memory counterpart of _JsonScanner.records() for one decoded value.
+    """
+    done = [number for number, steps in candidates if not steps]
+    if done:
+        yield done[0], value
+        return
+
+    if isinstance(value, dict):
+        for key, item in value.items():
+            matching = [(number, steps[1:]) for number, steps in candidates if steps[0] == key]
+            if matching:
+                yield from _select(item, matching)
+    elif isinstance(value, list):
+        matching = [(number, steps[1:]) for number, steps in candidates if steps[0] == "[]"]
+        if matching:
+            for item in value:
+                yield from _select(item, matching)
+
+
+class JSONDriver:
+    """
+    JSON/JSONL processing driver for RAG preprocessing.
+    - Streams records without loading the whole file
+    - Record paths like 'faqs[].question/answer' select records and fields
+    - JSONL files are read as a top-level array of their lines
+    - Returns one atomic section per record, so Q&A pairs are never split
+    """
+
+    def __init__(self, file_path: str, record_paths: Optional[List[str]] = None):
+        self.file_path = Path(file_path)
+        self.filename = self.file_path.name
+        self.record_paths = list(record_paths or DEFAULT_RECORD_PATHS)
+        self.specs = [parse_record_path(spec) for spec in self.record_paths]
+
+    def extract(self) -> Dict[str, Any]:
+        """
+        Main extraction method.
+        Returns structured document with record sections and metadata.
+        """
+        document = self.stream()
+        document["sections"] = list(document["sections"])
+        return document
+
+    def stream(self) -> Dict[str, Any]:
+        """
+        Streaming extraction method.
+        Returns the document with 'sections' as a generator. Metadata is
+        filled in as the generator is consumed.
+        """
+        metadata = {
+            "record_count": 0,
+            "record_paths": [],
+            "extraction_method": "streaming JSON records"
+        }
+
+        return {
+            "source": str(self.file_path),
+            "filename": self.filename,
+            "file_type": "json",
+            "sections": self.iter_sections(metadata),
+            "metadata": metadata
+        }
+
+    def iter_sections(self, metadata: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield one atomic section per record, one record at a time.
+        """
+        candidates = [(number, steps) for number, (steps, _) in enumerate(self.specs)]
+
+        for number, record in self._iter_records(candidates):
+            content = self._record_to_text(record, self.specs[number][1])
+            if not content:
+                continue
+
+            record_path = self.record_paths[number]
+            if record_path not in metadata["record_paths"]:
+                metadata["record_paths"].append(record_path)
+
+            yield {
+                "content": content,
+                "metadata": {"record_path": record_path, "record_index": metadata["record_count"]},
+                "atomic": True
+            }
+            metadata["record_count"] += 1
+
+        if not metadata["record_count"]:
+            metadata["warning"] = f"No JSON records found at {', '.join(self.record_paths)}"
+
+    def _iter_records(self, candidates: List[Tuple[int, List[str]]]) -> Iterator[Tuple[int, Any]]:
+        """
+        Yield (spec_number, record) pairs in file order.
+        """
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            if self.file_path.suffix.lower() in (".jsonl", ".ndjson"):
+                # Each line is an element of an implicit top-level array
+                line_candidates = [(number, steps[1:]) for number, steps in candidates if steps[:1] == ["[]"]]
+                for line in f:
+                    if line.strip():
+                        yield from _select(json.loads(line), line_candidates)
+                return
+
+            yield from _JsonScanner(f).records(candidates)
+
+    def _record_to_text(self, record: Any, fields: List[str]) -> str:
+        """
+        Render a record as 'Field: value' lines.
+        Records without the configured fields fall back to all scalar keys.
+        """
+        if not isinstance(record, dict):
+            return record.strip() if isinstance(record, str) else json.dumps(record, ensure_ascii=False)
+
+        keys = [field for field in fields if field in record] or [
+            key for key, value in record.items() if not isinstance(value, (dict, list))
+        ]
+
+        lines = []
+        for key in keys:
+            value = record[key]
+            if value is None:
+                continue
+            text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+            if text.strip():
+                lines.append(f"{key.replace('_', ' ').capitalize()}: {text.strip()}")
+
+        return "\n".join(lines)
+
+
+def process_json(file_path: str, record_paths: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Convenience function to process a JSON or JSONL file.
+    """
+    driver = JSONDriver(file_path, record_paths)
+    return driver.extract()
+
+
+def stream_json(file_path: str, record_paths: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Convenience function to stream a JSON or JSONL file record by record.
+    """
+    driver = JSONDriver(file_path, record_paths)
+    return driver.stream()
@@ -5,7 +5,7 @@ Parses Markdown files with header-based splitting and custom metadata extraction
 
 import re
 import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterator
 from pathlib import Path
 from langchain_text_splitters import MarkdownHeaderTextSplitter
 
@@ -16,6 +16,7 @@ class MarkdownDriver:
     - Uses langchain MarkdownHeaderTextSplitter for header-based splitting
     - Extracts custom **METADATA:** JSON blocks
     - Splits by # and ### headers
+    - Returns one section per header split, tagged with its header path
     """
 
     # Headers to split on
@@ -37,30 +38,48 @@ class MarkdownDriver:
         Main extraction method.
         Returns structured document with split content and metadata.
         """
+        document = self.stream()
+        document["sections"] = list(document["sections"])
+        return document
+
+    def stream(self) -> Dict[str, Any]:
+        """
+        Streaming extraction method.
+        Returns the document with 'sections' as a generator. Metadata is
+        filled in as the generator is consumed.
+        """
+        metadata = {
+            "custom_metadata": None,
+            "section_count": 0,
+            "extraction_method": "langchain MarkdownHeaderTextSplitter"
+        }
+
+        return {
+            "source": str(self.file_path),
+            "filename": self.filename,
+            "file_type": "markdown",
+            "sections": self.iter_sections(metadata),
+            "metadata": metadata
+        }
+
+    def iter_sections(self, metadata: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield chunker sections one header split at a time.
+        """
         # Read the markdown file
         with open(self.file_path, 'r', encoding='utf-8') as f:
             raw_content = f.read()
 
         # Extract and remove custom metadata block
         custom_metadata, clean_content = self._extract_metadata_block(raw_content)
+        metadata["custom_metadata"] = custom_metadata
 
         # Split by headers using langchain
         header_splits = self._split_by_headers(clean_content)
+        metadata["section_count"] = len(header_splits)
 
-        # Build structured content
-        structured_content = self._build_structured_content(header_splits)
-
-        return {
-            "source": str(self.file_path),
-            "filename": self.filename,
-            "file_type": "markdown",
-            "content": structured_content,
-            "metadata": {
-                "custom_metadata": custom_metadata,
-                "section_count": len(header_splits),
-                "extraction_method": "langchain MarkdownHeaderTextSplitter"
-            }
-        }
+        # Build sections for the chunker
+        yield from self._build_sections(header_splits)
 
     def _extract_metadata_block(self, content: str) -> tuple[Optional[Dict], str]:
         """
@@ -104,14 +123,12 @@ class MarkdownDriver:
 
         return result
 
-    def _build_structured_content(self, splits: List[Dict[str, Any]]) -> str:
+    def _build_sections(self, splits: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
         """
-        Build structured content string from splits.
+        Build chunker sections from splits.
         Preserves header hierarchy information.
         """
-        content_parts = []
-
-        for idx, split in enumerate(splits):
+        for split in splits:
             section_content = split["content"].strip()
             headers = split.get("headers", {})
 
@@ -126,11 +143,12 @@ class MarkdownDriver:
 
             if header_context:
                 context_str = " > ".join(header_context)
-                content_parts.append(f"[Section: {context_str}]\n{section_content}")
+                yield {
+                    "content": f"[Section: {context_str}]\n{section_content}",
+                    "metadata": {"header_path": context_str}
+                }
             else:
-                content_parts.append(section_content)
-
-        return "\n\n---\n\n".join(content_parts)
+                yield {"content": section_content, "metadata": {}}
 
 
 def process_markdown(file_path: str) -> Dict[str, Any]:
@@ -139,3 +157,11 @@ def process_markdown(file_path: str) -> Dict[str, Any]:
     """
     driver = MarkdownDriver(file_path)
     return driver.extract()
+
+
+def stream_markdown(file_path: str) -> Dict[str, Any]:
+    """
+    Convenience function to stream a Markdown file section by section.
+    """
+    driver = MarkdownDriver(file_path)
+    return driver.stream()
@@ -5,7 +5,7 @@ Extracts text and tables from PDF files with header/footer stripping.
 
 import fitz  # PyMuPDF
 import pdfplumber
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 from pathlib import Path
 
 
@@ -14,7 +14,9 @@ class PDFDriver:
     PDF processing driver for RAG preprocessing.
     - Uses PyMuPDF (fitz) for fast text extraction
     - Uses pdfplumber for table extraction (converted to Markdown)
+    - Masks table areas out of the text so each table appears once, in place
     - Strips headers/footers (top/bottom 50px noise zones)
+    - Returns page text and table sections in page order, tagged with the page number
     """
 
     HEADER_FOOTER_MARGIN = 50  # pixels to strip from top/bottom
@@ -28,88 +30,173 @@ class PDFDriver:
         Main extraction method.
         Returns structured document with text content and metadata.
         """
-        text_content = self._extract_text_with_pymupdf()
-        tables_markdown = self._extract_tables_with_pdfplumber()
+        document = self.stream()
+        document["sections"] = list(document["sections"])
+        return document
 
-        # Combine text and tables
-        full_content = text_content
-        if tables_markdown:
-            full_content += "\n\n## Extracted Tables\n\n" + tables_markdown
+    def stream(self) -> Dict[str, Any]:
+        """
+        Streaming extraction method.
+        Returns the document with 'sections' as a generator. Metadata is
+        filled in as the generator is consumed.
+        """
+        metadata = {
+            "page_count": 0,
+            "has_tables": False,
+            "extraction_method": "PyMuPDF + pdfplumber"
+        }
 
         return {
             "source": str(self.file_path),
             "filename": self.filename,
             "file_type": "pdf",
-            "content": full_content,
-            "metadata": {
-                "page_count": self._get_page_count(),
-                "has_tables": bool(tables_markdown),
-                "extraction_method": "PyMuPDF + pdfplumber"
-            }
+            "sections": self.iter_sections(metadata),
+            "metadata": metadata
         }
 
-    def _extract_text_with_pymupdf(self) -> str:
+    def iter_sections(self, metadata: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
         """
-        Extract text using PyMuPDF with header/footer stripping.
+        Yield sections page by page, one at a time.
+
+        Tables found by pdfplumber are masked out of the PyMuPDF text and
+        emitted as Markdown sections at their position on the page, so each
+        table is extracted exactly once.
         """
-        extracted_pages = []
+        with fitz.open(self.file_path) as doc, pdfplumber.open(self.file_path) as pdf:
+            metadata["page_count"] = len(doc)
 
-        with fitz.open(self.file_path) as doc:
             for page_num, page in enumerate(doc):
-                # Get page dimensions
-                page_rect = page.rect
-                page_height = page_rect.height
+                plumber_page = pdf.pages[page_num]
+                tables = self._extract_tables_with_pdfplumber(plumber_page, page_num + 1)
+                plumber_page.close()
 
-                # Define content area (exclude header/footer zones)
-                content_rect = fitz.Rect(
-                    page_rect.x0,
-                    page_rect.y0 + self.HEADER_FOOTER_MARGIN,  # Skip header
-                    page_rect.x1,
-                    page_height - self.HEADER_FOOTER_MARGIN    # Skip footer
-                )
+                if tables:
+                    metadata["has_tables"] = True
 
-                # Extract text only from content area
-                text = page.get_text("text", clip=content_rect)
+                yield from self._page_sections(page, page_num + 1, tables)
 
-                if text.strip():
-                    extracted_pages.append(f"--- Page {page_num + 1} ---\n{text.strip()}")
-
-        return "\n\n".join(extracted_pages)
-
-    def _extract_tables_with_pdfplumber(self) -> str:
+    def _content_rect(self, page) -> "fitz.Rect":
         """
-        Extract tables using pdfplumber and convert to Markdown format.
+        Get the page area between the header and footer noise zones.
         """
-        all_tables_md = []
-
-        with pdfplumber.open(self.file_path) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                # Get page dimensions for header/footer filtering
-                page_height = page.height
-
-                # Define content bounding box (exclude header/footer)
-                content_bbox = (
-                    0,
-                    self.HEADER_FOOTER_MARGIN,
-                    page.width,
-                    page_height - self.HEADER_FOOTER_MARGIN
-                )
-
-                # Crop page to content area
-                cropped_page = page.within_bbox(content_bbox)
-
-                # Extract tables from cropped area
-                tables = cropped_page.extract_tables()
-
-                for table_idx, table in enumerate(tables):
-                    if table and len(table) > 0:
-                        md_table = self._table_to_markdown(table)
-                        if md_table:
-                            all_tables_md.append(
-                                f"### Table {table_idx + 1} (Page {page_num + 1})\n\n{md_table}"
-                            )
+        page_rect = page.rect
+        return fitz.Rect(
+            page_rect.x0,
+            page_rect.y0 + self.HEADER_FOOTER_MARGIN,  # Skip header
+            page_rect.x1,
+            page_rect.height - self.HEADER_FOOTER_MARGIN    # Skip footer
+        )
+
+    def _page_sections(
+        self,
+        page,
+        page_number: int,
+        tables: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Build the sections of one page: text runs interleaved with tables.
+        The first section carries the page marker.
+        """
+        content_rect = self._content_rect(page)
+        text_metadata = {"page_number": page_number}
+
+        if tables:
+            parts = self._extract_text_around_tables(page, content_rect, tables, text_metadata)
+        else:
+            # Extract text only from content area
+            text = page.get_text("text", clip=content_rect).strip()
+            parts = [{"content": text, "metadata": text_metadata}] if text else []
+
+        if parts:
+            parts[0]["content"] = f"--- Page {page_number} ---\n{parts[0]['content']}"
+        return parts
+
+    def _extract_text_around_tables(
+        self,
+        page,
+        content_rect: "fitz.Rect",
+        tables: List[Dict[str, Any]],
+        text_metadata: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract page text with table regions masked out.
 
-        return "\n\n".join(all_tables_md)
+        Text lines are walked in PyMuPDF reading order; the first line that
+        falls inside a table is replaced by that table's section and the
+        table's remaining lines are skipped.
+        """
+        parts = []
+        lines = []
+        emitted = set()
+
+        def flush_text():
+            text = "\n".join(lines).strip()
+            if text:
+                parts.append({"content": text, "metadata": dict(text_metadata)})
+            lines.clear()
+
+        for block in page.get_text("dict", clip=content_rect)["blocks"]:
+            if block["type"] != 0:
+                continue
+
+            for line in block["lines"]:
+                table_pos = self._table_containing(line["bbox"], tables)
+                if table_pos is None:
+                    lines.append("".join(span["text"] for span in line["spans"]))
+                elif table_pos not in emitted:
+                    flush_text()
+                    parts.append(tables[table_pos]["section"])
+                    emitted.add(table_pos)
+
+        flush_text()
+
+        # Tables without any text layer (e.g. drawn as images) go last
+        for table_pos, table in enumerate(tables):
+            if table_pos not in emitted:
+                parts.append(table["section"])
+
+        return parts
+
+    def _table_containing(self, bbox, tables: List[Dict[str, Any]]):
+        """
+        Get the position of the table whose area contains a line's center.
+        """
+        x = (bbox[0] + bbox[2]) / 2
+        y = (bbox[1] + bbox[3]) / 2
+        for table_pos, table in enumerate(tables):
+            x0, top, x1, bottom = table["bbox"]
+            if x0 <= x <= x1 and top <= y <= bottom:
+                return table_pos
+        return None
+
+    def _extract_tables_with_pdfplumber(self, page, page_number: int) -> List[Dict[str, Any]]:
+        """
+        Find tables on a pdfplumber page and convert them to Markdown.
+        Returns dicts with the table 'bbox' and its ready-made 'section'.
+        """
+        # Define content bounding box (exclude header/footer)
+        content_bbox = (
+            0,
+            self.HEADER_FOOTER_MARGIN,
+            page.width,
+            page.height - self.HEADER_FOOTER_MARGIN
+        )
+
+        # Crop page to content area
+        cropped_page = page.within_bbox(content_bbox)
+
+        tables = []
+        for table_idx, table in enumerate(cropped_page.find_tables()):
+            md_table = self._table_to_markdown(table.extract())
+            if md_table:
+                tables.append({
+                    "bbox": table.bbox,
+                    "section": {
+                        "content": f"### Table {table_idx + 1} (Page {page_number})\n\n{md_table}",
+                        "metadata": {"page_number": page_number, "table_index": table_idx + 1}
+                    }
+                })
+        return tables
 
     def _table_to_markdown(self, table: List[List[str]]) -> str:
         """
@@ -150,11 +237,6 @@ class PDFDriver:
 
         return "\n".join(md_lines)
 
-    def _get_page_count(self) -> int:
-        """Get total page count of the PDF."""
-        with fitz.open(self.file_path) as doc:
-            return len(doc)
-
 
 def process_pdf(file_path: str) -> Dict[str, Any]:
     """
@@ -162,3 +244,11 @@ def process_pdf(file_path: str) -> Dict[str, Any]:
     """
     driver = PDFDriver(file_path)
     return driver.extract()
+
+
+def stream_pdf(file_path: str) -> Dict[str, Any]:
+    """
+    Convenience function to stream a PDF file page by page.
+    """
+    driver = PDFDriver(file_path)
+    return driver.stream()
@@ -0,0 +1,164 @@
+"""
+RAG Preprocessor - Embedding Stage
+Embeds knowledge base chunks, reusing cached vectors for unchanged text.
+
+An embedder is any callable that maps a list of texts to a list of
+vectors. Its 'embedder_id' attribute (or the spec it was loaded from)
+keys the cache, so switching models never serves stale vectors.
+
+Example:
+    embedder = load_embedder("hashing:384")
+    with EmbeddingCache("cache.sqlite") as cache:
+        vectors, stats = embed_chunks(chunks, embedder, cache)
+"""
+
+import hashlib
+import importlib
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .utils.embedding_cache import EmbeddingCache
+
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_HASHING_DIM = 384
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """
+    Dependency-free embedder using signed feature hashing of words and bigrams.
+    - Deterministic across runs and machines
+    - L2-normalized float32 vectors, so dot product is cosine similarity
+    Useful for tests, benchmarks and lexical baselines; not a semantic model.
+    """
+
+    def __init__(self, dim: int = DEFAULT_HASHING_DIM):
+        self.dim = dim
+        self.embedder_id = f"hashing-v1-{dim}"
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            tokens = TOKEN_PATTERN.findall(text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+                vectors[row, digest % self.dim] += 1.0 if digest >> 63 else -1.0
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def load_embedder(spec: str) -> Callable[[Sequence[str]], Any]:
+    """
+    Load an embedder from a spec.
+
+    Args:
+        spec: 'hashing' or 'hashing:<dim>' for the built-in embedder, or
+              'package.module:attribute' for a callable (classes are
+              instantiated without arguments)
+
+    Returns:
+        Embedder callable with an 'embedder_id' attribute
+
+    Raises:
+        ValueError: If the spec cannot be resolved
+    """
+    name, _, arg = spec.partition(":")
+
+    if name == "hashing":
+        return HashingEmbedder(int(arg) if arg else DEFAULT_HASHING_DIM)
+
+    if not arg:
+        raise ValueError(f"Invalid embedder '{spec}', expected 'hashing[:dim]' or 'module:attribute'")
+
+    try:
+        embedder = getattr(importlib.import_module(name), arg)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f"Cannot load embedder '{spec}': {e}")
+
+    if isinstance(embedder, type):
+        embedder = embedder()
+    if not getattr(embedder, "embedder_id", None):
+        try:
+            embedder.embedder_id = spec
+        except AttributeError:
+            embedder = _with_id(embedder, spec)
+    return embedder
+
+
+def _with_id(embedder: Callable, embedder_id: str) -> Callable:
+    def embed(texts):
+        return embedder(texts)
+    embed.embedder_id = embedder_id
+    return embed
+
+
+def embed_chunks(
+    chunks: Sequence[Dict[str, Any]],
+    embedder: Callable[[Sequence[str]], Any],
+    cache: Optional[EmbeddingCache] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """
+    Embed chunks in order, embedding each distinct text at most once.
+
+    The cache is consulted in bulk first; only misses reach the embedder,
+    in batches of batch_size, and their vectors are added to the cache.
+
+    Args:
+        chunks: Chunk dicts (or records) with 'content' and 'content_hash'
+        embedder: Embedder callable
+        cache: Optional embedding cache
+        batch_size: Texts per embedder call
+
+    Returns:
+        Tuple of (float32 matrix with one row per chunk, stats dict)
+    """
+    embedder_id = getattr(embedder, "embedder_id", type(embedder).__name__)
+    hashes = [chunk["content_hash"] for chunk in chunks]
+    unique_hashes = list(dict.fromkeys(hashes))
+
+    vectors = cache.get_many(embedder_id, unique_hashes) if cache else {}
+    missing = [h for h in unique_hashes if h not in vectors]
+
+    # Materialize text only for chunks that actually need embedding
+    missing_set = set(missing)
+    texts: Dict[str, str] = {}
+    for chunk in chunks:
+        content_hash = chunk["content_hash"]
+        if content_hash in missing_set and content_hash not in texts:
+            texts[content_hash] = chunk["content"]
+
+    computed: List[Tuple[str, np.ndarray]] = []
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        output = np.asarray(embedder([texts[h] for h in batch]), dtype=np.float32)
+        computed.extend(zip(batch, output))
+
+    vectors.update(computed)
+    if cache and computed:
+        cache.put_many(embedder_id, computed)
+
+    dims = {len(vector) for vector in vectors.values()}
+    if len(dims) > 1:
+        raise ValueError(f"Embedder '{embedder_id}' returned vectors of different sizes: {sorted(dims)}")
+
+    matrix = (
+        np.vstack([vectors[h] for h in hashes]).astype(np.float32, copy=False)
+        if hashes else np.zeros((0, 0), dtype=np.float32)
+    )
+
+    stats = {
+        "embedder": embedder_id,
+        "chunks": len(hashes),
+        "unique_texts": len(unique_hashes),
+        "embedded": len(missing),
+        "cache": cache.stats() if cache else None
+    }
+    return matrix, stats
@@ -0,0 +1,826 @@
+"""
+RAG Preprocessor - Pipeline API
+Importable ETL pipeline: configure with PipelineConfig, drive with Pipeline.
+
+Example:
+    config = PipelineConfig(input_dir="./docs", chunk_size=800)
+    pipeline = Pipeline(config)
+
+    for chunk in pipeline.iter_chunks():
+        ...
+
+    async for chunk in pipeline.aiter_chunks():
+        ...
+
+    summary = pipeline.run()   # writes the knowledge base to output_dir
+
+The pipeline keeps no module-level state and never prints, so several
+pipelines can run concurrently in one long-lived process.
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Iterator, AsyncIterator, Optional
+
+import numpy as np
+
+# Import drivers
+from .drivers.pdf_driver import process_pdf, stream_pdf
+from .drivers.excel_driver import process_excel, stream_excel
+from .drivers.markdown_driver import process_markdown, stream_markdown
+from .drivers.json_driver import process_json, stream_json
+from .drivers.html_driver import process_html, stream_html, find_boilerplate
+from .drivers.tabular_driver import process_tabular, stream_tabular
+
+# Import utilities
+from .utils.chunker import create_chunker
+from .utils.compact_chunks import CompactDocument, is_compact
+from .utils.file_detector import detect_file_type, get_files_from_directory
+from .utils.dedupe import find_duplicates
+from .utils.delta import load_chunk_ids, compute_delta
+from .utils.sharding import SHARD_INDEX_FILENAME, write_shards
+from .utils.kb_index import index_path_for, write_indexed_json, write_offset_index
+from .utils.kb_sqlite import KnowledgeBaseDB
+from .embedding import embed_chunks, load_embedder
+from .vector_store import check_store_config, write_vector_store
+from .distributed import PARTIAL_FILENAME_TEMPLATE, partition_files, write_partial
+from .utils.journal import RunJournal
+from .utils.embedding_cache import DEFAULT_MAX_BYTES, EmbeddingCache
+from .utils.metrics import PipelineMetrics, MetricsServer, classify_error
+from .utils.scheduler import CostModel, describe_file, schedule_lpt, simulate_makespan
+from .utils.sandbox import (
+    DEFAULT_TIMEOUT,
+    DEFAULT_MEMORY_LIMIT_MB,
+    SandboxError,
+    prescan_file,
+    run_isolated
+)
+
+
+PIPELINE_VERSION = "1.0.0"
+
+# Output file names
+OUTPUT_FILENAME = "knowledge_base.json"
+DELTA_FILENAME = "knowledge_base.delta.json"
+JOURNAL_SUFFIX = ".journal.jsonl"
+TIMINGS_SUFFIX = ".timings.json"
+EMBEDDINGS_FILENAME = "knowledge_base.embeddings.npy"
+EMBEDDING_CACHE_FILENAME = "embedding_cache.sqlite"
+VECTOR_STORE_DIRNAME = "knowledge_base.vectors"
+
+
+@dataclass
+class PipelineConfig:
+    """
+    Configuration for a single pipeline job.
+    """
+    input_dir: str = "./data/raw"
+    output_dir: str = "./data/processed"
+    recursive: bool = True
+
+    # Chunking
+    chunk_size: int = 1000
+    chunk_overlap: int = 200
+
+    # Keep chunks as offsets into one copy of each document's text
+    compact: bool = False
+
+    # JSON/JSONL record specs, e.g. ["faqs[].question/answer"] (None: driver defaults)
+    json_paths: Optional[List[str]] = None
+
+    # Low-information chunks (page markers, table rules, near-empty text):
+    # 'merge' into a neighbour, 'drop', or None to keep them
+    chunk_filter: Optional[str] = "merge"
+
+    # Strip HTML blocks repeated across the batch (site header, menus, footer)
+    strip_boilerplate: bool = True
+
+    # Extraction sandbox
+    isolate: bool = False
+    timeout: float = DEFAULT_TIMEOUT
+    memory_limit_mb: int = DEFAULT_MEMORY_LIMIT_MB
+
+    # Parallel extraction: files are dispatched longest-predicted-first
+    workers: int = 1
+
+    # Processes used to split one huge document text (same chunks as serial)
+    chunk_workers: int = 1
+
+    # Discovery
+    dedupe: bool = True
+
+    # Output
+    previous_file: Optional[str] = None
+    num_shards: int = 0
+
+    # SQLite copy of the knowledge base with an FTS5 index, upserted per file
+    sqlite_db: Optional[str] = None
+
+    # Embedding stage: embedder spec ('hashing[:dim]' or 'module:attribute'),
+    # with a persistent cache keyed by (embedder id, chunk content hash)
+    embedder: Optional[str] = None
+    embedding_cache: Optional[str] = None
+    embedding_cache_max_bytes: int = DEFAULT_MAX_BYTES
+
+    # Quantized, memory-mappable copy of the embeddings: 'int8' or 'pq'
+    vector_store: Optional[str] = None
+    pq_subvectors: Optional[int] = None
+
+    # Distributed run: (index, count) writes a partial output for merging
+    partition: Optional[Tuple[int, int]] = None
+
+    # Crash safety: journal completed files, and reuse them when resuming
+    checkpoint: bool = False
+    resume: bool = False
+
+    # Monitoring: serve /metrics on this port, and/or write a textfile at the end
+    metrics_port: Optional[int] = None
+    metrics_textfile: Optional[str] = None
+
+
+def get_driver(file_type: str, streaming: bool = False):
+    """
+    Get the appropriate driver function for a file type.
+    Streaming drivers return documents whose 'sections' is a generator.
+    """
+    if streaming:
+        drivers = {
+            'pdf': stream_pdf,
+            'excel': stream_excel,
+            'markdown': stream_markdown,
+            'json': stream_json,
+            'html': stream_html,
+            'tabular': stream_tabular,
+        }
+    else:
+        drivers = {
+            'pdf': process_pdf,
+            'excel': process_excel,
+            'markdown': process_markdown,
+            'json': process_json,
+            'html': process_html,
+            'tabular': process_tabular,
+        }
+    return drivers.get(file_type)
+
+
+def chunk_file(
+    file_path: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    compact: bool = False,
+    driver_options: Optional[Dict[str, Dict[str, Any]]] = None,
+    chunk_filter: Optional[str] = None,
+    chunk_workers: int = 1,
+    source_root: Optional[str] = None
+) -> Tuple[str, List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Extract and chunk a single file, raising on any failure.
+    Kept at module level so it can run inside an isolated worker.
+
+    Args:
+        file_path: Path to the file
+        chunk_size: Maximum chunk size in characters
+        chunk_overlap: Overlap between chunks
+        compact: Return a CompactDocument instead of a list of chunk dicts
+        driver_options: Extra driver keyword arguments per file type
+        chunk_filter: Low-information chunk action ('merge', 'drop' or None)
+        chunk_workers: Processes used to split a single huge text
+        source_root: Input directory that chunk ids are made relative to
+
+    Returns:
+        Tuple of (file_type, chunks, stats); stats holds the chunk filter
+        counts and any 'warning' the driver reported
+    """
+    file_type = detect_file_type(file_path)
+    driver = get_driver(file_type, streaming=True)
+
+    if not driver:
+        raise ValueError(f"No driver found for: {file_type}")
+
+    document = driver(file_path, **(driver_options or {}).get(file_type, {}))
+    chunker = create_chunker(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, chunk_filter=chunk_filter,
+        workers=chunk_workers, source_root=source_root
+    )
+
+    chunks = chunker.chunk_document_compact(document) if compact else chunker.chunk_document(document)
+    stats = chunker.chunk_filter.stats() if chunker.chunk_filter else {}
+    # Streaming drivers fill in their metadata as the sections are consumed
+    if document.get("metadata", {}).get("warning"):
+        stats["warning"] = document["metadata"]["warning"]
+    return document.get("file_type", file_type), chunks, stats
+
+
+class Pipeline:
+    """
+    ETL pipeline job.
+    - discover() finds and de-duplicates input files
+    - process_files() yields one result per file (summary + chunks)
+    - iter_chunks() / aiter_chunks() stream chunks without writing output
+    - run() processes everything and writes the knowledge base
+    """
+
+    def __init__(self, config: PipelineConfig = None):
+        self.config = config or PipelineConfig()
+        self.files: Optional[List[str]] = None
+        self.unique_files: List[str] = []
+        self.aliases: Dict[str, List[str]] = {}
+        self.file_positions: Dict[str, int] = {}
+        self.boilerplate: frozenset = frozenset()
+        self.metrics = PipelineMetrics()
+        self.features: Dict[str, Dict[str, Any]] = {}
+        self.predictions: Dict[str, float] = {}
+        self.processing_seconds = 0.0
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    def discover(self) -> List[str]:
+        """
+        Find supported input files and drop byte-identical duplicates.
+        With a partition configured, only that partition's files are kept;
+        de-duplication still sees the whole tree so every node agrees.
+
+        Returns:
+            Unique file paths to process
+        """
+        config = self.config
+        self.files = get_files_from_directory(config.input_dir, recursive=config.recursive)
+        self.unique_files = self.files
+        self.aliases = {}
+
+        # Skip byte-identical copies of the same payload
+        if config.dedupe and self.files:
+            self.unique_files, self.aliases = find_duplicates(self.files)
+
+        self.file_positions = {file_path: position for position, file_path in enumerate(self.unique_files)}
+
+        # Template blocks are found across the whole batch, before partitioning
+        self.boilerplate = frozenset()
+        if config.strip_boilerplate:
+            html_files = [f for f in self.unique_files if detect_file_type(f) == 'html']
+            if html_files:
+                self.boilerplate = find_boilerplate(html_files)
+
+        if config.partition:
+            index, count = config.partition
+            self.unique_files = partition_files(self.unique_files, config.input_dir, index, count)
+
+        self.metrics.set_pending(len(self.unique_files))
+        return self.unique_files
+
+    def driver_options(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the extra keyword arguments passed to each file type's driver.
+        """
+        return {
+            'json': {"record_paths": self.config.json_paths},
+            'html': {"boilerplate": self.boilerplate}
+        }
+
+    def plan(self) -> List[str]:
+        """
+        Predict each file's extraction time and order files for dispatch.
+        With several workers, files run longest-predicted-first (LPT);
+        a single worker keeps discovery order and skips cost modelling,
+        which would open every PDF just to count its pages.
+
+        Returns:
+            Unique file paths in dispatch order
+        """
+        self.features = {}
+        self.predictions = {}
+        if self.config.workers <= 1:
+            return list(self.unique_files)
+
+        cost_model = CostModel(self.timings_path())
+        for file_path in self.unique_files:
+            try:
+                self.features[file_path] = describe_file(file_path)
+                self.predictions[file_path] = cost_model.predict(file_path, self.features[file_path])
+            except OSError:
+                self.predictions[file_path] = 0.0
+
+        return schedule_lpt(self.unique_files, self.predictions)
+
+    def process_file(self, file_path: str) -> Dict[str, Any]:
+        """
+        Pre-scan, extract and chunk one file, never raising.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            File result dict: file summary fields plus 'chunks'
+            (empty on error) and 'error' (None on success)
+        """
+        config = self.config
+        result = {
+            "file_path": file_path,
+            "filename": Path(file_path).name,
+            "file_type": None,
+            "status": "error",
+            "error": None,
+            "aliases": self.aliases.get(file_path, []),
+            "chunks": [],
+            "predicted_seconds": self.predictions.get(file_path)
+        }
+        started = time.perf_counter()
+
+        try:
+            # Fast-fail encrypted or corrupt files before the heavy engines run
+            reason = prescan_file(file_path, detect_file_type(file_path))
+            if reason:
+                raise SandboxError(reason)
+
+            chunk_args = (
+                file_path, config.chunk_size, config.chunk_overlap, config.compact,
+                self.driver_options(), config.chunk_filter,
+                # Sandboxed workers are daemonic and cannot start a pool of their own
+                1 if config.isolate else config.chunk_workers,
+                config.input_dir
+            )
+            if config.isolate:
+                file_type, chunks, filter_stats = run_isolated(
+                    chunk_file, chunk_args, config.timeout, config.memory_limit_mb
+                )
+            elif self._process_pool:
+                file_type, chunks, filter_stats = self._process_pool.submit(chunk_file, *chunk_args).result()
+            else:
+                file_type, chunks, filter_stats = chunk_file(*chunk_args)
+        except Exception as e:
+            result["error"] = str(e)
+            result["error_kind"] = classify_error(str(e)) if isinstance(e, SandboxError) else type(e).__name__
+            file_type = detect_file_type(file_path)
+            chunks = []
+            filter_stats = {}
+        else:
+            result["status"] = "success"
+            if filter_stats.get("warning"):
+                result["warning"] = filter_stats["warning"]
+
+        result.update({
+            "file_type": file_type or "unknown",
+            "chunks": chunks,
+            "chunks_merged": filter_stats.get("chunks_merged", 0),
+            "chunks_dropped": filter_stats.get("chunks_dropped", 0),
+            "elapsed_seconds": time.perf_counter() - started,
+            "bytes_read": os.path.getsize(file_path) if os.path.exists(file_path) else 0
+        })
+        return result
+
+    def process_files(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield a file result for every unique input file.
+
+        With checkpointing enabled, each result is journaled before it is
+        yielded; when resuming, files already in the journal are yielded
+        from it (with 'resumed' set) instead of being processed again.
+
+        With several workers, results are yielded as files complete;
+        write_output() restores discovery order.
+        """
+        if self.files is None:
+            self.discover()
+
+        schedule = self.plan()
+        journal = self.open_journal() if self.config.checkpoint else None
+
+        try:
+            pending = []
+            for file_path in schedule:
+                result = journal.get(file_path) if journal else None
+                if result is None:
+                    pending.append(file_path)
+                    continue
+
+                result["resumed"] = True
+                if is_compact(result["chunks"]):
+                    result["chunks"] = CompactDocument.from_json(result["chunks"])
+                self.metrics.observe_result(result)
+                yield result
+
+            started = time.perf_counter()
+            for result in self._run_files(pending):
+                if journal:
+                    journal.append(result)
+
+                self.metrics.observe_result(result)
+                yield result
+            self.processing_seconds = time.perf_counter() - started
+        finally:
+            if journal:
+                journal.close()
+
+    def _run_files(self, file_paths: List[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Process files in dispatch order on the configured number of workers.
+        """
+        workers = self.config.workers
+        if workers <= 1:
+            for file_path in file_paths:
+                yield self.process_file(file_path)
+            return
+
+        # Threads drive dispatch; CPU-bound extraction runs in worker processes
+        # (isolated runs already get a fresh process per file)
+        if not self.config.isolate:
+            self._process_pool = ProcessPoolExecutor(max_workers=workers)
+        threads = ThreadPoolExecutor(max_workers=workers)
+
+        try:
+            futures = [threads.submit(self.process_file, file_path) for file_path in file_paths]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            threads.shutdown(cancel_futures=True)
+            if self._process_pool:
+                self._process_pool.shutdown(cancel_futures=True)
+                self._process_pool = None
+
+    def start_metrics_server(self) -> Optional[MetricsServer]:
+        """
+        Start the /metrics HTTP endpoint if a metrics port is configured.
+
+        Returns:
+            Running server (call stop() when done), or None
+        """
+        if self.config.metrics_port is None:
+            return None
+        return MetricsServer(self.metrics, self.config.metrics_port).start()
+
+    def journal_path(self) -> Path:
+        """
+        Get the run journal path (one per partition in distributed runs).
+        """
+        return Path(self.config.output_dir) / (self._output_stem() + JOURNAL_SUFFIX)
+
+    def timings_path(self) -> Path:
+        """
+        Get the per-file timing history path (one per partition in distributed runs).
+        """
+        return Path(self.config.output_dir) / (self._output_stem() + TIMINGS_SUFFIX)
+
+    def _output_stem(self) -> str:
+        if self.config.partition:
+            index, count = self.config.partition
+            return Path(PARTIAL_FILENAME_TEMPLATE.format(index=index, count=count)).stem
+        return Path(OUTPUT_FILENAME).stem
+
+    def open_journal(self) -> RunJournal:
+        """
+        Open the run journal, loading completed files when resuming.
+
+        Raises:
+            ValueError: If resuming from a journal of a differently configured run
+        """
+        config = self.config
+        fingerprint = {
+            "input_dir": str(config.input_dir),
+            "recursive": config.recursive,
+            "chunk_size": config.chunk_size,
+            "chunk_overlap": config.chunk_overlap,
+            "json_paths": config.json_paths,
+            "chunk_filter": config.chunk_filter,
+            "strip_boilerplate": config.strip_boilerplate,
+            "dedupe": config.dedupe,
+            "partition": list(config.partition) if config.partition else None
+        }
+        return RunJournal(self.journal_path(), fingerprint).open(resume=config.resume)
+
+    def iter_chunks(self) -> Iterator[Dict[str, Any]]:
+        """
+        Synchronous generator over the chunks of all input files.
+        Failed files are skipped; use process_files() to see their errors.
+        """
+        for result in self.process_files():
+            yield from result["chunks"]
+
+    async def aiter_chunks(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async iterator over the chunks of all input files.
+        Extraction runs in a worker thread so the event loop stays responsive.
+        """
+        if self.files is None:
+            await asyncio.to_thread(self.discover)
+
+        for file_path in self.unique_files:
+            result = await asyncio.to_thread(self.process_file, file_path)
+            for chunk in result["chunks"]:
+                yield chunk
+
+    def build_knowledge_base(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Assemble the knowledge base dict from file results.
+
+        Args:
+            results: File results from process_files()
+
+        Returns:
+            Dict with 'metadata' and 'chunks'
+        """
+        all_chunks = []
+        file_summaries = []
+
+        for result in results:
+            all_chunks.extend(result["chunks"])
+            file_summaries.append(summarize_result(result))
+
+        processed_count = sum(1 for result in results if result["status"] == "success")
+        files_found = len(self.files or [])
+        duplicates = files_found - len(self.file_positions)
+
+        return {
+            "metadata": {
+                "created_at": datetime.now().isoformat(),
+                "pipeline_version": PIPELINE_VERSION,
+                "source_directory": str(self.config.input_dir),
+                "chunk_config": {
+                    "chunk_size": self.config.chunk_size,
+                    "chunk_overlap": self.config.chunk_overlap
+                },
+                "statistics": {
+                    "total_files_found": files_found,
+                    "files_processed": processed_count,
+                    "files_errored": len(results) - processed_count,
+                    "duplicates_skipped": duplicates,
+                    "chunks_merged": sum(result.get("chunks_merged", 0) for result in results),
+                    "chunks_dropped": sum(result.get("chunks_dropped", 0) for result in results),
+                    "total_chunks": len(all_chunks)
+                },
+                "file_summaries": file_summaries
+            },
+            "chunks": all_chunks
+        }
+
+    def write_output(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Write the knowledge base (or a partial, in a distributed run) for file results.
+        Results are put back in discovery order first. Measured timings are
+        added to the timing history, and the run journal is removed once the
+        output is written.
+
+        Args:
+            results: File results from process_files()
+
+        Returns:
+            Pipeline results summary
+        """
+        results = sorted(results, key=lambda result: self.file_positions.get(result["file_path"], 0))
+        summary = self._write_output(results)
+        summary["schedule"] = self.schedule_report(results)
+        self.save_timings(results)
+
+        if self.config.checkpoint:
+            journal_file = self.journal_path()
+            if journal_file.exists():
+                journal_file.unlink()
+
+        if self.config.metrics_textfile:
+            self.metrics.write_textfile(self.config.metrics_textfile)
+
+        return summary
+
+    def schedule_report(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Compare predicted and actual extraction times for processed files.
+
+        Args:
+            results: File results from process_files()
+
+        Returns:
+            Dict with summed and makespan predicted/actual seconds
+        """
+        measured = [
+            result for result in results
+            if not result.get("resumed") and result.get("predicted_seconds") is not None
+        ]
+        predicted = {result["file_path"]: result["predicted_seconds"] for result in measured}
+        dispatch_order = schedule_lpt(list(predicted), predicted) if self.config.workers > 1 else list(predicted)
+        errors = [abs(result["predicted_seconds"] - result["elapsed_seconds"]) for result in measured]
+
+        return {
+            "workers": self.config.workers,
+            "files": len(measured),
+            "predicted_seconds": round(sum(predicted.values()), 3),
+            "actual_seconds": round(sum(result["elapsed_seconds"] for result in measured), 3),
+            "predicted_makespan_seconds": round(
+                simulate_makespan([predicted[fp] for fp in dispatch_order], self.config.workers), 3
+            ),
+            "actual_makespan_seconds": round(self.processing_seconds, 3),
+            "mean_abs_error_seconds": round(sum(errors) / len(errors), 3) if errors else 0.0
+        }
+
+    def save_timings(self, results: List[Dict[str, Any]]) -> None:
+        """
+        Add measured per-file timings to the persisted history.
+        """
+        cost_model = CostModel(self.timings_path())
+        for result in results:
+            features = self.features.get(result["file_path"])
+            if features and result["status"] == "success" and not result.get("resumed"):
+                cost_model.record(result["file_path"], features, result["elapsed_seconds"])
+        cost_model.save()
+
+    def _write_output(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        knowledge_base = self.build_knowledge_base(results)
+
+        if self.config.partition:
+            positions = [self.file_positions[result["file_path"]] for result in results]
+            partial_file = write_partial(knowledge_base, self.config.output_dir, self.config.partition, positions)
+            statistics = knowledge_base["metadata"]["statistics"]
+            return {
+                "status": "success",
+                "output_file": str(partial_file),
+                "files_processed": statistics["files_processed"],
+                "total_chunks": statistics["total_chunks"],
+                "statistics": statistics,
+                "delta": None,
+                "embeddings": None,
+                "vector_store": None,
+                "sqlite": None
+            }
+
+        return self.write_knowledge_base(knowledge_base)
+
+    def write_knowledge_base(self, knowledge_base: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Write a knowledge base dict with its offset index and delta.
+
+        Args:
+            knowledge_base: Dict with 'metadata' and 'chunks'
+
+        Returns:
+            Pipeline results summary
+        """
+        config = self.config
+        output_path = Path(config.output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        all_chunks = knowledge_base["chunks"]
+
+        # Read previous chunk ids before the output is overwritten
+        output_file = output_path / (SHARD_INDEX_FILENAME if config.num_shards else OUTPUT_FILENAME)
+        previous_ids = load_chunk_ids(config.previous_file or output_file)
+
+        # Save output, one chunk per line
+        if config.num_shards:
+            _, data_files, entries = write_shards(
+                all_chunks, output_path, config.num_shards, knowledge_base["metadata"]
+            )
+        else:
+            data_files = [output_file.name]
+            entries = write_indexed_json(knowledge_base, output_file)
+
+        # Save offset index for random access by chunk id
+        index_file = index_path_for(output_file)
+        write_offset_index(index_file, data_files, [chunk["chunk_id"] for chunk in all_chunks], entries)
+
+        # Save delta for incremental vector store upserts
+        delta = compute_delta(previous_ids, all_chunks)
+        delta_file = output_path / DELTA_FILENAME
+        with open(delta_file, 'w', encoding='utf-8') as f:
+            json.dump(delta, f, indent=2, ensure_ascii=False)
+
+        # Save vectors, one row per chunk in pipeline order
+        embeddings_file = None
+        embeddings = None
+        if config.embedder:
+            embeddings_file, embeddings = self.write_embeddings(all_chunks)
+
+        # Save quantized codes for memory-mapped search, re-ranked on the exact vectors
+        vector_store = None
+        if config.vector_store and embeddings_file and all_chunks:
+            vector_store = write_vector_store(
+                output_path / VECTOR_STORE_DIRNAME,
+                np.load(embeddings_file, mmap_mode='r'),
+                [chunk["chunk_id"] for chunk in all_chunks],
+                config.vector_store,
+                config.pq_subvectors,
+                exact_file=embeddings_file
+            )
+
+        # Upsert changed files into the SQLite knowledge base
+        sqlite_stats = None
+        if config.sqlite_db:
+            with KnowledgeBaseDB(config.sqlite_db) as db:
+                sqlite_stats = db.sync(knowledge_base)
+
+        statistics = knowledge_base["metadata"]["statistics"]
+        return {
+            "status": "success",
+            "output_file": str(output_file),
+            "delta_file": str(delta_file),
+            "index_file": str(index_file),
+            "embeddings_file": str(embeddings_file) if embeddings_file else None,
+            "files_processed": statistics["files_processed"],
+            "total_chunks": statistics["total_chunks"],
+            "statistics": statistics,
+            "delta": delta["statistics"],
+            "embeddings": embeddings,
+            "vector_store": vector_store,
+            "sqlite_db": config.sqlite_db,
+            "sqlite": sqlite_stats
+        }
+
+    def write_embeddings(self, chunks: List[Dict[str, Any]]) -> Tuple[Path, Dict[str, Any]]:
+        """
+        Embed chunks through the embedding cache and save the vectors.
+
+        Only chunks whose content hash is not cached for this embedder are
+        embedded; row i of the saved matrix belongs to chunk position i.
+
+        Args:
+            chunks: Chunks in pipeline order
+
+        Returns:
+            Tuple of (embeddings file path, embedding stats)
+        """
+        config = self.config
+        output_path = Path(config.output_dir)
+        cache_file = config.embedding_cache or output_path / EMBEDDING_CACHE_FILENAME
+
+        embedder = load_embedder(config.embedder)
+        with EmbeddingCache(cache_file, config.embedding_cache_max_bytes) as cache:
+            vectors, stats = embed_chunks(chunks, embedder, cache)
+
+        embeddings_file = output_path / EMBEDDINGS_FILENAME
+        np.save(embeddings_file, vectors)
+        return embeddings_file, stats
+
+    def check_vector_store(self) -> None:
+        """
+        Check the vector store config against the embedder before any file
+        is processed. Embedders without a 'dim' attribute are only checked
+        when the store is written.
+
+        Raises:
+            ValueError: If the vector store config is invalid
+        """
+        config = self.config
+        if not config.vector_store:
+            return
+        if not config.embedder:
+            raise ValueError("vector_store requires an embedder")
+
+        dim = getattr(load_embedder(config.embedder), "dim", None)
+        if dim:
+            check_store_config(config.vector_store, dim, config.pq_subvectors)
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Process all input files and write the knowledge base.
+
+        Returns:
+            Pipeline results summary
+        """
+        if not Path(self.config.input_dir).exists():
+            return {"status": "error", "message": f"Input directory not found: {self.config.input_dir}"}
+
+        try:
+            self.check_vector_store()
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+
+        self.discover()
+        if not self.files:
+            return {"status": "warning", "message": "No files to process"}
+
+        server = self.start_metrics_server()
+        try:
+            return self.write_output(list(self.process_files()))
+        finally:
+            if server:
+                server.stop()
+
+
+def summarize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the file_summaries entry for a file result.
+    """
+    if result["status"] == "success":
+        summary = {
+            "filename": result["filename"],
+            "source": result["file_path"],
+            "file_type": result["file_type"],
+            "chunks_created": len(result["chunks"]),
+            "status": "success",
+            "aliases": result["aliases"]
+        }
+        if result.get("warning"):
+            summary["warning"] = result["warning"]
+        return summary
+
+    return {
+        "filename": result["filename"],
+        "source": result["file_path"],
+        "status": "error",
+        "error": result["error"],
+        "aliases": result["aliases"]
+    }
+
@@ -0,0 +1,305 @@
+"""
+RAG Preprocessor - Chunk Config Sweep
+Compares chunk_size/chunk_overlap settings over one shared extraction pass.
+
+Each file is extracted once; its document is then chunked under every
+config in parallel worker processes. One knowledge base is written per
+config, plus a report comparing chunk counts, size distributions and
+chunking time.
+
+Example:
+    sweep = ChunkSweep(PipelineConfig(input_dir="./docs"), [(500, 50), (1000, 200)])
+    report = sweep.run()
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .pipeline import Pipeline, PipelineConfig, get_driver
+from .utils.chunker import create_chunker
+from .utils.file_detector import detect_file_type
+from .utils.metrics import classify_error
+from .utils.sandbox import SandboxError, prescan_file, run_isolated
+
+
+SWEEP_DIRNAME = "sweep"
+REPORT_FILENAME = "sweep_report.json"
+
+
+def parse_chunk_configs(spec: str) -> List[Tuple[int, int]]:
+    """
+    Parse a 'SIZE:OVERLAP,SIZE:OVERLAP,...' sweep spec.
+
+    Raises:
+        ValueError: If an entry is malformed or its overlap is not below its size
+    """
+    configs = []
+    for entry in spec.split(","):
+        try:
+            size_str, overlap_str = entry.strip().split(":")
+            chunk_size, chunk_overlap = int(size_str), int(overlap_str)
+        except ValueError:
+            raise ValueError(f"Invalid chunk config '{entry}', expected SIZE:OVERLAP (e.g. 800:100)")
+
+        if chunk_size < 1 or not 0 <= chunk_overlap < chunk_size:
+            raise ValueError(f"Invalid chunk config '{entry}': need 0 <= OVERLAP < SIZE")
+        if (chunk_size, chunk_overlap) not in configs:
+            configs.append((chunk_size, chunk_overlap))
+
+    return configs
+
+
+def config_dirname(chunk_size: int, chunk_overlap: int) -> str:
+    """
+    Get the output directory name for one chunk config.
+    """
+    return f"size{chunk_size}-overlap{chunk_overlap}"
+
+
+def extract_file(file_path: str, driver_options: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Extract a file into a fully materialized document (sections as a list),
+    so it can be chunked more than once.
+    Kept at module level so it can run inside an isolated worker.
+    """
+    file_type = detect_file_type(file_path)
+    driver = get_driver(file_type)
+
+    if not driver:
+        raise ValueError(f"No driver found for: {file_type}")
+
+    document = driver(file_path, **(driver_options or {}).get(file_type, {}))
+    document.setdefault("file_type", file_type)
+    return document
+
+
+def chunk_extracted(
+    document: Dict[str, Any],
+    chunk_size: int,
+    chunk_overlap: int,
+    compact: bool = False,
+    chunk_filter: Optional[str] = None,
+    source_root: Optional[str] = None
+) -> tuple:
+    """
+    Chunk an extracted document under one config, timing the chunker.
+
+    Returns:
+        Tuple of (chunks, seconds, chunk filter counts)
+    """
+    started = time.perf_counter()
+    chunker = create_chunker(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, chunk_filter=chunk_filter, source_root=source_root
+    )
+    chunks = chunker.chunk_document_compact(document) if compact else chunker.chunk_document(document)
+    filter_stats = chunker.chunk_filter.stats() if chunker.chunk_filter else {}
+    return chunks, time.perf_counter() - started, filter_stats
+
+
+def size_distribution(sizes: List[int]) -> Dict[str, Any]:
+    """
+    Summarize chunk sizes (characters): min, percentiles, max and mean.
+    """
+    if not sizes:
+        return {"min": 0, "p50": 0, "p90": 0, "p99": 0, "max": 0, "mean": 0.0}
+
+    ordered = sorted(sizes)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    return {
+        "min": ordered[0],
+        "p50": percentile(50),
+        "p90": percentile(90),
+        "p99": percentile(99),
+        "max": ordered[-1],
+        "mean": round(sum(ordered) / len(ordered), 1)
+    }
+
+
+class ChunkSweep:
+    """
+    Chunk config sweep job.
+    - Discovery, de-duplication and boilerplate detection run once
+    - Each file is extracted once (sandboxed when config.isolate is set)
+    - Chunking fans out to one worker process per config (capped at CPU count)
+    - Writes <output>/sweep/size<S>-overlap<O>/ per config and a sweep report
+    Sections are held in memory while a file is chunked, so very large
+    streaming inputs cost more here than in a normal run.
+    """
+
+    def __init__(self, config: PipelineConfig, chunk_configs: List[Tuple[int, int]], workers: Optional[int] = None):
+        self.config = config
+        self.chunk_configs = chunk_configs
+        self.workers = workers or min(len(chunk_configs), os.cpu_count() or 1)
+        self.pipeline = Pipeline(config)
+        self.extraction_seconds = 0.0
+
+    def config_pipeline(self, chunk_size: int, chunk_overlap: int) -> Pipeline:
+        """
+        Build the pipeline that writes one config's knowledge base, sharing
+        the sweep's discovery results.
+        """
+        config = replace(
+            self.config,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            output_dir=str(Path(self.config.output_dir) / SWEEP_DIRNAME / config_dirname(chunk_size, chunk_overlap)),
+            previous_file=None,
+            sqlite_db=None
+        )
+        pipeline = Pipeline(config)
+        base = self.pipeline
+        pipeline.files = base.files
+        pipeline.unique_files = base.unique_files
+        pipeline.aliases = base.aliases
+        pipeline.file_positions = base.file_positions
+        pipeline.boilerplate = base.boilerplate
+        return pipeline
+
+    def extract(self, file_path: str) -> Dict[str, Any]:
+        """
+        Pre-scan and extract one file, raising on any failure.
+        """
+        config = self.config
+        reason = prescan_file(file_path, detect_file_type(file_path))
+        if reason:
+            raise SandboxError(reason)
+
+        args = (file_path, self.pipeline.driver_options())
+        if config.isolate:
+            return run_isolated(extract_file, args, config.timeout, config.memory_limit_mb)
+        return extract_file(*args)
+
+    def process_files(self) -> Dict[Tuple[int, int], List[Dict[str, Any]]]:
+        """
+        Extract every unique file once and chunk it under every config.
+
+        Returns:
+            Dict of (chunk_size, chunk_overlap) -> file results in discovery order,
+            each with an extra 'chunk_seconds'
+        """
+        results = {chunk_config: [] for chunk_config in self.chunk_configs}
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+
+        try:
+            for file_path in self.pipeline.unique_files:
+                base = {
+                    "file_path": file_path,
+                    "filename": Path(file_path).name,
+                    "file_type": detect_file_type(file_path) or "unknown",
+                    "status": "error",
+                    "error": None,
+                    "aliases": self.pipeline.aliases.get(file_path, []),
+                    "chunks": [],
+                    "chunk_seconds": 0.0
+                }
+
+                started = time.perf_counter()
+                try:
+                    document = self.extract(file_path)
+                except Exception as e:
+                    base["error"] = str(e)
+                    base["error_kind"] = classify_error(str(e)) if isinstance(e, SandboxError) else type(e).__name__
+                    for chunk_config in self.chunk_configs:
+                        results[chunk_config].append(dict(base))
+                    continue
+                finally:
+                    self.extraction_seconds += time.perf_counter() - started
+
+                base["file_type"] = document["file_type"]
+                chunk_options = (self.config.compact, self.config.chunk_filter, self.config.input_dir)
+                if pool:
+                    futures = {
+                        chunk_config: pool.submit(chunk_extracted, document, *chunk_config, *chunk_options)
+                        for chunk_config in self.chunk_configs
+                    }
+                    outcomes = {chunk_config: future.exception() or future.result() for chunk_config, future in futures.items()}
+                else:
+                    outcomes = {}
+                    for chunk_config in self.chunk_configs:
+                        try:
+                            outcomes[chunk_config] = chunk_extracted(document, *chunk_config, *chunk_options)
+                        except Exception as e:
+                            outcomes[chunk_config] = e
+
+                for chunk_config, outcome in outcomes.items():
+                    result = dict(base)
+                    if isinstance(outcome, Exception):
+                        result["error"] = str(outcome)
+                        result["error_kind"] = type(outcome).__name__
+                    else:
+                        result["status"] = "success"
+                        result["chunks"], result["chunk_seconds"], filter_stats = outcome
+                        result.update(filter_stats)
+                    results[chunk_config].append(result)
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+        return results
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run the sweep and write one knowledge base per config plus the report.
+
+        Returns:
+            Sweep report dict
+        """
+        config = self.config
+        if not Path(config.input_dir).exists():
+            return {"status": "error", "message": f"Input directory not found: {config.input_dir}"}
+
+        self.pipeline.discover()
+        if not self.pipeline.files:
+            return {"status": "warning", "message": "No files to process"}
+
+        results = self.process_files()
+
+        entries = []
+        for (chunk_size, chunk_overlap), config_results in results.items():
+            pipeline = self.config_pipeline(chunk_size, chunk_overlap)
+            summary = pipeline.write_knowledge_base(pipeline.build_knowledge_base(config_results))
+
+            sizes = [
+                len(chunk["content"])
+                for result in config_results for chunk in result["chunks"]
+            ]
+            succeeded = [result for result in config_results if result["status"] == "success"]
+            entries.append({
+                "chunk_size": chunk_size,
+                "chunk_overlap": chunk_overlap,
+                "output_file": summary["output_file"],
+                "files_processed": len(succeeded),
+                "files_errored": len(config_results) - len(succeeded),
+                "total_chunks": len(sizes),
+                "chunks_per_file": round(len(sizes) / len(succeeded), 2) if succeeded else 0.0,
+                "chunks_merged": sum(result.get("chunks_merged", 0) for result in config_results),
+                "chunks_dropped": sum(result.get("chunks_dropped", 0) for result in config_results),
+                "chunk_chars": size_distribution(sizes),
+                "chunk_seconds": round(sum(result["chunk_seconds"] for result in config_results), 3)
+            })
+
+        report = {
+            "status": "success",
+            "created_at": datetime.now().isoformat(),
+            "source_directory": str(config.input_dir),
+            "files": len(self.pipeline.unique_files),
+            "workers": self.workers,
+            "extraction_seconds": round(self.extraction_seconds, 3),
+            "configs": entries
+        }
+
+        report_file = Path(config.output_dir) / REPORT_FILENAME
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        report["report_file"] = str(report_file)
+
+        return report
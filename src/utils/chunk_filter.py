@@ -0,0 +1,177 @@
+"""
+RAG Preprocessor - Chunk Filter Utilities
+Cheap scoring of chunk text to catch chunks that carry no retrievable content.
+
+Driver scaffolding lines (page markers, table rules) are ignored when
+scoring, so a chunk made only of them has no content at all. Headings and
+section context lines count as content. The remaining text is scored by
+word count, alphabetic density and unique-word ratio.
+
+Low-information chunks are merged into the following chunk (the previous
+one at the end of a document), even if the merged chunk grows past the
+chunk size; or dropped with action 'drop'. A chunk that carries a heading
+is never dropped: it is merged instead, or kept on its own when the
+document has nothing to merge it into.
+"""
+
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+
+FILTER_ACTIONS = ("merge", "drop")
+
+# A chunk before ids are assigned: (chunk_text, section_metadata_list, chunk_overlap)
+Piece = Tuple[str, List[Dict[str, Any]], int]
+
+# Separator placed between a merged chunk and its neighbour
+MERGE_SEPARATOR = "\n\n"
+
+# Scoring thresholds
+MIN_WORDS = 3
+MIN_ALPHA_RATIO = 0.25
+MIN_UNIQUE_RATIO = 0.05
+# The unique-word ratio is only meaningful for longer text
+UNIQUE_RATIO_MIN_WORDS = 20
+
+# Lines that describe structure rather than content
+SCAFFOLDING_LINE = re.compile(
+    r"^\s*(?:"
+    r"-{3,}\s*Page\s+\d+(?:\s+of\s+\d+)?\s*-{3,}"      # --- Page N ---
+    r"|[|:+\-=_*~.\s]+"                                # table separators and rules
+    r")\s*$"
+)
+
+# Section context lines and markdown headings
+HEADING_LINE = re.compile(r"^\s*(?:\[Section:.*\]|#{1,6}\s.*)$")
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+
+def has_heading(text: str) -> bool:
+    """
+    Check whether a chunk carries a heading or section context line.
+    """
+    return any(HEADING_LINE.match(line) for line in text.splitlines())
+
+
+def score_chunk(text: str) -> Dict[str, Any]:
+    """
+    Score a chunk's content, ignoring scaffolding lines.
+
+    Args:
+        text: Chunk text
+
+    Returns:
+        Dict with words, alpha_ratio and unique_ratio of the remaining text
+    """
+    content = "\n".join(line for line in text.splitlines() if not SCAFFOLDING_LINE.match(line))
+    words = WORD_PATTERN.findall(content.lower())
+    visible = sum(1 for ch in content if not ch.isspace())
+
+    return {
+        "words": len(words),
+        "alpha_ratio": sum(len(word) for word in words) / visible if visible else 0.0,
+        "unique_ratio": len(set(words)) / len(words) if words else 0.0
+    }
+
+
+class ChunkFilter:
+    """
+    Streaming filter over (chunk_text, section_metadata_list, chunk_overlap) pieces.
+    - Holds back at most one good piece, so streamed documents stay streamed
+    - Never drops a piece that carries a heading
+    - Counts merged and dropped pieces in 'merged' / 'dropped'
+    """
+
+    def __init__(
+        self,
+        action: str = "merge",
+        min_words: int = MIN_WORDS,
+        min_alpha_ratio: float = MIN_ALPHA_RATIO,
+        min_unique_ratio: float = MIN_UNIQUE_RATIO
+    ):
+        """
+        Initialize the filter.
+
+        Args:
+            action: 'merge' (into a neighbour) or 'drop'
+            min_words: Minimum content words of a kept chunk
+            min_alpha_ratio: Minimum share of letters among non-space characters
+            min_unique_ratio: Minimum distinct/total word ratio for longer chunks
+
+        Raises:
+            ValueError: If action is unknown
+        """
+        if action not in FILTER_ACTIONS:
+            raise ValueError(f"Unknown chunk filter action '{action}' (choose from {', '.join(FILTER_ACTIONS)})")
+
+        self.action = action
+        self.min_words = min_words
+        self.min_alpha_ratio = min_alpha_ratio
+        self.min_unique_ratio = min_unique_ratio
+        self.merged = 0
+        self.dropped = 0
+
+    def is_low_information(self, text: str) -> bool:
+        """
+        Check whether a chunk's text is too thin to be worth embedding.
+        """
+        score = score_chunk(text)
+        if score["words"] < self.min_words:
+            return True
+        if score["alpha_ratio"] < self.min_alpha_ratio:
+            return True
+        return score["words"] >= UNIQUE_RATIO_MIN_WORDS and score["unique_ratio"] < self.min_unique_ratio
+
+    def filter(self, pieces: Iterable[Piece]) -> Iterator[Piece]:
+        """
+        Drop or merge low-information pieces of one document.
+
+        Args:
+            pieces: Piece tuples in document order
+
+        Yields:
+            Filtered Piece tuples
+        """
+        pending: List[Piece] = []
+        held = None
+
+        for piece in pieces:
+            if not self.is_low_information(piece[0]):
+                if held:
+                    yield held
+                held = self._merge(piece, pending, forward=True)
+                pending = []
+            elif self.action == "drop" and not has_heading(piece[0]):
+                self.dropped += 1
+            else:
+                pending.append(piece)
+
+        if held:
+            yield self._merge(held, pending, forward=False)
+        elif any(has_heading(text) for text, _, _ in pending):
+            # Nothing to merge into: keep the headings as one chunk
+            yield self._merge(pending[-1], pending[:-1], forward=True)
+        else:
+            self.dropped += len(pending)
+
+    def stats(self) -> Dict[str, int]:
+        return {"chunks_merged": self.merged, "chunks_dropped": self.dropped}
+
+    def _merge(
+        self,
+        piece: Piece,
+        low: List[Piece],
+        forward: bool
+    ) -> Piece:
+        """
+        Join low pieces onto a good piece (before it when merging forward,
+        after it otherwise). The result may exceed the chunk size.
+        """
+        if not low:
+            return piece
+
+        pieces = low + [piece] if forward else [piece] + low
+        self.merged += len(low)
+        text = MERGE_SEPARATOR.join(text for text, _, _ in pieces)
+        return text, [meta for _, metas, _ in pieces for meta in metas], pieces[0][2]
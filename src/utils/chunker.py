@@ -1,23 +1,47 @@
 """
 RAG Preprocessor - Text Chunking Utilities
 Handles final text chunking using langchain's RecursiveCharacterTextSplitter.
+Documents that carry driver sections are packed section-by-section instead.
+Huge texts can be split on several processes with identical results.
 """
 
-from typing import Dict, Any, List
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Iterable, Iterator, Optional
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from .chunk_filter import HEADING_LINE, ChunkFilter, Piece
+from .compact_chunks import CompactDocument
+from .parallel_split import PARALLEL_MIN_CHARS, split_text_parallel
+
+
+# Separator placed between sections packed into the same chunk
+SECTION_SEPARATOR = "\n\n---\n\n"
+
+# Provenance keys that describe a contiguous range rather than an origin
+RANGE_KEYS = ("row_start", "row_end")
 
 
 class DocumentChunker:
     """
     Chunks documents for RAG vector embedding.
     Uses RecursiveCharacterTextSplitter with configurable parameters.
+    - Documents with 'sections' are packed directly into size-bounded chunks
+    - Documents with only 'content' are split with the recursive splitter
+    - An optional ChunkFilter merges or drops low-information chunks
+    - With workers > 1, texts of PARALLEL_MIN_CHARS or more are split on a
+      process pool, with the same chunks as serial splitting
     """
 
     def __init__(
         self,
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
-        separators: List[str] = None
+        separators: List[str] = None,
+        chunk_filter: Optional[ChunkFilter] = None,
+        workers: int = 1,
+        source_root: Optional[str] = None
     ):
         """
         Initialize chunker with configuration.
@@ -26,9 +50,15 @@ class DocumentChunker:
             chunk_size: Maximum size of each chunk (default: 1000)
             chunk_overlap: Overlap between chunks (default: 200)
             separators: Custom separators for splitting
+            chunk_filter: Filter applied to chunk text before ids are assigned
+            workers: Processes used to split a single huge text (default: 1)
+            source_root: Input directory; chunk ids use the source path relative to it
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.chunk_filter = chunk_filter
+        self.workers = workers
+        self.source_root = source_root
 
         # Default separators optimized for structured content
         if separators is None:
@@ -41,53 +71,262 @@ class DocumentChunker:
                 " ",            # Words
                 ""              # Characters
             ]
+        self.separators = separators
 
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            separators=separators,
-            length_function=len,
-            is_separator_regex=False
-        )
+        self.splitter = self._make_splitter(chunk_size, chunk_overlap)
 
     def chunk_document(self, document: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Chunk a single document into smaller pieces.
 
         Args:
-            document: Document dict with 'content', 'source', 'filename', 'metadata'
+            document: Document dict with 'content' or 'sections', 'source', 'filename', 'metadata'
 
         Returns:
             List of chunk dicts ready for vector embedding
         """
+        # Consume streamed sections first so driver metadata is complete
+        pieces = list(self._iter_pieces(document))
+
+        # Build output with metadata
+        seen_ids = set()
+        return [
+            self._build_chunk(document, idx, chunk_text, section_metas, overlap, len(pieces), seen_ids)
+            for idx, (chunk_text, section_metas, overlap) in enumerate(pieces)
+        ]
+
+    def chunk_document_compact(self, document: Dict[str, Any]) -> CompactDocument:
+        """
+        Chunk a document into a CompactDocument instead of chunk dicts.
+
+        Chunk ids, hashes and (materialized) content are identical to
+        chunk_document(), but overlapping text is stored only once.
+
+        Args:
+            document: Document dict with 'content' or 'sections', 'source', 'filename', 'metadata'
+
+        Returns:
+            CompactDocument of ChunkRecord views
+        """
+        compact = CompactDocument(
+            document.get("source", ""),
+            document.get("filename", ""),
+            document.get("file_type", ""),
+            self.chunk_size,
+            self.chunk_overlap
+        )
+
+        seen_ids = set()
+        for idx, (chunk_text, section_metas, overlap) in enumerate(self._iter_pieces(document)):
+            chunk = self._build_chunk(document, idx, chunk_text, section_metas, overlap, None, seen_ids)
+            compact.append(
+                chunk["chunk_id"], chunk["content_hash"], chunk_text, chunk["metadata"].get("provenance"), overlap
+            )
+
+        # Sections are exhausted, so driver metadata is now complete
+        return compact.finish(document.get("metadata", {}))
+
+    def iter_chunks(self, document: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Chunk a document lazily, consuming its sections as the driver yields them.
+
+        Only the chunk being packed is held in memory. Because the total is
+        unknown until the document is exhausted, 'total_chunks' is None and
+        document metadata reflects what the driver had filled in so far.
+
+        Args:
+            document: Document dict, typically from a driver's stream()
+
+        Yields:
+            Chunk dicts ready for vector embedding
+        """
+        seen_ids = set()
+        for idx, (chunk_text, section_metas, overlap) in enumerate(self._iter_pieces(document)):
+            yield self._build_chunk(document, idx, chunk_text, section_metas, overlap, None, seen_ids)
+
+    def _iter_pieces(self, document: Dict[str, Any]) -> Iterator[Piece]:
+        """
+        Yield (chunk_text, section_metadata_list, chunk_overlap) tuples for
+        a document, after the chunk filter if one is set.
+        """
+        pieces = self._split_pieces(document)
+        if self.chunk_filter:
+            return self.chunk_filter.filter(pieces)
+        return pieces
+
+    def _split_pieces(self, document: Dict[str, Any]) -> Iterator[Piece]:
+        """
+        Yield unfiltered (chunk_text, section_metadata_list, chunk_overlap)
+        tuples for a document.
+        """
+        sections = document.get("sections")
+
+        if sections is not None:
+            yield from self._pack_sections(sections)
+            return
+
         content = document.get("content", "")
 
         if not content.strip():
-            return []
+            return
 
         # Split the content
-        chunks = self.splitter.split_text(content)
+        for chunk_text in self.split_text(content):
+            yield chunk_text, [], self.chunk_overlap
 
-        # Build output with metadata
-        chunked_docs = []
-        for idx, chunk_text in enumerate(chunks):
-            chunked_docs.append({
-                "chunk_id": f"{document['filename']}_{idx}",
-                "chunk_index": idx,
-                "total_chunks": len(chunks),
-                "content": chunk_text,
-                "source": document.get("source", ""),
-                "filename": document.get("filename", ""),
-                "file_type": document.get("file_type", ""),
-                "metadata": {
-                    **document.get("metadata", {}),
-                    "chunk_size": self.chunk_size,
-                    "chunk_overlap": self.chunk_overlap,
-                    "char_count": len(chunk_text)
-                }
-            })
-
-        return chunked_docs
+    def split_text(self, text: str) -> List[str]:
+        """
+        Split text with the recursive splitter, on the worker pool when the
+        text is large enough to be worth it.
+        """
+        if self.workers > 1 and len(text) >= PARALLEL_MIN_CHARS:
+            return split_text_parallel(self.splitter, text, self.workers)
+        return self.splitter.split_text(text)
+
+    def split_section(self, text: str) -> List[str]:
+        """
+        Split an oversized section, keeping its leading [Section: ...] and
+        heading lines attached to the first body piece.
+
+        The first piece is re-split to a smaller size if the heading would
+        push it over chunk_size; the remaining pieces are unchanged.
+        """
+        lines = text.split("\n")
+        heading_lines = 0
+        while heading_lines < len(lines) and HEADING_LINE.match(lines[heading_lines]):
+            heading_lines += 1
+
+        heading_len = sum(len(line) + 1 for line in lines[:heading_lines])
+        body = text[heading_len:].lstrip()
+        heading = text[:len(text) - len(body)]
+        budget = self.chunk_size - len(heading)
+
+        if not heading_lines or not body or budget < self.chunk_size // 2:
+            return self.split_text(text)
+
+        pieces = self.split_text(body)
+        if len(pieces[0]) > budget:
+            first_splitter = self._make_splitter(budget, min(self.chunk_overlap, budget // 2))
+            pieces = first_splitter.split_text(pieces[0]) + pieces[1:]
+
+        pieces[0] = heading + pieces[0]
+        return pieces
+
+    def _make_splitter(self, chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+        return RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            separators=self.separators,
+            length_function=len,
+            is_separator_regex=False
+        )
+
+    def _build_chunk(
+        self,
+        document: Dict[str, Any],
+        idx: int,
+        chunk_text: str,
+        section_metas: List[Dict[str, Any]],
+        chunk_overlap: int,
+        total_chunks: Optional[int],
+        seen_ids: set
+    ) -> Dict[str, Any]:
+        """
+        Build a single chunk dict with document and provenance metadata.
+        chunk_overlap is the overlap that applied to this chunk (0 for
+        packed sections). seen_ids tracks ids already issued for this
+        document so repeated identical chunks get distinct ids.
+        """
+        chunk_metadata = {
+            **document.get("metadata", {}),
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "char_count": len(chunk_text)
+        }
+        if section_metas:
+            chunk_metadata["provenance"] = merge_provenance(section_metas)
+
+        source = document.get("source", "")
+        content_hash = hash_content(chunk_text)
+
+        id_source = relative_source(source, self.source_root)
+        occurrence = 0
+        chunk_id = make_chunk_id(id_source, content_hash)
+        while chunk_id in seen_ids:
+            occurrence += 1
+            chunk_id = make_chunk_id(id_source, content_hash, occurrence)
+        seen_ids.add(chunk_id)
+
+        return {
+            "chunk_id": chunk_id,
+            "content_hash": content_hash,
+            "chunk_index": idx,
+            "total_chunks": total_chunks,
+            "content": chunk_text,
+            "source": source,
+            "filename": document.get("filename", ""),
+            "file_type": document.get("file_type", ""),
+            "metadata": chunk_metadata
+        }
+
+    def _pack_sections(self, sections: Iterable[Dict[str, Any]]) -> Iterator[Piece]:
+        """
+        Pack driver sections into chunks without re-splitting joined text.
+
+        Consecutive sections are joined with SECTION_SEPARATOR while they fit
+        in chunk_size; packed chunks do not overlap. A section that is larger
+        than chunk_size on its own is split with the recursive splitter (see
+        split_section), each piece keeping that section's metadata and the
+        splitter's overlap. Sections marked 'atomic' (e.g. Q&A records) always become
+        exactly one chunk of their own, whatever their size. Sections may be
+        a generator; each one is consumed as it arrives.
+
+        Args:
+            sections: Iterable of dicts with 'content' and optional 'metadata'
+                      and 'atomic'
+
+        Yields:
+            (chunk_text, section_metadata_list, chunk_overlap) tuples
+        """
+        buffer = []
+        buffer_metas = []
+        buffer_len = 0
+        separator_len = len(SECTION_SEPARATOR)
+
+        for section in sections:
+            text = section.get("content", "").strip()
+            if not text:
+                continue
+
+            meta = section.get("metadata", {})
+
+            if section.get("atomic"):
+                if buffer:
+                    yield SECTION_SEPARATOR.join(buffer), buffer_metas, 0
+                    buffer, buffer_metas, buffer_len = [], [], 0
+                yield text, [meta], 0
+                continue
+
+            if len(text) > self.chunk_size:
+                if buffer:
+                    yield SECTION_SEPARATOR.join(buffer), buffer_metas, 0
+                    buffer, buffer_metas, buffer_len = [], [], 0
+                for piece in self.split_section(text):
+                    yield piece, [meta], self.chunk_overlap
+                continue
+
+            added_len = len(text) + (separator_len if buffer else 0)
+            if buffer_len + added_len > self.chunk_size:
+                yield SECTION_SEPARATOR.join(buffer), buffer_metas, 0
+                buffer, buffer_metas, buffer_len = [], [], 0
+                added_len = len(text)
+
+            buffer.append(text)
+            buffer_metas.append(meta)
+            buffer_len += added_len
+
+        if buffer:
+            yield SECTION_SEPARATOR.join(buffer), buffer_metas, 0
 
     def chunk_documents(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -106,8 +345,108 @@ class DocumentChunker:
         return all_chunks
 
 
-def create_chunker(chunk_size: int = 1000, chunk_overlap: int = 200) -> DocumentChunker:
+def hash_content(text: str) -> str:
+    """
+    Hash chunk text (BLAKE2b, 128-bit hex digest).
+    """
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+@lru_cache(maxsize=4096)
+def relative_source(source: str, root: Optional[str]) -> str:
+    """
+    Get the source path chunk ids are derived from: the path relative to
+    the input directory, so ids do not change with how the input directory
+    was spelled or with the working directory. Sources outside root (or
+    without a root) are used as given.
+    """
+    if root is None:
+        return source
+    try:
+        return Path(source).resolve().relative_to(Path(root).resolve()).as_posix()
+    except ValueError:
+        return source
+
+
+def make_chunk_id(source: str, content_hash: str, occurrence: int = 0) -> str:
+    """
+    Build a stable chunk id from the source path and chunk content hash.
+
+    The id does not depend on the chunk's position, so edits elsewhere in a
+    document leave it unchanged, and same-named files in different folders
+    never collide. occurrence disambiguates identical chunks in one source.
+
+    Args:
+        source: Source path of the document, relative to the input directory
+                (see relative_source)
+        content_hash: hash_content() of the chunk text
+        occurrence: 0 for the first identical chunk, 1 for the next, ...
+
+    Returns:
+        Hex chunk id
+    """
+    key = f"{source}\0{content_hash}"
+    if occurrence:
+        key += f"\0{occurrence}"
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def merge_provenance(section_metas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Collapse the metadata of the sections in one chunk into provenance spans.
+
+    Consecutive sections from the same origin (same header path, page or
+    sheet) are merged into one span, extending row_start/row_end ranges.
+
+    Args:
+        section_metas: Section metadata dicts in document order
+
+    Returns:
+        List of provenance span dicts
+    """
+    spans = []
+
+    for meta in section_metas:
+        if not meta:
+            continue
+
+        origin = {k: v for k, v in meta.items() if k not in RANGE_KEYS}
+
+        if spans:
+            last = spans[-1]
+            last_origin = {k: v for k, v in last.items() if k not in RANGE_KEYS}
+            if last_origin == origin:
+                if "row_end" in meta:
+                    last["row_end"] = max(last.get("row_end", meta["row_end"]), meta["row_end"])
+                continue
+
+        spans.append(dict(meta))
+
+    return spans
+
+
+def create_chunker(
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    chunk_filter: Optional[str] = None,
+    workers: int = 1,
+    source_root: Optional[str] = None
+) -> DocumentChunker:
     """
     Factory function to create a configured chunker.
+
+    Args:
+        chunk_size: Maximum size of each chunk
+        chunk_overlap: Overlap between chunks
+        chunk_filter: Low-information chunk action ('merge' or 'drop'), or
+                      None to keep every chunk
+        workers: Processes used to split a single huge text
+        source_root: Input directory that chunk ids are made relative to
     """
-    return DocumentChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return DocumentChunker(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        chunk_filter=ChunkFilter(chunk_filter) if chunk_filter else None,
+        workers=workers,
+        source_root=source_root
+    )
@@ -0,0 +1,246 @@
+"""
+RAG Preprocessor - Compact Chunk Utilities
+Offset-based chunk storage without duplicated overlap text.
+
+A CompactDocument keeps one copy of a document's chunked text plus, per
+chunk, its start/end offsets, id and hash. Overlapping chunks share the
+stored text, so the ~chunk_overlap characters each chunk repeats from its
+predecessor are stored once. ChunkRecord is a read-only mapping view that
+materializes 'content' and 'metadata' only when accessed, so code written
+against chunk dicts keeps working.
+"""
+
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterator, List, Optional
+
+
+COMPACT_VERSION = 1
+
+# Keys of a chunk dict, in output order
+CHUNK_KEYS = (
+    "chunk_id", "content_hash", "chunk_index", "total_chunks", "content",
+    "source", "filename", "file_type", "metadata"
+)
+
+
+class CompactDocument(Sequence):
+    """
+    All chunks of one document, stored as offsets into a single text.
+    - append() adds a chunk, storing only text the previous chunk lacks
+    - finish() freezes the text and records final document metadata
+    - Indexing yields ChunkRecord views; len() is the chunk count
+    """
+
+    __slots__ = (
+        "source", "filename", "file_type", "metadata", "chunk_size", "chunk_overlap",
+        "text", "offsets", "chunk_ids", "content_hashes", "provenance", "chunk_overlaps",
+        "_parts", "_length", "_tail"
+    )
+
+    def __init__(
+        self,
+        source: str,
+        filename: str,
+        file_type: str,
+        chunk_size: int,
+        chunk_overlap: int
+    ):
+        self.source = source
+        self.filename = filename
+        self.file_type = file_type
+        self.metadata: Dict[str, Any] = {}
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+        self.text = ""
+        self.offsets = array('Q')          # start, end per chunk
+        self.chunk_ids: List[str] = []
+        self.content_hashes: List[str] = []
+        self.provenance: List[Optional[List[Dict[str, Any]]]] = []
+        self.chunk_overlaps = array('I')     # overlap that applied to each chunk
+
+        self._parts: List[str] = []
+        self._length = 0
+        self._tail = ""
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return ChunkRecord(self, index)
+
+    def append(
+        self,
+        chunk_id: str,
+        content_hash: str,
+        content: str,
+        provenance: Optional[List[Dict[str, Any]]] = None,
+        chunk_overlap: Optional[int] = None
+    ) -> None:
+        """
+        Add the next chunk of the document.
+
+        The longest suffix of the previous chunk that starts this chunk is
+        shared instead of stored again. Only the last chunk_overlap
+        characters can overlap, and only positions holding the chunk's
+        first character are tried.
+        """
+        chunk_overlap = self.chunk_overlap if chunk_overlap is None else chunk_overlap
+        limit = min(len(self._tail), len(content), chunk_overlap)
+
+        overlap = 0
+        if limit:
+            tail = self._tail[-limit:]
+            i = tail.find(content[0])
+            while i != -1:
+                if tail.startswith(content[:limit - i], i):
+                    overlap = limit - i
+                    break
+                i = tail.find(content[0], i + 1)
+
+        start = self._length - overlap
+        self._parts.append(content[overlap:])
+        self._length += len(content) - overlap
+        self._tail = content
+
+        self.offsets.extend((start, start + len(content)))
+        self.chunk_ids.append(chunk_id)
+        self.content_hashes.append(content_hash)
+        self.provenance.append(provenance)
+        self.chunk_overlaps.append(chunk_overlap)
+
+    def finish(self, metadata: Dict[str, Any]) -> "CompactDocument":
+        """
+        Join the stored text and set the final document metadata.
+        """
+        self.text = "".join(self._parts)
+        self.metadata = dict(metadata)
+        self._parts = []
+        self._tail = ""
+        return self
+
+    def content_at(self, index: int) -> str:
+        return self.text[self.offsets[2 * index]:self.offsets[2 * index + 1]]
+
+    def metadata_at(self, index: int) -> Dict[str, Any]:
+        start, end = self.offsets[2 * index], self.offsets[2 * index + 1]
+        metadata = {
+            **self.metadata,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlaps[index],
+            "char_count": end - start
+        }
+        if self.provenance[index] is not None:
+            metadata["provenance"] = self.provenance[index]
+        return metadata
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        Serialize in compact form (shared text plus offsets).
+        """
+        return {
+            "compact_version": COMPACT_VERSION,
+            "source": self.source,
+            "filename": self.filename,
+            "file_type": self.file_type,
+            "metadata": self.metadata,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "text": self.text,
+            "offsets": self.offsets.tolist(),
+            "chunk_ids": self.chunk_ids,
+            "content_hashes": self.content_hashes,
+            "provenance": self.provenance,
+            "chunk_overlaps": self.chunk_overlaps.tolist()
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "CompactDocument":
+        """
+        Rebuild a document serialized with to_json().
+        """
+        document = cls(
+            data["source"], data["filename"], data["file_type"],
+            data["chunk_size"], data["chunk_overlap"]
+        )
+        document.metadata = data["metadata"]
+        document.text = data["text"]
+        document.offsets = array('Q', data["offsets"])
+        document.chunk_ids = data["chunk_ids"]
+        document.content_hashes = data["content_hashes"]
+        document.provenance = data["provenance"]
+        document.chunk_overlaps = array('I', data.get("chunk_overlaps", [data["chunk_overlap"]] * len(data["chunk_ids"])))
+        return document
+
+
+class ChunkRecord(Mapping):
+    """
+    Read-only chunk view over a CompactDocument.
+    Behaves like the chunk dict; dict(record) gives the full chunk.
+    """
+
+    __slots__ = ("document", "index")
+
+    def __init__(self, document: CompactDocument, index: int):
+        self.document = document
+        self.index = index
+
+    def __getitem__(self, key: str) -> Any:
+        document = self.document
+        if key == "chunk_id":
+            return document.chunk_ids[self.index]
+        if key == "content_hash":
+            return document.content_hashes[self.index]
+        if key == "chunk_index":
+            return self.index
+        if key == "total_chunks":
+            return len(document)
+        if key == "content":
+            return document.content_at(self.index)
+        if key == "source":
+            return document.source
+        if key == "filename":
+            return document.filename
+        if key == "file_type":
+            return document.file_type
+        if key == "metadata":
+            return document.metadata_at(self.index)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(CHUNK_KEYS)
+
+    def __len__(self) -> int:
+        return len(CHUNK_KEYS)
+
+    def __repr__(self) -> str:
+        return f"ChunkRecord({self.document.source!r}, {self.index})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self[key] for key in CHUNK_KEYS}
+
+
+def is_compact(data: Any) -> bool:
+    """
+    Check whether a decoded JSON value is a serialized CompactDocument.
+    """
+    return isinstance(data, dict) and "compact_version" in data
+
+
+def json_default(obj: Any) -> Any:
+    """
+    json.dump default hook: chunk records become plain chunk dicts, and
+    compact documents keep their compact form.
+    """
+    if isinstance(obj, ChunkRecord):
+        return obj.to_dict()
+    if isinstance(obj, CompactDocument):
+        return obj.to_json()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,76 @@
+"""
+RAG Preprocessor - Duplicate File Detection Utilities
+Finds byte-identical files so each unique payload is extracted only once.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+# Read size used when hashing file contents
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_file(file_path: str) -> str:
+    """
+    Compute a fast full-content hash of a file.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex digest (BLAKE2b, 128-bit)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def find_duplicates(files: List[str]) -> Tuple[List[str], Dict[str, List[str]]]:
+    """
+    Split files into unique payloads and their byte-identical aliases.
+
+    Files are bucketed by size first; only files that share a size with
+    another file are hashed. The first file of each payload (in discovery
+    order) is kept as the canonical copy.
+
+    Args:
+        files: File paths in discovery order
+
+    Returns:
+        Tuple of (unique_files, aliases) where aliases maps each canonical
+        path to the list of duplicate paths that were dropped
+    """
+    size_buckets: Dict[int, List[str]] = {}
+    for file_path in files:
+        size = Path(file_path).stat().st_size
+        size_buckets.setdefault(size, []).append(file_path)
+
+    canonical_of: Dict[str, str] = {}
+    for bucket in size_buckets.values():
+        if len(bucket) < 2:
+            continue
+
+        seen: Dict[str, str] = {}
+        for file_path in bucket:
+            content_hash = hash_file(file_path)
+            if content_hash in seen:
+                canonical_of[file_path] = seen[content_hash]
+            else:
+                seen[content_hash] = file_path
+
+    unique_files = []
+    aliases: Dict[str, List[str]] = {}
+    for file_path in files:
+        canonical = canonical_of.get(file_path)
+        if canonical is None:
+            unique_files.append(file_path)
+        else:
+            aliases.setdefault(canonical, []).append(file_path)
+
+    return unique_files, aliases
@@ -0,0 +1,67 @@
+"""
+RAG Preprocessor - Knowledge Base Delta Utilities
+Compares chunk ids against a previous run so vector stores only upsert changes.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Set
+
+from .sharding import iter_shard_chunks
+
+
+def load_chunk_ids(knowledge_base_file: str) -> Set[str]:
+    """
+    Load the chunk ids of a previously written knowledge base.
+
+    Args:
+        knowledge_base_file: Path to a knowledge_base.json or shard index
+
+    Returns:
+        Set of chunk ids (empty if the file does not exist)
+    """
+    path = Path(knowledge_base_file)
+
+    if not path.exists():
+        return set()
+
+    with open(path, 'r', encoding='utf-8') as f:
+        knowledge_base = json.load(f)
+
+    if "shards" in knowledge_base:
+        return {chunk["chunk_id"] for chunk in iter_shard_chunks(str(path))}
+
+    return {chunk["chunk_id"] for chunk in knowledge_base.get("chunks", [])}
+
+
+def compute_delta(previous_ids: Set[str], chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Classify chunk ids as added, removed or unchanged against a previous run.
+
+    Because chunk ids are derived from source path and content hash, an id
+    that exists in both runs refers to identical text from the same source.
+
+    Args:
+        previous_ids: Chunk ids of the previous run
+        chunks: Chunk dicts of the current run
+
+    Returns:
+        Delta dict with 'added', 'removed', 'unchanged' id lists and counts
+    """
+    current_ids = [chunk["chunk_id"] for chunk in chunks]
+    current_set = set(current_ids)
+
+    added = [chunk_id for chunk_id in current_ids if chunk_id not in previous_ids]
+    unchanged = [chunk_id for chunk_id in current_ids if chunk_id in previous_ids]
+    removed = sorted(previous_ids - current_set)
+
+    return {
+        "statistics": {
+            "added": len(added),
+            "removed": len(removed),
+            "unchanged": len(unchanged)
+        },
+        "added": added,
+        "removed": removed,
+        "unchanged": unchanged
+    }
@@ -0,0 +1,172 @@
+"""
+RAG Preprocessor - Embedding Cache Utilities
+Persistent SQLite cache of chunk vectors keyed by (embedder id, content hash).
+
+Chunk content hashes only change when chunk text changes, so an
+incremental run finds most vectors here and only embeds new text.
+Vectors are stored as float32 blobs; the least recently used entries are
+evicted once the cache grows past its size bound.
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+# Host parameters per bulk statement (SQLite's default limit is 999+)
+BULK_SIZE = 500
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding cache.
+    - get_many() / put_many() work in bulk, BULK_SIZE keys per statement
+    - Hits refresh the entry's last-used time
+    - evict() drops least recently used entries beyond max_bytes
+    - stats() reports hits, misses and hit rate for this session
+    """
+
+    def __init__(self, cache_file: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_file = Path(cache_file)
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+        self.conn = sqlite3.connect(str(self.cache_file))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " embedder TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (embedder, content_hash))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_many(self, embedder_id: str, content_hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up cached vectors.
+
+        Args:
+            embedder_id: Embedder the vectors must come from
+            content_hashes: Chunk content hashes to look up
+
+        Returns:
+            Dict of content_hash -> float32 vector for the hits
+        """
+        wanted = list(dict.fromkeys(content_hashes))
+        found: Dict[str, np.ndarray] = {}
+        now = time.time()
+
+        for batch in _batches(wanted):
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT content_hash, vector FROM embeddings"
+                f" WHERE embedder = ? AND content_hash IN ({placeholders})",
+                [embedder_id, *batch]
+            ).fetchall()
+            for content_hash, blob in rows:
+                found[content_hash] = np.frombuffer(blob, dtype=np.float32)
+
+            hit_hashes = [h for h in batch if h in found]
+            if hit_hashes:
+                self.conn.execute(
+                    f"UPDATE embeddings SET last_used = ?"
+                    f" WHERE embedder = ? AND content_hash IN ({','.join('?' * len(hit_hashes))})",
+                    [now, embedder_id, *hit_hashes]
+                )
+
+        self.conn.commit()
+        self.hits += len(found)
+        self.misses += len(wanted) - len(found)
+        return found
+
+    def put_many(self, embedder_id: str, items: Iterable[Tuple[str, Any]]) -> None:
+        """
+        Store vectors, then evict down to the size bound.
+
+        Args:
+            embedder_id: Embedder that produced the vectors
+            items: (content_hash, vector) pairs
+        """
+        now = time.time()
+        rows = [
+            (embedder_id, content_hash, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for content_hash, vector in items
+        ]
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (embedder, content_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+            rows
+        )
+        self.conn.commit()
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop least recently used entries until the cache fits in max_bytes.
+
+        Returns:
+            Number of entries evicted
+        """
+        total = self.size_bytes()
+        if total <= self.max_bytes:
+            return 0
+
+        doomed = []
+        cursor = self.conn.execute(
+            "SELECT embedder, content_hash, LENGTH(vector) FROM embeddings ORDER BY last_used"
+        )
+        for embedder_id, content_hash, size in cursor:
+            if total <= self.max_bytes:
+                break
+            doomed.append((embedder_id, content_hash))
+            total -= size
+        cursor.close()
+
+        self.conn.executemany("DELETE FROM embeddings WHERE embedder = ? AND content_hash = ?", doomed)
+        self.conn.commit()
+        self.evicted += len(doomed)
+        return len(doomed)
+
+    def size_bytes(self) -> int:
+        (total,) = self.conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counts for this session and the cache's current size.
+        """
+        (entries,) = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evicted": self.evicted,
+            "entries": entries,
+            "size_bytes": self.size_bytes()
+        }
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def _batches(items: List[str]) -> Iterable[List[str]]:
+    for start in range(0, len(items), BULK_SIZE):
+        yield items[start:start + BULK_SIZE]
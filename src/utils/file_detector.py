@@ -24,6 +24,21 @@ FILE_TYPE_MAP = {
 
     # Manus files (treated as markdown)
     '.manus': 'markdown',
+
+    # JSON records (e.g. FAQ exports)
+    '.json': 'json',
+    '.jsonl': 'json',
+    '.ndjson': 'json',
+
+    # HTML pages
+    '.html': 'html',
+    '.htm': 'html',
+
+    # Tabular exports (Parquet needs pyarrow)
+    '.csv': 'tabular',
+    '.tsv': 'tabular',
+    '.tab': 'tabular',
+    '.parquet': 'tabular',
 }
 
 
@@ -35,7 +50,7 @@ def detect_file_type(file_path: str) -> Optional[str]:
         file_path: Path to the file
 
     Returns:
-        File type string ('pdf', 'excel', 'markdown') or None if unsupported
+        File type string ('pdf', 'excel', 'markdown', 'json', 'html', 'tabular') or None if unsupported
     """
     path = Path(file_path)
     extension = path.suffix.lower()
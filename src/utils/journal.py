@@ -0,0 +1,122 @@
+"""
+RAG Preprocessor - Run Journal Utilities
+Write-ahead journal of completed files so a crashed run can be resumed.
+
+The journal is a JSONL file: a header line with the run fingerprint, then
+one line per completed file holding its full result (summary and chunks).
+Every line is flushed and fsync'ed before the next file starts, so after a
+crash at most the file in progress is lost. A torn last line is ignored.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .compact_chunks import json_default
+
+
+JOURNAL_VERSION = 1
+
+
+class RunJournal:
+    """
+    Append-only journal of completed file results for one pipeline run.
+    - open() starts a new journal, or continues one when resuming
+    - append() durably records a file result
+    - completed maps file paths to results recovered from a previous attempt
+    """
+
+    def __init__(self, journal_file: str, fingerprint: Dict[str, Any]):
+        self.journal_file = Path(journal_file)
+        self.fingerprint = fingerprint
+        self.completed: Dict[str, Dict[str, Any]] = {}
+        self._fh = None
+
+    def open(self, resume: bool = False) -> "RunJournal":
+        """
+        Open the journal for appending.
+
+        Args:
+            resume: Load results from an existing journal instead of
+                    starting over
+
+        Returns:
+            self
+
+        Raises:
+            ValueError: If the existing journal belongs to a run with a
+                        different configuration
+        """
+        self.completed = {}
+
+        if resume and self.journal_file.exists():
+            valid_bytes = self._load()
+            # Drop a torn trailing line so new records start on a clean line
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(valid_bytes)
+            self._fh = open(self.journal_file, 'a', encoding='utf-8')
+        else:
+            self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.journal_file, 'w', encoding='utf-8')
+            self._write_line({"journal_version": JOURNAL_VERSION, "fingerprint": self.fingerprint})
+
+        return self
+
+    def append(self, result: Dict[str, Any]) -> None:
+        """
+        Durably record a completed file result.
+        """
+        self._write_line(result)
+        self.completed[result["file_path"]] = result
+
+    def close(self) -> None:
+        """
+        Close the journal file. The journal is kept for a later resume.
+        """
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the journaled result for a file, if it completed earlier.
+        """
+        return self.completed.get(file_path)
+
+    def _write_line(self, record: Dict[str, Any]) -> None:
+        self._fh.write(json.dumps(record, ensure_ascii=False, default=json_default) + "\n")
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def _load(self) -> int:
+        """
+        Load completed results; returns the byte length of the intact prefix.
+        """
+        valid_bytes = 0
+
+        with open(self.journal_file, 'rb') as f:
+            header_line = f.readline()
+            try:
+                header = json.loads(header_line)
+            except json.JSONDecodeError:
+                header = None
+
+            if not header or header.get("fingerprint") != self.fingerprint:
+                raise ValueError(
+                    f"Journal {self.journal_file} was written by a run with a different "
+                    f"configuration; rerun without --resume to start over"
+                )
+            valid_bytes += len(header_line)
+
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                self.completed[result["file_path"]] = result
+                valid_bytes += len(line)
+
+        return valid_bytes
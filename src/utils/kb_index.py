@@ -0,0 +1,247 @@
+"""
+RAG Preprocessor - Knowledge Base Offset Index Utilities
+Writes chunks one per line with a binary offset index, and reads them lazily.
+
+Index file layout (little-endian):
+    header     magic (8s), chunk count (I), data file count (I)
+    files      per data file: name length (H), UTF-8 name
+    buckets    65537 x I: start of each 16-bit key prefix in the key table
+    positions  per chunk in pipeline order: file number (H), offset (Q), length (I)
+    keys       per chunk sorted by key: key (16s), position (I)
+
+Keys are BLAKE2b-128 digests of chunk ids, so the bucket table splits them
+evenly and a lookup only scans a handful of records.
+"""
+
+import hashlib
+import json
+import mmap
+import struct
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .compact_chunks import json_default
+
+
+INDEX_MAGIC = b"KBIDX001"
+HEADER_STRUCT = struct.Struct("<8sII")
+NAME_LENGTH_STRUCT = struct.Struct("<H")
+BUCKET_STRUCT = struct.Struct("<I")
+POSITION_STRUCT = struct.Struct("<HQI")
+KEY_STRUCT = struct.Struct("<16sI")
+
+BUCKET_COUNT = 1 << 16
+
+
+def index_path_for(output_file: str) -> Path:
+    """
+    Get the offset index path that belongs next to an output file.
+    """
+    return Path(output_file).with_suffix(".idx")
+
+
+def _chunk_key(chunk_id: str) -> bytes:
+    """
+    Map a chunk id to a fixed-width, uniformly distributed index key.
+    """
+    return hashlib.blake2b(chunk_id.encode('utf-8'), digest_size=16).digest()
+
+
+def write_indexed_json(knowledge_base: Dict[str, Any], output_file: str) -> List[Tuple[int, int, int]]:
+    """
+    Write a knowledge base as valid JSON with one chunk object per line.
+
+    The result still loads with json.load; metadata stays pretty-printed,
+    while each chunk occupies a single line so it can be located by offset.
+
+    Args:
+        knowledge_base: Dict with 'metadata' and 'chunks'
+        output_file: Path to write
+
+    Returns:
+        List of (file_number, offset, length) per chunk, file_number always 0
+    """
+    metadata_json = json.dumps(knowledge_base["metadata"], indent=2, ensure_ascii=False)
+    head = '{\n  "metadata": ' + metadata_json.replace("\n", "\n  ") + ',\n  "chunks": [\n'
+
+    entries = []
+    chunks = knowledge_base["chunks"]
+
+    with open(output_file, 'wb') as f:
+        offset = f.write(head.encode('utf-8'))
+
+        for position, chunk in enumerate(chunks):
+            line = json.dumps(chunk, ensure_ascii=False, default=json_default).encode('utf-8')
+            f.write(line)
+            entries.append((0, offset, len(line)))
+            offset += len(line)
+            offset += f.write(b",\n" if position < len(chunks) - 1 else b"\n")
+
+        f.write(b"  ]\n}\n")
+
+    return entries
+
+
+def write_offset_index(
+    index_file: str,
+    data_files: List[str],
+    chunk_ids: List[str],
+    entries: List[Tuple[int, int, int]]
+) -> None:
+    """
+    Write a binary offset index for chunks stored one per line.
+
+    Args:
+        index_file: Path of the index to write
+        data_files: Data file names, relative to the index directory
+        chunk_ids: Chunk ids in pipeline order
+        entries: (file_number, offset, length) per chunk, same order
+    """
+    keys = sorted((_chunk_key(chunk_id), position) for position, chunk_id in enumerate(chunk_ids))
+
+    # Cumulative start of each 16-bit prefix in the sorted key table
+    buckets = [0] * (BUCKET_COUNT + 1)
+    for key, _ in keys:
+        buckets[int.from_bytes(key[:2], 'big') + 1] += 1
+    for prefix in range(BUCKET_COUNT):
+        buckets[prefix + 1] += buckets[prefix]
+
+    with open(index_file, 'wb') as f:
+        f.write(HEADER_STRUCT.pack(INDEX_MAGIC, len(chunk_ids), len(data_files)))
+
+        for name in data_files:
+            encoded = name.encode('utf-8')
+            f.write(NAME_LENGTH_STRUCT.pack(len(encoded)))
+            f.write(encoded)
+
+        f.write(struct.pack(f"<{BUCKET_COUNT + 1}I", *buckets))
+
+        for entry in entries:
+            f.write(POSITION_STRUCT.pack(*entry))
+
+        for key, position in keys:
+            f.write(KEY_STRUCT.pack(key, position))
+
+
+class KnowledgeBaseReader:
+    """
+    Random-access reader for a knowledge base with an offset index.
+    - Memory-maps the index and data files; nothing is parsed up front
+    - Looks up a chunk by id via the 16-bit bucket table (O(1) expected)
+    - Decodes single chunks or position ranges on demand
+    """
+
+    def __init__(self, index_file: str):
+        self.index_file = Path(index_file)
+        self._index_fh = open(self.index_file, 'rb')
+        self._index = mmap.mmap(self._index_fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.chunk_count, file_count = HEADER_STRUCT.unpack_from(self._index, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"Not a knowledge base index: {index_file}")
+
+        offset = HEADER_STRUCT.size
+        self.data_files = []
+        for _ in range(file_count):
+            (name_length,) = NAME_LENGTH_STRUCT.unpack_from(self._index, offset)
+            offset += NAME_LENGTH_STRUCT.size
+            self.data_files.append(self._index[offset:offset + name_length].decode('utf-8'))
+            offset += name_length
+
+        self._buckets_offset = offset
+        self._positions_offset = offset + (BUCKET_COUNT + 1) * BUCKET_STRUCT.size
+        self._keys_offset = self._positions_offset + self.chunk_count * POSITION_STRUCT.size
+
+        # Data files are mapped on first access
+        self._data_maps: Dict[int, mmap.mmap] = {}
+        self._data_fhs = []
+
+    def __len__(self) -> int:
+        return self.chunk_count
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return self._find_position(chunk_id) is not None
+
+    def __getitem__(self, chunk_id: str) -> Dict[str, Any]:
+        chunk = self.get(chunk_id)
+        if chunk is None:
+            raise KeyError(chunk_id)
+        return chunk
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for position in range(self.chunk_count):
+            yield self.get_at(position)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, chunk_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Decode the chunk with the given id, or None if it is not indexed.
+        """
+        position = self._find_position(chunk_id)
+        if position is None:
+            return None
+        return self.get_at(position)
+
+    def get_at(self, position: int) -> Dict[str, Any]:
+        """
+        Decode the chunk at a pipeline-order position.
+        """
+        if not 0 <= position < self.chunk_count:
+            raise IndexError(position)
+
+        file_number, offset, length = POSITION_STRUCT.unpack_from(
+            self._index, self._positions_offset + position * POSITION_STRUCT.size
+        )
+        data = self._data_map(file_number)
+        return json.loads(data[offset:offset + length])
+
+    def get_range(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        """
+        Decode the chunks at pipeline-order positions [start, stop).
+        """
+        start = max(0, start)
+        stop = min(stop, self.chunk_count)
+        return [self.get_at(position) for position in range(start, stop)]
+
+    def close(self) -> None:
+        """
+        Release all memory maps and file handles.
+        """
+        for data in self._data_maps.values():
+            data.close()
+        for fh in self._data_fhs:
+            fh.close()
+        self._data_maps = {}
+        self._data_fhs = []
+        self._index.close()
+        self._index_fh.close()
+
+    def _find_position(self, chunk_id: str) -> Optional[int]:
+        """
+        Find a chunk's position via its key bucket.
+        """
+        key = _chunk_key(chunk_id)
+        prefix = int.from_bytes(key[:2], 'big')
+        lo, hi = struct.unpack_from("<2I", self._index, self._buckets_offset + prefix * BUCKET_STRUCT.size)
+
+        bucket_keys = [self._key_at(i)[0] for i in range(lo, hi)]
+        found = bisect_left(bucket_keys, key)
+        if found < len(bucket_keys) and bucket_keys[found] == key:
+            return self._key_at(lo + found)[1]
+        return None
+
+    def _key_at(self, i: int) -> Tuple[bytes, int]:
+        return KEY_STRUCT.unpack_from(self._index, self._keys_offset + i * KEY_STRUCT.size)
+
+    def _data_map(self, file_number: int) -> mmap.mmap:
+        if file_number not in self._data_maps:
+            fh = open(self.index_file.parent / self.data_files[file_number], 'rb')
+            self._data_fhs.append(fh)
+            self._data_maps[file_number] = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._data_maps[file_number]
@@ -0,0 +1,291 @@
+"""
+RAG Preprocessor - SQLite Knowledge Base Utilities
+Keeps a SQLite copy of the knowledge base with an FTS5 keyword index.
+
+Tables:
+    documents   one row per source file (status, error, aliases)
+    chunks      one row per chunk, keyed by chunk id
+    chunks_fts  FTS5 index over chunk content, kept in sync by triggers
+
+Each run is applied file by file: a file whose chunk ids are unchanged is
+not touched, otherwise only its removed chunks are deleted and its new
+chunks inserted, in one transaction per file. Chunk ids do not depend on
+how the input directory was spelled, so a file that reappears under a
+different source path takes over its old rows instead of being re-inserted.
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .compact_chunks import json_default
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    source TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    file_type TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    chunk_count INTEGER NOT NULL,
+    aliases TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS chunks (
+    chunk_id TEXT PRIMARY KEY,
+    source TEXT NOT NULL REFERENCES documents (source) ON DELETE CASCADE,
+    chunk_index INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    content TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS chunks_source ON chunks (source, chunk_index);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5 (
+    content, content='chunks', content_rowid='rowid'
+);
+
+CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
+    INSERT INTO chunks_fts (rowid, content) VALUES (new.rowid, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
+    INSERT INTO chunks_fts (chunks_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+END;
+"""
+
+# Rows per executemany() call
+INSERT_BATCH_SIZE = 1000
+
+
+class KnowledgeBaseDB:
+    """
+    SQLite knowledge base with per-file incremental upserts.
+    - sync() applies a whole knowledge base dict, one transaction per file
+    - upsert_file() applies one file's summary and chunks
+    - search() runs an FTS5 keyword query ranked by BM25
+    """
+
+    def __init__(self, db_file: str):
+        self.db_file = Path(db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+
+        # Autocommit mode; transactions are opened explicitly per file
+        self.conn = sqlite3.connect(str(self.db_file), isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def sync(self, knowledge_base: Dict[str, Any], remove_missing: bool = True) -> Dict[str, int]:
+        """
+        Bring the database in line with a knowledge base dict.
+
+        Args:
+            knowledge_base: Dict with 'metadata' (file_summaries) and 'chunks'
+            remove_missing: Delete documents that are not in this knowledge base
+
+        Returns:
+            Dict of files_upserted, files_unchanged, files_removed,
+            chunks_inserted and chunks_deleted
+        """
+        stats = {
+            "files_upserted": 0,
+            "files_unchanged": 0,
+            "files_removed": 0,
+            "chunks_inserted": 0,
+            "chunks_deleted": 0
+        }
+
+        chunks_by_source: Dict[str, List[Any]] = {}
+        for chunk in knowledge_base["chunks"]:
+            chunks_by_source.setdefault(chunk["source"], []).append(chunk)
+
+        summaries = knowledge_base["metadata"]["file_summaries"]
+        sources = {summary["source"] for summary in summaries}
+        known = {source for (source,) in self.conn.execute("SELECT source FROM documents")}
+        for summary in summaries:
+            chunks = chunks_by_source.get(summary["source"])
+            if summary["source"] not in known and chunks:
+                self._move_source(chunks[0]["chunk_id"], summary["source"], sources)
+
+        for summary in summaries:
+            inserted, deleted = self.upsert_file(summary, chunks_by_source.get(summary["source"], []))
+            if inserted is None:
+                stats["files_unchanged"] += 1
+            else:
+                stats["files_upserted"] += 1
+                stats["chunks_inserted"] += inserted
+                stats["chunks_deleted"] += deleted
+
+        if remove_missing:
+            stale = [
+                source for (source,) in self.conn.execute("SELECT source FROM documents")
+                if source not in sources
+            ]
+            for source in stale:
+                with self._transaction():
+                    self.conn.execute("DELETE FROM chunks WHERE source = ?", (source,))
+                    self.conn.execute("DELETE FROM documents WHERE source = ?", (source,))
+            stats["files_removed"] = len(stale)
+
+        return stats
+
+    def upsert_file(self, summary: Dict[str, Any], chunks: List[Any]) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Apply one file's summary and chunks in a single transaction.
+
+        Args:
+            summary: file_summaries entry for the file
+            chunks: The file's chunks in order
+
+        Returns:
+            Tuple of (chunks inserted, chunks deleted), or (None, None) if
+            the file was already up to date
+        """
+        source = summary["source"]
+        document_row = (
+            source,
+            summary["filename"],
+            summary.get("file_type"),
+            summary["status"],
+            summary.get("error"),
+            len(chunks),
+            json.dumps(summary.get("aliases", []), ensure_ascii=False)
+        )
+
+        existing_doc = self.conn.execute(
+            "SELECT source, filename, file_type, status, error, chunk_count, aliases"
+            " FROM documents WHERE source = ?",
+            (source,)
+        ).fetchone()
+        existing = dict(self.conn.execute(
+            "SELECT chunk_id, chunk_index FROM chunks WHERE source = ?", (source,)
+        ).fetchall())
+
+        new_ids = [chunk["chunk_id"] for chunk in chunks]
+        if existing_doc == document_row and existing == {chunk_id: i for i, chunk_id in enumerate(new_ids)}:
+            return None, None
+
+        new_id_set = set(new_ids)
+        removed = [chunk_id for chunk_id in existing if chunk_id not in new_id_set]
+        added = [chunk for chunk in chunks if chunk["chunk_id"] not in existing]
+        moved = [
+            (chunk["chunk_index"], chunk["chunk_id"]) for chunk in chunks
+            if chunk["chunk_id"] in existing and existing[chunk["chunk_id"]] != chunk["chunk_index"]
+        ]
+
+        with self._transaction():
+            self.conn.execute(
+                "INSERT INTO documents (source, filename, file_type, status, error, chunk_count, aliases, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (source) DO UPDATE SET filename = excluded.filename,"
+                " file_type = excluded.file_type, status = excluded.status, error = excluded.error,"
+                " chunk_count = excluded.chunk_count, aliases = excluded.aliases,"
+                " updated_at = excluded.updated_at",
+                (*document_row, datetime.now().isoformat())
+            )
+
+            for start in range(0, len(removed), INSERT_BATCH_SIZE):
+                self.conn.executemany(
+                    "DELETE FROM chunks WHERE chunk_id = ?",
+                    [(chunk_id,) for chunk_id in removed[start:start + INSERT_BATCH_SIZE]]
+                )
+
+            self.conn.executemany("UPDATE chunks SET chunk_index = ? WHERE chunk_id = ?", moved)
+
+            for start in range(0, len(added), INSERT_BATCH_SIZE):
+                self.conn.executemany(
+                    "INSERT INTO chunks (chunk_id, source, chunk_index, content_hash, content, metadata)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            chunk["chunk_id"],
+                            source,
+                            chunk["chunk_index"],
+                            chunk["content_hash"],
+                            chunk["content"],
+                            json.dumps(chunk["metadata"], ensure_ascii=False, default=json_default)
+                        )
+                        for chunk in added[start:start + INSERT_BATCH_SIZE]
+                    ]
+                )
+
+        return len(added), len(removed)
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Keyword search over chunk content, best matches first.
+
+        Args:
+            query: FTS5 query (plain words are AND-ed)
+            limit: Maximum number of results
+
+        Returns:
+            List of dicts with chunk_id, source, chunk_index, score and snippet
+        """
+        rows = self.conn.execute(
+            "SELECT c.chunk_id, c.source, c.chunk_index, bm25(chunks_fts) AS score,"
+            " snippet(chunks_fts, 0, '[', ']', '...', 16)"
+            " FROM chunks_fts JOIN chunks c ON c.rowid = chunks_fts.rowid"
+            " WHERE chunks_fts MATCH ? ORDER BY score LIMIT ?",
+            (query, limit)
+        ).fetchall()
+
+        return [
+            {"chunk_id": chunk_id, "source": source, "chunk_index": chunk_index, "score": score, "snippet": snippet}
+            for chunk_id, source, chunk_index, score, snippet in rows
+        ]
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _move_source(self, chunk_id: str, source: str, live_sources: set) -> None:
+        """
+        Re-key the document that already holds chunk_id to source, unless
+        that document is itself still part of the knowledge base.
+        """
+        row = self.conn.execute("SELECT source FROM chunks WHERE chunk_id = ?", (chunk_id,)).fetchone()
+        if not row or row[0] in live_sources:
+            return
+
+        with self._transaction():
+            self.conn.execute(
+                "INSERT INTO documents (source, filename, file_type, status, error, chunk_count, aliases, updated_at)"
+                " SELECT ?, filename, file_type, status, error, chunk_count, aliases, updated_at"
+                " FROM documents WHERE source = ?",
+                (source, row[0])
+            )
+            self.conn.execute("UPDATE chunks SET source = ? WHERE source = ?", (source, row[0]))
+            self.conn.execute("DELETE FROM documents WHERE source = ?", (row[0],))
+
+    def _transaction(self):
+        return _Transaction(self.conn)
+
+
+class _Transaction:
+    """
+    BEGIN/COMMIT around a block, ROLLBACK on error.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN")
+        return self.conn
+
+    def __exit__(self, exc_type, *exc_info):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
@@ -0,0 +1,257 @@
+"""
+RAG Preprocessor - Pipeline Metrics Utilities
+Counters, gauges and histograms exported in Prometheus text format, either
+over a local HTTP endpoint during a run or as a textfile at the end.
+"""
+
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# Extraction latency buckets in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Error message fragments mapped to error kinds
+ERROR_KIND_PATTERNS = (
+    ("timed out", "timeout"),
+    ("memory limit", "memory_limit"),
+    ("worker crashed", "crash"),
+    ("encrypted", "encrypted"),
+    ("corrupt", "corrupt"),
+    ("empty file", "empty"),
+    ("unreadable", "unreadable"),
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def classify_error(error: str) -> str:
+    """
+    Map an error message to a short error kind for the errors counter.
+    Falls back to the exception name prefix ('ValueError: ...') or 'other'.
+    """
+    lower = error.lower()
+    for fragment, kind in ERROR_KIND_PATTERNS:
+        if fragment in lower:
+            return kind
+
+    match = re.match(r"^([A-Za-z_][A-Za-z0-9_]*(Error|Exception)):", error)
+    return match.group(1) if match else "other"
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic counter with labels.
+    """
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """
+    Gauge with labels (a value that can go up and down).
+    """
+
+    def set(self, value: float, **labels) -> None:
+        self.values[_label_key(labels)] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with labels.
+    """
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self.values: Dict[LabelKey, Dict[str, Any]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        series = self.values.setdefault(key, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series["counts"][i] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.values.items()):
+            for bound, count in zip(self.buckets, series["counts"]):
+                labels = _format_labels(key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+
+class PipelineMetrics:
+    """
+    Metrics registry for one pipeline run.
+    - Per-file-type counters for files, chunks and bytes read
+    - Extraction latency histogram per file type
+    - Errors by kind, pending-file queue depth, run throughput gauges
+    Thread-safe: observations and rendering may happen on different threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+        self.files_total = Counter("rag_files_processed_total", "Files extracted and chunked successfully.")
+        self.chunks_total = Counter("rag_chunks_created_total", "Chunks created.")
+        self.bytes_total = Counter("rag_bytes_read_total", "Input bytes read by extraction.")
+        self.errors_total = Counter("rag_errors_total", "Files that failed, by error kind.")
+        self.resumed_total = Counter("rag_files_resumed_total", "Files replayed from the run journal.")
+        self.latency = Histogram("rag_extraction_seconds", "Per-file extraction and chunking latency.", LATENCY_BUCKETS)
+        self.pending = Gauge("rag_files_pending", "Files discovered but not yet processed.")
+        self.files_rate = Gauge("rag_files_per_second", "Average files per second since run start.")
+        self.chunks_rate = Gauge("rag_chunks_per_second", "Average chunks per second since run start.")
+        self.duration = Gauge("rag_run_duration_seconds", "Seconds since run start.")
+
+    def set_pending(self, count: int) -> None:
+        with self._lock:
+            self.pending.set(count)
+
+    def observe_result(self, result: Dict[str, Any]) -> None:
+        """
+        Record one file result from the pipeline.
+        """
+        with self._lock:
+            self.pending.set(max(0, self.pending.values.get((), 0) - 1))
+
+            if result.get("resumed"):
+                self.resumed_total.inc()
+                return
+
+            file_type = result.get("file_type") or "unknown"
+            self.bytes_total.inc(result.get("bytes_read", 0), file_type=file_type)
+
+            if "elapsed_seconds" in result:
+                self.latency.observe(result["elapsed_seconds"], file_type=file_type)
+
+            if result["status"] == "success":
+                self.files_total.inc(file_type=file_type)
+                self.chunks_total.inc(len(result["chunks"]), file_type=file_type)
+            else:
+                self.errors_total.inc(kind=result.get("error_kind") or classify_error(result["error"] or ""))
+
+    def render(self) -> str:
+        """
+        Render all metrics in Prometheus text exposition format.
+        """
+        with self._lock:
+            elapsed = max(time.time() - self.started_at, 1e-9)
+            self.duration.set(elapsed)
+            for key, value in self.files_total.values.items():
+                self.files_rate.set(value / elapsed, **dict(key))
+            for key, value in self.chunks_total.values.items():
+                self.chunks_rate.set(value / elapsed, **dict(key))
+
+            lines = []
+            for metric in (
+                self.files_total, self.chunks_total, self.bytes_total, self.errors_total,
+                self.resumed_total, self.latency, self.pending, self.files_rate,
+                self.chunks_rate, self.duration
+            ):
+                lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """
+        Atomically write metrics for the node_exporter textfile collector.
+        """
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + f".{os.getpid()}.tmp")
+        tmp.write_text(self.render(), encoding='utf-8')
+        os.replace(tmp, target)
+
+
+class MetricsServer:
+    """
+    Background HTTP server exposing /metrics for a PipelineMetrics registry.
+    """
+
+    def __init__(self, metrics: PipelineMetrics, port: int, host: str = "127.0.0.1"):
+        self.metrics = metrics
+
+        registry = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self) -> "MetricsServer":
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
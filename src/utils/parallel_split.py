@@ -0,0 +1,225 @@
+"""
+RAG Preprocessor - Parallel Text Splitting Utilities
+Splits one huge text on several processes with output identical to
+RecursiveCharacterTextSplitter.split_text().
+
+The splitter's top level splits the text on its first matching separator,
+then either merges runs of small pieces into overlapping chunks or recurses
+into pieces that are too large on their own. Those large pieces and the
+runs between them are already independent. A long run is cut further at
+points where the serial merge flushes a chunk: right after a flush, the
+merge window holds only the overlap tail, and that tail is the same no
+matter where merging started. A span that starts at that tail therefore
+reproduces the serial chunks exactly, and the span before it ends with the
+very chunk the serial flush would have produced.
+
+Spans are planned with the splitter's own helpers and attributes, so the
+split points and chunk text match serial splitting for the same splitter.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, repeat
+from operator import add
+from typing import Any, List, Tuple
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_text_splitters.character import _split_text_with_regex
+
+
+# Texts shorter than this are split serially
+PARALLEL_MIN_CHARS = 4 * 1024 * 1024
+
+# Work units are grouped into batches of about total_chars / (workers * BATCHES_PER_WORKER),
+# but never smaller than MIN_BATCH_CHARS
+BATCHES_PER_WORKER = 4
+MIN_BATCH_CHARS = 256 * 1024
+
+# A plan unit is one of:
+#   ("merge", splits, separator)   -> splitter._merge_splits(splits, separator)
+#   ("split", text, separators)    -> splitter._split_text(text, separators)
+#   ("chunk", text)                -> [text]
+Unit = Tuple[Any, ...]
+
+
+def plan_split(splitter: RecursiveCharacterTextSplitter, text: str, span_chars: int) -> List[Unit]:
+    """
+    Plan a split_text() call as independent units in output order.
+
+    Args:
+        splitter: Splitter whose output must be reproduced
+        text: Text to split
+        span_chars: Approximate size of each unit in characters
+
+    Returns:
+        List of plan units; concatenating their outputs gives split_text(text)
+    """
+    units: List[Unit] = []
+    _plan_text(splitter, text, splitter._separators, span_chars, units)
+    return units
+
+
+def run_units(splitter: RecursiveCharacterTextSplitter, units: List[Unit]) -> List[str]:
+    """
+    Run plan units in order and concatenate their chunks.
+    Kept at module level so it can run in a worker process.
+    """
+    chunks: List[str] = []
+    for unit in units:
+        if unit[0] == "merge":
+            chunks.extend(splitter._merge_splits(unit[1], unit[2]))
+        elif unit[0] == "split":
+            chunks.extend(splitter._split_text(unit[1], unit[2]))
+        else:
+            chunks.append(unit[1])
+    return chunks
+
+
+def split_text_parallel(
+    splitter: RecursiveCharacterTextSplitter,
+    text: str,
+    workers: int
+) -> List[str]:
+    """
+    Split a text on several processes, with the same result as
+    splitter.split_text(text).
+
+    Args:
+        splitter: Configured recursive splitter
+        text: Text to split
+        workers: Number of worker processes
+
+    Returns:
+        List of chunk strings
+    """
+    span_chars = max(MIN_BATCH_CHARS, len(text) // (max(workers, 1) * BATCHES_PER_WORKER))
+    batches = _batch_units(plan_split(splitter, text, span_chars), span_chars)
+
+    if workers <= 1 or len(batches) <= 1:
+        return [chunk for batch in batches for chunk in run_units(splitter, batch)]
+
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(batches)))
+    try:
+        futures = [pool.submit(run_units, splitter, batch) for batch in batches]
+        return [chunk for future in futures for chunk in future.result()]
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def _plan_text(
+    splitter: RecursiveCharacterTextSplitter,
+    text: str,
+    separators: List[str],
+    span_chars: int,
+    units: List[Unit]
+) -> None:
+    """
+    Mirror RecursiveCharacterTextSplitter._split_text(), emitting units
+    instead of chunks. Large pieces are planned recursively.
+    """
+    # Same separator choice as the splitter
+    separator = separators[-1]
+    new_separators: List[str] = []
+    for i, candidate in enumerate(separators):
+        pattern = candidate if splitter._is_separator_regex else re.escape(candidate)
+        if not candidate:
+            separator = candidate
+            break
+        if re.search(pattern, text):
+            separator = candidate
+            new_separators = separators[i + 1:]
+            break
+
+    pattern = separator if splitter._is_separator_regex else re.escape(separator)
+    splits = _split_text_with_regex(text, pattern, keep_separator=splitter._keep_separator)
+    merge_separator = "" if splitter._keep_separator else separator
+
+    # Pieces at least chunk_size long end a merge run and are split on their own
+    lengths = list(map(splitter._length_function, splits))
+    chunk_size = splitter._chunk_size
+    large = []
+    if max(lengths, default=0) >= chunk_size:
+        large = [idx for idx, piece_len in enumerate(lengths) if piece_len >= chunk_size]
+
+    run_start = 0
+    for idx in large:
+        if idx > run_start:
+            _plan_merge(splitter, splits[run_start:idx], lengths[run_start:idx], merge_separator, span_chars, units)
+        run_start = idx + 1
+
+        piece = splits[idx]
+        if not new_separators:
+            units.append(("chunk", piece))
+        elif len(piece) > span_chars:
+            _plan_text(splitter, piece, new_separators, span_chars, units)
+        else:
+            units.append(("split", piece, new_separators))
+
+    if run_start < len(splits):
+        _plan_merge(splitter, splits[run_start:], lengths[run_start:], merge_separator, span_chars, units)
+
+
+def _plan_merge(
+    splitter: RecursiveCharacterTextSplitter,
+    splits: List[str],
+    lengths: List[int],
+    separator: str,
+    span_chars: int,
+    units: List[Unit]
+) -> None:
+    """
+    Cut one _merge_splits() run into spans at serial flush points.
+
+    Follows the merge window of TextSplitter._merge_splits() from flush to
+    flush with binary searches over cumulative piece lengths, so planning
+    costs one step per chunk rather than per piece. Once a span is long
+    enough, it ends at the next flush, and the next span starts at the
+    window left after that flush (the overlap tail).
+    """
+    chunk_size = splitter._chunk_size
+    chunk_overlap = splitter._chunk_overlap
+    separator_len = splitter._length_function(separator)
+
+    # A window splits[a:b] measures offsets[b] - offsets[a] - separator_len
+    offsets = list(accumulate(map(add, lengths, repeat(separator_len, len(lengths))), initial=0))
+
+    window_start = 0
+    span_start = 0
+    while True:
+        # First piece that no longer fits after the window flushes it
+        idx = bisect_right(offsets, offsets[window_start] + chunk_size + separator_len) - 1
+        if idx >= len(splits):
+            break
+
+        # The merge then pops pieces until the window is within the overlap
+        # and leaves room for the piece
+        keep_from = max(offsets[idx] - separator_len - chunk_overlap, offsets[idx] + lengths[idx] - chunk_size)
+        window_start = bisect_left(offsets, keep_from, window_start, idx)
+
+        if offsets[idx] - offsets[span_start] >= span_chars:
+            units.append(("merge", splits[span_start:idx], separator))
+            span_start = window_start
+
+    units.append(("merge", splits[span_start:], separator))
+
+
+def _batch_units(units: List[Unit], batch_chars: int) -> List[List[Unit]]:
+    """
+    Group consecutive units into batches of about batch_chars characters,
+    so small units do not each cost a round trip to a worker.
+    """
+    batches: List[List[Unit]] = []
+    batch: List[Unit] = []
+    batch_len = 0
+
+    for unit in units:
+        batch.append(unit)
+        batch_len += sum(len(piece) for piece in unit[1]) if unit[0] == "merge" else len(unit[1])
+        if batch_len >= batch_chars:
+            batches.append(batch)
+            batch, batch_len = [], 0
+
+    if batch:
+        batches.append(batch)
+    return batches
@@ -0,0 +1,200 @@
+"""
+RAG Preprocessor - Extraction Sandbox Utilities
+Fast-fails unreadable files and runs extractions in isolated worker processes.
+"""
+
+import multiprocessing
+import zipfile
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:  # Windows has no address-space limits
+    HAS_RESOURCE = False
+
+
+# Default worker limits
+DEFAULT_TIMEOUT = 300          # seconds per file
+DEFAULT_MEMORY_LIMIT_MB = 2048  # address-space limit per worker
+
+# File signatures used by the pre-scan
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+# How much of the end of a PDF to search for the EOF marker
+PDF_TAIL_BYTES = 2048
+
+
+class SandboxError(Exception):
+    """
+    Raised when a file is rejected by the pre-scan or its worker fails.
+    The message is the reason recorded in the pipeline's file summaries.
+    """
+
+
+def prescan_file(file_path: str, file_type: str) -> Optional[str]:
+    """
+    Cheaply check a file before the expensive extraction engines run.
+
+    Only signatures, trailers and container headers are read, so this is
+    fast even for very large files.
+
+    Args:
+        file_path: Path to the file
+        file_type: Detected file type ('pdf', 'excel', 'markdown', ...)
+
+    Returns:
+        Reason string if the file should be skipped, otherwise None
+    """
+    path = Path(file_path)
+
+    try:
+        size = path.stat().st_size
+    except OSError as e:
+        return f"unreadable: {e}"
+
+    if size == 0:
+        return "empty file"
+
+    with open(path, 'rb') as f:
+        head = f.read(8)
+        if file_type == 'pdf':
+            f.seek(max(0, size - PDF_TAIL_BYTES))
+            tail = f.read()
+
+    if file_type == 'pdf':
+        return _prescan_pdf(path, head, tail)
+
+    if file_type == 'excel':
+        return _prescan_excel(path, head)
+
+    return None
+
+
+def _prescan_pdf(path: Path, head: bytes, tail: bytes) -> Optional[str]:
+    """
+    Check PDF signature, EOF marker and encryption.
+    """
+    if not head.startswith(PDF_MAGIC):
+        return "corrupt PDF: missing %PDF- header"
+
+    if b"%%EOF" not in tail:
+        return "corrupt PDF: missing %%EOF trailer (truncated file?)"
+
+    # Opening with PyMuPDF only parses the xref, not page content
+    import fitz
+
+    try:
+        with fitz.open(path) as doc:
+            if doc.needs_pass:
+                return "encrypted PDF: password required"
+            if doc.page_count == 0:
+                return "corrupt PDF: no pages"
+    except Exception as e:
+        return f"corrupt PDF: {e}"
+
+    return None
+
+
+def _prescan_excel(path: Path, head: bytes) -> Optional[str]:
+    """
+    Check the container format of an Excel workbook.
+    """
+    extension = path.suffix.lower()
+
+    if extension == '.xls':
+        if not head.startswith(OLE_MAGIC):
+            return "corrupt Excel: missing OLE2 header"
+        return None
+
+    # .xlsx/.xlsm are zip packages; password-protected ones are OLE2 containers
+    if head.startswith(OLE_MAGIC):
+        return "encrypted Excel: password-protected workbook"
+
+    if not head.startswith(ZIP_MAGIC):
+        return "corrupt Excel: not a zip package"
+
+    try:
+        with zipfile.ZipFile(path) as archive:
+            if "[Content_Types].xml" not in archive.namelist():
+                return "corrupt Excel: missing [Content_Types].xml"
+    except zipfile.BadZipFile as e:
+        return f"corrupt Excel: {e}"
+
+    return None
+
+
+def _worker_main(conn, target: Callable, args: Tuple, memory_limit_mb: Optional[int]):
+    """
+    Worker process entry point: apply limits, run target, send the result back.
+    """
+    if memory_limit_mb and HAS_RESOURCE:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    try:
+        result = target(*args)
+        conn.send(("ok", result))
+    except MemoryError:
+        conn.send(("error", f"memory limit exceeded ({memory_limit_mb} MB)"))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def run_isolated(
+    target: Callable,
+    args: Tuple = (),
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    memory_limit_mb: Optional[int] = DEFAULT_MEMORY_LIMIT_MB
+) -> Any:
+    """
+    Run target(*args) in a separate process with time and memory limits.
+
+    Args:
+        target: Module-level function to run (must be picklable)
+        args: Positional arguments for target
+        timeout: Wall-clock limit in seconds (None for no limit)
+        memory_limit_mb: Address-space limit in MB (None for no limit;
+                         ignored on platforms without the resource module)
+
+    Returns:
+        Whatever target returns
+
+    Raises:
+        SandboxError: If the worker times out, crashes or raises
+    """
+    parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=_worker_main,
+        args=(child_conn, target, args, memory_limit_mb),
+        daemon=True
+    )
+    process.start()
+    child_conn.close()
+
+    try:
+        # Wait for the result rather than the exit, so large results
+        # cannot deadlock on a full pipe
+        if not parent_conn.poll(timeout):
+            raise SandboxError(f"timed out after {timeout}s")
+
+        try:
+            status, payload = parent_conn.recv()
+        except EOFError:
+            process.join()
+            raise SandboxError(f"worker crashed (exit code {process.exitcode})")
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        parent_conn.close()
+
+    if status != "ok":
+        raise SandboxError(payload)
+
+    return payload
@@ -0,0 +1,202 @@
+"""
+RAG Preprocessor - Cost-Aware Scheduling Utilities
+Estimates per-file extraction cost and orders files longest-first (LPT).
+
+A file's cost is predicted from its size, type and page/sheet count using
+per-type priors, scaled by how long files of that type actually took in
+past runs. Files seen before with the same size and mtime reuse their
+recorded timing. Dispatching the most expensive files first keeps a giant
+PDF from becoming the long tail of a parallel run.
+"""
+
+import heapq
+import json
+import os
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .file_detector import detect_file_type
+
+
+TIMINGS_VERSION = 1
+
+# Prior cost model per file type: fixed overhead, per-MB and per-unit seconds.
+# Units are pages for PDF and sheets for Excel.
+DEFAULT_COSTS = {
+    "pdf": {"overhead": 0.02, "per_mb": 0.2, "per_unit": 0.03},
+    "excel": {"overhead": 0.1, "per_mb": 2.0, "per_unit": 0.02},
+    "markdown": {"overhead": 0.001, "per_mb": 0.5, "per_unit": 0.0},
+    "json": {"overhead": 0.001, "per_mb": 0.5, "per_unit": 0.0},
+    "html": {"overhead": 0.002, "per_mb": 1.0, "per_unit": 0.0},
+    "tabular": {"overhead": 0.05, "per_mb": 1.5, "per_unit": 0.0},
+}
+FALLBACK_COST = {"overhead": 0.01, "per_mb": 1.0, "per_unit": 0.0}
+
+# History entries kept per file type when fitting scale factors
+MAX_HISTORY_PER_TYPE = 500
+
+
+def count_units(file_path: str, file_type: Optional[str]) -> int:
+    """
+    Count pages (PDF) or sheets (Excel) cheaply, without extracting content.
+
+    Returns:
+        Unit count, or 0 if unknown
+    """
+    try:
+        if file_type == "pdf":
+            import fitz
+            with fitz.open(file_path) as doc:
+                return doc.page_count
+
+        if file_type == "excel" and zipfile.is_zipfile(file_path):
+            with zipfile.ZipFile(file_path) as archive:
+                return sum(
+                    1 for name in archive.namelist()
+                    if name.startswith("xl/worksheets/") and name.endswith(".xml")
+                )
+    except Exception:
+        pass
+
+    return 0
+
+
+def describe_file(file_path: str) -> Dict[str, Any]:
+    """
+    Collect the features the cost model uses for one file.
+    """
+    stat = os.stat(file_path)
+    file_type = detect_file_type(file_path)
+    return {
+        "file_type": file_type,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "units": count_units(file_path, file_type)
+    }
+
+
+def prior_cost(features: Dict[str, Any]) -> float:
+    """
+    Predict extraction seconds from the per-type prior alone.
+    """
+    cost = DEFAULT_COSTS.get(features["file_type"], FALLBACK_COST)
+    return (
+        cost["overhead"]
+        + cost["per_mb"] * features["size"] / (1024 * 1024)
+        + cost["per_unit"] * features["units"]
+    )
+
+
+class CostModel:
+    """
+    Per-file cost estimator backed by a persisted timing history.
+    - Exact history hit (same path, size and mtime) reuses the measured time
+    - Otherwise the prior is scaled by the per-type actual/prior ratio
+    - record() adds measured timings; save() persists them as JSON
+    """
+
+    def __init__(self, history_file: Optional[str] = None):
+        self.history_file = Path(history_file) if history_file else None
+        self.history: Dict[str, Dict[str, Any]] = {}
+
+        if self.history_file and self.history_file.exists():
+            try:
+                with open(self.history_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("timings_version") == TIMINGS_VERSION:
+                    self.history = data.get("files", {})
+            except (OSError, json.JSONDecodeError):
+                self.history = {}
+
+        self.scales = self._fit_scales()
+
+    def predict(self, file_path: str, features: Dict[str, Any]) -> float:
+        """
+        Predict extraction seconds for a file.
+
+        Args:
+            file_path: Path to the file (history key)
+            features: Output of describe_file()
+
+        Returns:
+            Predicted seconds
+        """
+        entry = self.history.get(file_path)
+        if entry and entry["size"] == features["size"] and entry["mtime"] == features["mtime"]:
+            return entry["seconds"]
+
+        return prior_cost(features) * self.scales.get(features["file_type"], 1.0)
+
+    def record(self, file_path: str, features: Dict[str, Any], seconds: float) -> None:
+        """
+        Add a measured timing to the history, as its newest entry.
+        """
+        # Re-insert so dict order stays oldest-to-newest for save()
+        self.history.pop(file_path, None)
+        self.history[file_path] = dict(features, seconds=seconds)
+
+    def save(self) -> None:
+        """
+        Persist the timing history, keeping the newest entries per type.
+        """
+        if not self.history_file:
+            return
+
+        by_type: Dict[str, List[str]] = {}
+        for file_path, entry in self.history.items():
+            by_type.setdefault(entry["file_type"] or "unknown", []).append(file_path)
+
+        kept = {}
+        for paths in by_type.values():
+            for file_path in paths[-MAX_HISTORY_PER_TYPE:]:
+                kept[file_path] = self.history[file_path]
+
+        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.history_file.with_name(self.history_file.name + ".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"timings_version": TIMINGS_VERSION, "files": kept}, f, ensure_ascii=False)
+        os.replace(tmp, self.history_file)
+
+    def _fit_scales(self) -> Dict[str, float]:
+        """
+        Fit one actual/prior ratio per file type from the history.
+        """
+        actual: Dict[str, float] = {}
+        predicted: Dict[str, float] = {}
+
+        for entry in self.history.values():
+            file_type = entry["file_type"]
+            actual[file_type] = actual.get(file_type, 0.0) + entry["seconds"]
+            predicted[file_type] = predicted.get(file_type, 0.0) + prior_cost(entry)
+
+        return {
+            file_type: actual[file_type] / predicted[file_type]
+            for file_type in actual
+            if predicted[file_type] > 0
+        }
+
+
+def schedule_lpt(files: List[str], predictions: Dict[str, float]) -> List[str]:
+    """
+    Order files longest-predicted-first; ties keep discovery order.
+    """
+    order = {file_path: position for position, file_path in enumerate(files)}
+    return sorted(files, key=lambda file_path: (-predictions[file_path], order[file_path]))
+
+
+def simulate_makespan(durations: List[float], workers: int) -> float:
+    """
+    Makespan of dispatching durations in order to the first free worker.
+
+    Args:
+        durations: Per-file seconds in dispatch order
+        workers: Number of parallel workers
+
+    Returns:
+        Seconds until the last worker finishes
+    """
+    finish_times = [0.0] * max(1, workers)
+    for duration in durations:
+        heapq.heapreplace(finish_times, finish_times[0] + duration)
+    return max(finish_times)
@@ -0,0 +1,141 @@
+"""
+RAG Preprocessor - Sharded Output Utilities
+Writes the knowledge base as size-balanced JSONL shards plus a small index.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from .compact_chunks import json_default
+
+
+SHARD_FILENAME_TEMPLATE = "knowledge_base.shard-{index:05d}-of-{count:05d}.jsonl"
+SHARD_FILENAME_GLOB = "knowledge_base.shard-*.jsonl"
+SHARD_INDEX_FILENAME = "knowledge_base.shards.json"
+
+
+def _shard_boundaries(line_sizes: List[int], num_shards: int) -> List[int]:
+    """
+    Compute contiguous shard start positions with roughly equal byte sizes.
+
+    A new shard starts once the running byte total reaches the next multiple
+    of total_bytes / num_shards. Never produces empty shards.
+    """
+    total_bytes = sum(line_sizes)
+    num_shards = max(1, min(num_shards, len(line_sizes)))
+    target = total_bytes / num_shards
+
+    starts = [0]
+    running = 0
+    for position, size in enumerate(line_sizes):
+        remaining_shards = num_shards - len(starts)
+        remaining_lines = len(line_sizes) - position
+        if remaining_shards > 0 and position > starts[-1] and (
+            running >= target * len(starts) or remaining_lines <= remaining_shards
+        ):
+            starts.append(position)
+        running += size
+
+    return starts
+
+
+def write_shards(
+    chunks: List[Dict[str, Any]],
+    output_dir: str,
+    num_shards: int,
+    metadata: Dict[str, Any]
+) -> Tuple[Path, List[str], List[Tuple[int, int, int]]]:
+    """
+    Write chunks as N size-balanced JSONL shards and an index file.
+
+    Shards hold contiguous runs of chunks in pipeline order, one JSON object
+    per line, so a consumer only has to read the shards it was assigned.
+
+    Args:
+        chunks: Chunk dicts in pipeline order
+        output_dir: Directory for shard and index files
+        num_shards: Requested number of shards
+        metadata: Knowledge base metadata to store in the index
+
+    Returns:
+        Tuple of (shard index path, shard file names, per-chunk
+        (shard_number, offset, length) entries for the offset index)
+    """
+    output_path = Path(output_dir)
+
+    # Remove shards of a previous run, which may have used a different count
+    for stale_shard in output_path.glob(SHARD_FILENAME_GLOB):
+        stale_shard.unlink()
+
+    lines = [
+        (json.dumps(chunk, ensure_ascii=False, default=json_default) + "\n").encode('utf-8')
+        for chunk in chunks
+    ]
+
+    starts = _shard_boundaries([len(line) for line in lines], num_shards) if lines else []
+    ends = starts[1:] + [len(lines)]
+
+    shards = []
+    entries = []
+    for shard_idx, (start, end) in enumerate(zip(starts, ends)):
+        shard_file = SHARD_FILENAME_TEMPLATE.format(index=shard_idx, count=len(starts))
+        digest = hashlib.sha256()
+        byte_size = 0
+
+        with open(output_path / shard_file, 'wb') as f:
+            for line in lines[start:end]:
+                # The newline is not part of the indexed record
+                entries.append((shard_idx, byte_size, len(line) - 1))
+                f.write(line)
+                digest.update(line)
+                byte_size += len(line)
+
+        shards.append({
+            "file": shard_file,
+            "chunk_count": end - start,
+            "chunk_range": [start, end],
+            "first_chunk_id": chunks[start]["chunk_id"],
+            "last_chunk_id": chunks[end - 1]["chunk_id"],
+            "bytes": byte_size,
+            "sha256": digest.hexdigest()
+        })
+
+    index = {
+        "metadata": metadata,
+        "shard_count": len(shards),
+        "shards": shards
+    }
+
+    index_file = output_path / SHARD_INDEX_FILENAME
+    with open(index_file, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+
+    return index_file, [shard["file"] for shard in shards], entries
+
+
+def iter_shard_chunks(index_file: str, shard_indices: List[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate chunks from selected shards of a sharded knowledge base.
+
+    Args:
+        index_file: Path to knowledge_base.shards.json
+        shard_indices: Shards to read (default: all)
+
+    Yields:
+        Chunk dicts
+    """
+    index_path = Path(index_file)
+
+    with open(index_path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+
+    shards = index["shards"]
+    if shard_indices is not None:
+        shards = [shards[i] for i in shard_indices]
+
+    for shard in shards:
+        with open(index_path.parent / shard["file"], 'r', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
@@ -0,0 +1,470 @@
+"""
+RAG Preprocessor - Compressed Vector Store
+Memory-mapped, quantized storage of the knowledge base embeddings.
+
+Two code formats are supported:
+    int8  per-dimension symmetric scalar quantization (4x smaller than float32)
+    pq    product quantization: each vector is split into subvectors and
+          each subvector stored as the id of its nearest of 256 centroids
+          (dim * 4 / subvectors times smaller)
+
+Searches scan the codes block by block with NumPy (inner product, so
+L2-normalized vectors give cosine similarity), then re-rank the best
+candidates on the exact float32 vectors, which stay on disk and are
+memory-mapped too; only the candidate rows are read.
+
+Layout of a store directory:
+    store.json      format, dimensions and the exact vectors file
+    codes.npy       int8 (N x dim) or uint8 (N x subvectors, column-major) codes
+    scales.npy      int8: per-dimension scale
+    codebooks.npy   pq: (subvectors x 256 x subvector_dim) centroids
+    ids.npy         chunk ids, one per row (row i is chunk i)
+
+Example:
+    write_vector_store("out/knowledge_base.vectors", vectors, chunk_ids, "pq",
+                       exact_file="out/knowledge_base.embeddings.npy")
+    store = VectorStore("out/knowledge_base.vectors")
+    rows, scores = store.search(query_vector, k=10)
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+STORE_VERSION = 1
+STORE_METHODS = ("int8", "pq")
+
+# Rows per NumPy call when encoding and scanning; small enough that the
+# float32 copy of an int8 block stays in cache
+SCAN_BLOCK_ROWS = 1024
+
+# Candidates re-ranked on exact vectors, per requested result
+RERANK_FACTOR = 10
+
+# Product quantization
+PQ_CENTROIDS = 256
+PQ_SUBVECTOR_DIM = 8
+PQ_TRAIN_SAMPLE = 64 * PQ_CENTROIDS
+PQ_ITERATIONS = 20
+PQ_SEED = 0
+
+
+def default_subvectors(dim: int) -> int:
+    """
+    Get the default number of PQ subvectors: PQ_SUBVECTOR_DIM dimensions each.
+
+    Raises:
+        ValueError: If dim is not a multiple of PQ_SUBVECTOR_DIM
+    """
+    if dim % PQ_SUBVECTOR_DIM:
+        raise ValueError(f"Cannot pick PQ subvectors for dim {dim} (not a multiple of {PQ_SUBVECTOR_DIM}); pass a divisor of {dim}")
+    return dim // PQ_SUBVECTOR_DIM
+
+
+def check_store_config(method: str, dim: int, subvectors: Optional[int] = None) -> Optional[int]:
+    """
+    Validate a vector store config for vectors of a given dimension.
+
+    Args:
+        method: 'int8' or 'pq'
+        dim: Vector dimension
+        subvectors: PQ subvectors (None: one per PQ_SUBVECTOR_DIM dimensions)
+
+    Returns:
+        PQ subvectors to use (None for int8)
+
+    Raises:
+        ValueError: If the method is unknown or the subvectors don't fit dim
+    """
+    if method not in STORE_METHODS:
+        raise ValueError(f"Unknown vector store method '{method}' (choose from {', '.join(STORE_METHODS)})")
+    if method != "pq":
+        return None
+
+    if subvectors is None:
+        return default_subvectors(dim)
+    if subvectors < 1 or dim % subvectors:
+        raise ValueError(f"PQ subvectors ({subvectors}) must be a positive divisor of the vector dimension ({dim})")
+    return subvectors
+
+
+def int8_scales(vectors: np.ndarray) -> np.ndarray:
+    """
+    Get one symmetric int8 scale per dimension (max |value| / 127), block by block.
+    """
+    peak = np.zeros(vectors.shape[1], dtype=np.float32)
+    for start in range(0, len(vectors), SCAN_BLOCK_ROWS):
+        block = np.asarray(vectors[start:start + SCAN_BLOCK_ROWS], dtype=np.float32)
+        np.maximum(peak, np.abs(block).max(axis=0), out=peak)
+
+    scales = peak / 127.0
+    scales[scales == 0] = 1.0
+    return scales
+
+
+def encode_int8(vectors: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """
+    Scalar-quantize vectors; vectors ~= codes * scales.
+    """
+    return np.clip(np.rint(np.asarray(vectors, dtype=np.float32) / scales), -127, 127).astype(np.int8)
+
+
+def train_pq(vectors: np.ndarray, subvectors: int, seed: int = PQ_SEED) -> np.ndarray:
+    """
+    Train one k-means codebook per subvector (Lloyd's algorithm on a sample).
+
+    Args:
+        vectors: Training vectors (N x dim)
+        subvectors: Number of subvectors; must divide dim
+        seed: Random seed for sampling and initialization
+
+    Returns:
+        Codebooks (subvectors x centroids x subvector_dim), centroids <= 256
+    """
+    count, dim = vectors.shape
+    if dim % subvectors:
+        raise ValueError(f"PQ subvectors ({subvectors}) must divide the vector dimension ({dim})")
+
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(count, min(count, PQ_TRAIN_SAMPLE), replace=False))
+    sample = np.asarray(vectors[rows], dtype=np.float32)
+    centroids = min(PQ_CENTROIDS, len(sample))
+    sub_dim = dim // subvectors
+
+    codebooks = np.empty((subvectors, centroids, sub_dim), dtype=np.float32)
+    for m in range(subvectors):
+        data = sample[:, m * sub_dim:(m + 1) * sub_dim]
+        centers = data[rng.choice(len(data), centroids, replace=False)].copy()
+
+        for _ in range(PQ_ITERATIONS):
+            assignment = _nearest(data, centers)
+            sums = np.zeros_like(centers)
+            for d in range(sub_dim):
+                sums[:, d] = np.bincount(assignment, weights=data[:, d], minlength=centroids)
+            sizes = np.bincount(assignment, minlength=centroids)
+            filled = sizes > 0
+            centers[filled] = sums[filled] / sizes[filled, None]
+
+        codebooks[m] = centers
+
+    return codebooks
+
+
+def encode_pq(vectors: np.ndarray, codebooks: np.ndarray) -> np.ndarray:
+    """
+    Encode vectors as the nearest centroid id per subvector.
+
+    Returns:
+        uint8 codes (N x subvectors)
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    subvectors, _, sub_dim = codebooks.shape
+    codes = np.empty((len(vectors), subvectors), dtype=np.uint8)
+
+    for m in range(subvectors):
+        codes[:, m] = _nearest(vectors[:, m * sub_dim:(m + 1) * sub_dim], codebooks[m])
+
+    return codes
+
+
+def _nearest(data: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    # argmin ||x - c||^2 = argmin (||c||^2 - 2 x.c)
+    distances = (centers * centers).sum(axis=1) - 2.0 * data @ centers.T
+    return distances.argmin(axis=1)
+
+
+def write_vector_store(
+    store_dir: str,
+    vectors: np.ndarray,
+    chunk_ids: Sequence[str],
+    method: str = "int8",
+    subvectors: Optional[int] = None,
+    exact_file: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Quantize vectors and write a store directory.
+    Vectors are encoded SCAN_BLOCK_ROWS at a time straight into the
+    memory-mapped codes file, so a memory-mapped input is never fully loaded.
+
+    Args:
+        store_dir: Directory to write (created if needed)
+        vectors: float32 vectors (array or memory map), one row per chunk
+        chunk_ids: Chunk id of each row
+        method: 'int8' or 'pq'
+        subvectors: PQ subvectors (default: one per PQ_SUBVECTOR_DIM dimensions)
+        exact_file: float32 .npy file used for re-ranking (stored relative to store_dir)
+
+    Returns:
+        Store stats: method, count, dim, code_bytes and float32_bytes
+
+    Raises:
+        ValueError: If the config doesn't fit the vectors or they don't match chunk_ids
+    """
+    if len(vectors.shape) != 2 or len(vectors) != len(chunk_ids):
+        raise ValueError(f"Expected one vector per chunk, got shape {vectors.shape} for {len(chunk_ids)} chunks")
+
+    count, dim = vectors.shape
+    subvectors = check_store_config(method, dim, subvectors)
+    path = Path(store_dir)
+    path.mkdir(parents=True, exist_ok=True)
+
+    meta: Dict[str, Any] = {"store_version": STORE_VERSION, "method": method, "count": count, "dim": dim}
+    if method == "int8":
+        scales = int8_scales(vectors)
+        np.save(path / "scales.npy", scales)
+        width, dtype = dim, np.int8
+        fortran_order = False
+
+        def encode(block):
+            return encode_int8(block, scales)
+    else:
+        if count:
+            codebooks = train_pq(vectors, subvectors)
+        else:
+            codebooks = np.zeros((subvectors, 1, dim // subvectors), dtype=np.float32)
+        np.save(path / "codebooks.npy", codebooks)
+        meta["subvectors"] = subvectors
+        meta["centroids"] = codebooks.shape[1]
+        width, dtype = subvectors, np.uint8
+        # One contiguous column per subvector, for per-subvector table lookups
+        fortran_order = True
+
+        def encode(block):
+            return encode_pq(block, codebooks)
+
+    if count:
+        codes = np.lib.format.open_memmap(
+            path / "codes.npy", mode='w+', dtype=dtype, shape=(count, width), fortran_order=fortran_order
+        )
+        for start in range(0, count, SCAN_BLOCK_ROWS):
+            codes[start:start + SCAN_BLOCK_ROWS] = encode(vectors[start:start + SCAN_BLOCK_ROWS])
+        codes.flush()
+        del codes
+    else:
+        np.save(path / "codes.npy", np.empty((0, width), dtype=dtype))
+
+    np.save(path / "ids.npy", np.array(list(chunk_ids), dtype="S"))
+
+    if exact_file:
+        meta["exact_file"] = Path(os.path.relpath(exact_file, path)).as_posix()
+
+    with open(path / "store.json", 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    return {
+        "method": method,
+        "count": count,
+        "dim": dim,
+        "store_dir": str(path),
+        "code_bytes": count * width * np.dtype(dtype).itemsize,
+        "float32_bytes": count * dim * 4
+    }
+
+
+class VectorStore:
+    """
+    Read-only, memory-mapped quantized vector store.
+    - Codes and exact vectors are mapped, not loaded; scans touch codes only
+    - search() scores codes in SCAN_BLOCK_ROWS blocks, then re-ranks on exact vectors
+    """
+
+    def __init__(self, store_dir: str):
+        self.path = Path(store_dir)
+        with open(self.path / "store.json", 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+
+        self.method = self.meta["method"]
+        self.dim = self.meta["dim"]
+        self.codes = np.load(self.path / "codes.npy", mmap_mode='r')
+        self.ids = np.load(self.path / "ids.npy", mmap_mode='r')
+
+        if self.method == "int8":
+            self.scales = np.load(self.path / "scales.npy")
+        else:
+            self.codebooks = np.load(self.path / "codebooks.npy")
+
+        exact_file = self.meta.get("exact_file")
+        self.exact = None
+        if exact_file and (self.path / exact_file).exists():
+            self.exact = np.load(self.path / exact_file, mmap_mode='r')
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def memory_bytes(self) -> int:
+        """
+        Get the bytes a full scan reads: codes plus scales or codebooks.
+        """
+        extra = self.scales.nbytes if self.method == "int8" else self.codebooks.nbytes
+        return int(self.codes.nbytes + extra)
+
+    def chunk_id(self, row: int) -> str:
+        return self.ids[row].decode('ascii')
+
+    def approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """
+        Score every row against a query on the compressed codes (inner product).
+        """
+        query = np.asarray(query, dtype=np.float32)
+        scores = np.empty(len(self.codes), dtype=np.float32)
+
+        if self.method == "int8":
+            # q . (codes * scales) == codes . (q * scales)
+            scaled = query * self.scales
+            for start in range(0, len(self.codes), SCAN_BLOCK_ROWS):
+                block = self.codes[start:start + SCAN_BLOCK_ROWS]
+                scores[start:start + len(block)] = block.astype(np.float32) @ scaled
+        else:
+            # Asymmetric distance: one lookup table of q . centroid per subvector,
+            # summed over the (contiguous) code columns
+            subvectors, _, sub_dim = self.codebooks.shape
+            table = np.einsum('mkd,md->mk', self.codebooks, query.reshape(subvectors, sub_dim))
+            scores[:] = 0.0
+            for m in range(subvectors):
+                scores += table[m].take(self.codes[:, m])
+
+        return scores
+
+    def search(self, query: np.ndarray, k: int = 10, rerank: bool = True, candidates: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k rows with the highest inner product with the query.
+
+        Args:
+            query: float32 query vector
+            k: Number of results
+            rerank: Re-rank candidates on the exact vectors (if available)
+            candidates: Candidates kept from the code scan (default: k * RERANK_FACTOR)
+
+        Returns:
+            Tuple of (row indices, scores), best first
+        """
+        if not len(self.codes):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = self.approximate_scores(query)
+        use_exact = rerank and self.exact is not None
+        keep = min(len(scores), (candidates or k * RERANK_FACTOR) if use_exact else k)
+        rows = _top(scores, keep)
+
+        if use_exact:
+            # Sorted rows keep the memory-mapped reads sequential
+            rows = np.sort(rows)
+            scores = np.asarray(self.exact[rows], dtype=np.float32) @ np.asarray(query, dtype=np.float32)
+            best = _top(scores, min(k, len(rows)))
+            return rows[best], scores[best]
+
+        rows = rows[:k]
+        return rows, scores[rows]
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Get the indices of the k largest scores, best first.
+    """
+    if k >= len(scores):
+        return np.argsort(-scores)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def synthetic_vectors(count: int, dim: int = 384, clusters: int = 1000, seed: int = 0) -> np.ndarray:
+    """
+    Generate clustered, L2-normalized float32 vectors for benchmarking.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, count)] + 0.5 * rng.normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def sample_queries(vectors: np.ndarray, count: int, noise: float = 0.1, seed: int = 1) -> np.ndarray:
+    """
+    Build queries as perturbed copies of random stored vectors (L2-normalized).
+    """
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(len(vectors), min(count, len(vectors)), replace=False))
+    queries = np.asarray(vectors[rows], dtype=np.float32)
+    queries = queries + noise * rng.normal(size=queries.shape).astype(np.float32) / np.sqrt(queries.shape[1])
+    norms = np.linalg.norm(queries, axis=1, keepdims=True)
+    return queries / np.where(norms == 0, 1.0, norms)
+
+
+def benchmark_vector_store(
+    vectors_file: str,
+    queries: np.ndarray,
+    work_dir: str,
+    k: int = 10,
+    methods: Sequence[str] = STORE_METHODS,
+    subvectors: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Compare quantized stores against exact float32 search.
+
+    Recall@k is the overlap between a store's top k and the exact float32
+    top k, averaged over queries; it is reported with and without re-rank.
+
+    Args:
+        vectors_file: float32 .npy vectors (N x dim); memory-mapped, not copied
+        queries: float32 query vectors (Q x dim)
+        work_dir: Directory for the stores
+        k: Results per query
+        methods: Store methods to benchmark
+        subvectors: PQ subvectors
+
+    Returns:
+        One dict per configuration (float32, then each method without and with
+        re-rank) with memory_bytes, build_seconds, qps and recall@k
+    """
+    work_path = Path(work_dir)
+    work_path.mkdir(parents=True, exist_ok=True)
+    exact = np.load(vectors_file, mmap_mode='r')
+    queries = np.asarray(queries, dtype=np.float32)
+
+    def exact_search(query):
+        scores = np.empty(len(exact), dtype=np.float32)
+        for start in range(0, len(exact), SCAN_BLOCK_ROWS):
+            block = exact[start:start + SCAN_BLOCK_ROWS]
+            scores[start:start + len(block)] = block @ query
+        return _top(scores, k)
+
+    started = time.perf_counter()
+    truth = [set(exact_search(query).tolist()) for query in queries]
+    exact_seconds = time.perf_counter() - started
+
+    results = [{
+        "method": "float32",
+        "rerank": False,
+        "memory_bytes": int(exact.nbytes),
+        "build_seconds": 0.0,
+        "qps": round(len(queries) / exact_seconds, 1) if exact_seconds else 0.0,
+        f"recall@{k}": 1.0
+    }]
+
+    ids = [str(i) for i in range(len(exact))]
+    for method in methods:
+        started = time.perf_counter()
+        write_vector_store(work_path / method, exact, ids, method, subvectors, vectors_file)
+        build_seconds = time.perf_counter() - started
+        store = VectorStore(work_path / method)
+
+        for rerank in (False, True):
+            started = time.perf_counter()
+            found = [store.search(query, k, rerank=rerank)[0] for query in queries]
+            seconds = time.perf_counter() - started
+
+            recall = np.mean([len(expected & set(rows.tolist())) / k for expected, rows in zip(truth, found)])
+            results.append({
+                "method": method,
+                "rerank": rerank,
+                "memory_bytes": store.memory_bytes(),
+                "build_seconds": round(build_seconds, 3),
+                "qps": round(len(queries) / seconds, 1) if seconds else 0.0,
+                f"recall@{k}": round(float(recall), 4)
+            })
+
+    return results
@@ -7,6 +7,7 @@ Usage:
     python content-image-workflow.py --topic "hearing aids"
     python content-image-workflow.py --html page.html
     python content-image-workflow.py --interactive
+    python content-image-workflow.py --html page.html --rpm 20 --concurrency 8
 """
 
 import os
@@ -18,7 +19,7 @@ from datetime import datetime
 
 # Import the nano_banana module
 sys.path.insert(0, str(Path(__file__).parent))
-from nano_banana import generate_image, get_api_key
+from nano_banana import CONFIG, generate_image, get_api_key, run_batch
 
 # Predefined image prompts for hearing care topics
 HEARING_CARE_PROMPTS = {
@@ -142,20 +143,22 @@ def extract_topics_from_html(html_path: str) -> list:
 
 def generate_for_topic(topic: str, output_dir: str = None) -> list:
     """Generate all images for a specific topic."""
-    if topic not in HEARING_CARE_PROMPTS:
-        print(f"❌ Unknown topic: {topic}")
-        print(f"Available topics: {', '.join(HEARING_CARE_PROMPTS.keys())}")
-        return []
+    return generate_for_topics([topic], output_dir)
 
-    prompts = HEARING_CARE_PROMPTS[topic]
-    results = []
 
-    print(f"\n🎨 Generating {len(prompts)} image(s) for topic: {topic}")
+def generate_for_topics(topics: list, output_dir: str = None) -> list:
+    """Generate the images for several topics as one concurrent, rate-limited batch."""
+    items = []
+    for topic in topics:
+        if topic not in HEARING_CARE_PROMPTS:
+            print(f"❌ Unknown topic: {topic}")
+            print(f"Available topics: {', '.join(HEARING_CARE_PROMPTS.keys())}")
+            continue
 
-    for i, item in enumerate(prompts, 1):
-        print(f"\n--- Image {i}/{len(prompts)} ---")
+        prompts = HEARING_CARE_PROMPTS[topic]
+        print(f"\n🎨 Generating {len(prompts)} image(s) for topic: {topic}")
 
-        try:
+        for item in prompts:
             if output_dir:
                 # Create topic subfolder
                 topic_dir = Path(output_dir) / topic.replace(' ', '-')
@@ -163,19 +166,12 @@ def generate_for_topic(topic: str, output_dir: str = None) -> list:
                 output_path = str(topic_dir / item['filename'])
             else:
                 output_path = item['filename']
+            items.append((item, {'prompt': item['prompt'], 'filename': output_path}))
 
-            result = generate_image(item['prompt'], output_path)
+    results = run_batch([job for _, job in items])
+    for (item, _), result in zip(items, results):
+        if 'error' not in result:
             result['alt'] = item.get('alt', '')
-            results.append(result)
-
-            # Rate limiting
-            if i < len(prompts):
-                import time
-                time.sleep(2)
-
-        except Exception as e:
-            print(f"❌ Failed: {e}")
-            results.append({'error': str(e), 'prompt': item['prompt']})
 
     return results
 
@@ -209,8 +205,7 @@ Commands:
             break
 
         if choice == 'all':
-            for topic in topics:
-                generate_for_topic(topic)
+            generate_for_topics(topics)
             continue
 
         if choice == 'custom':
@@ -249,9 +244,24 @@ def main():
                         help='Interactive mode')
     parser.add_argument('--list', action='store_true',
                         help='List available topics')
+    parser.add_argument('--rpm', type=float, default=CONFIG['requests_per_minute'],
+                        help=f"Requests per minute, 0 for unlimited (default: {CONFIG['requests_per_minute']})")
+    parser.add_argument('--concurrency', type=int, default=CONFIG['max_concurrency'],
+                        help=f"Requests in flight at once (default: {CONFIG['max_concurrency']})")
+    parser.add_argument('--api-base', metavar='URL', help='generateContent endpoint base URL (e.g. a local mock)')
 
     args = parser.parse_args()
 
+    if args.rpm < 0:
+        parser.error('--rpm must be 0 (unlimited) or positive')
+    if args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+
+    CONFIG['requests_per_minute'] = args.rpm
+    CONFIG['max_concurrency'] = args.concurrency
+    if args.api_base:
+        CONFIG['api_base'] = args.api_base.rstrip('/')
+
     # Check API key
     if not get_api_key():
         print("\n❌ ERROR: No API key found!")
@@ -277,8 +287,7 @@ def main():
             return
 
         print(f"Found topics: {', '.join(topics)}")
-        for topic in topics:
-            generate_for_topic(topic, args.output)
+        generate_for_topics(topics, args.output)
         return
 
     if args.topic:
@@ -6,14 +6,22 @@ Google Gemini Image Generation for VS Code + Claude Code Workflow
 Usage:
     python nano_banana.py "Your image prompt"
     python nano_banana.py --batch prompts.json
+    python nano_banana.py --batch prompts.json --rpm 20 --concurrency 8
     python nano_banana.py --setup
+
+Batches run concurrently (--concurrency) under a requests-per-minute token
+bucket (--rpm). --api-base (or NANO_BANANA_API_BASE) points the REST client
+at another generateContent endpoint, e.g. a local mock.
 """
 
 import os
 import sys
 import json
+import time
 import base64
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -26,11 +34,17 @@ except ImportError:
     import urllib.request
     import urllib.error
 
+DEFAULT_API_BASE = 'https://generativelanguage.googleapis.com/v1beta'
+
 # Configuration
 CONFIG = {
     'model': 'gemini-2.0-flash-exp',  # or 'gemini-2.5-flash-preview-image-generation'
     'output_dir': './assets/img/generated',
     'aspect_ratio': '16:9',
+    'api_base': os.environ.get('NANO_BANANA_API_BASE', DEFAULT_API_BASE),
+    'requests_per_minute': 30,  # batch rate limit (0 = unlimited)
+    'burst': 1,                 # requests the bucket may release back to back
+    'max_concurrency': 4,       # batch requests in flight at once
 }
 
 
@@ -95,10 +109,10 @@ def generate_with_sdk(prompt: str, output_name: str = None) -> dict:
 
     # Save image
     output_dir = Path(CONFIG['output_dir'])
-    output_dir.mkdir(parents=True, exist_ok=True)
 
     filename = output_name or f"nano-banana-{datetime.now().strftime('%Y%m%d-%H%M%S')}.png"
     output_path = output_dir / filename
+    output_path.parent.mkdir(parents=True, exist_ok=True)
 
     image_bytes = base64.b64decode(image_data) if isinstance(image_data, str) else image_data
     output_path.write_bytes(image_bytes)
@@ -124,7 +138,7 @@ def generate_with_rest(prompt: str, output_name: str = None) -> dict:
     print(f"\n🍌 Generating with Nano Banana ({CONFIG['model']})...")
     print(f"📝 Prompt: \"{prompt[:100]}{'...' if len(prompt) > 100 else ''}\"")
 
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{CONFIG['model']}:generateContent?key={api_key}"
+    url = f"{CONFIG['api_base']}/models/{CONFIG['model']}:generateContent?key={api_key}"
 
     payload = json.dumps({
         "contents": [{
@@ -175,10 +189,10 @@ def generate_with_rest(prompt: str, output_name: str = None) -> dict:
 
     # Save image
     output_dir = Path(CONFIG['output_dir'])
-    output_dir.mkdir(parents=True, exist_ok=True)
 
     filename = output_name or f"nano-banana-{datetime.now().strftime('%Y%m%d-%H%M%S')}.png"
     output_path = output_dir / filename
+    output_path.parent.mkdir(parents=True, exist_ok=True)
 
     image_bytes = base64.b64decode(image_data)
     output_path.write_bytes(image_bytes)
@@ -197,38 +211,87 @@ def generate_with_rest(prompt: str, output_name: str = None) -> dict:
 
 def generate_image(prompt: str, output_name: str = None) -> dict:
     """Generate image using best available method."""
-    if HAS_SDK:
+    # The SDK always talks to Google; a custom endpoint needs the REST client
+    if HAS_SDK and CONFIG['api_base'] == DEFAULT_API_BASE:
         return generate_with_sdk(prompt, output_name)
     else:
         return generate_with_rest(prompt, output_name)
 
 
-def batch_generate(prompts_file: str) -> list:
-    """Generate multiple images from a JSON file."""
+class TokenBucket:
+    """Thread-safe token bucket: refills at requests_per_minute, holds at most `capacity` tokens."""
+
+    def __init__(self, requests_per_minute: float, capacity: int = 1):
+        if requests_per_minute <= 0:
+            raise ValueError(f"requests_per_minute must be positive, got {requests_per_minute}")
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def run_batch(jobs: list, requests_per_minute: float = None, max_concurrency: int = None,
+              generate=None) -> list:
+    """
+    Generate images concurrently under a rate limit.
+
+    jobs is a list of {'prompt', 'filename'} dicts. At most max_concurrency
+    requests are in flight, and requests start no faster than the
+    requests_per_minute token bucket allows (defaults from CONFIG).
+    Returns one result per job, in job order; failures are
+    {'error', 'prompt'} dicts.
+    """
+    requests_per_minute = CONFIG['requests_per_minute'] if requests_per_minute is None else requests_per_minute
+    max_concurrency = max_concurrency or CONFIG['max_concurrency']
+    generate = generate or generate_image
+    bucket = TokenBucket(requests_per_minute, CONFIG['burst']) if requests_per_minute else None
+
+    def run(i, job):
+        if bucket:
+            bucket.acquire()
+        try:
+            return generate(job['prompt'], job.get('filename'))
+        except Exception as e:
+            print(f"❌ Failed [{i}/{len(jobs)}]: {e}")
+            return {'error': str(e), 'prompt': job['prompt']}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+        futures = [pool.submit(run, i, job) for i, job in enumerate(jobs, 1)]
+        return [future.result() for future in futures]
+
+
+def batch_generate(prompts_file: str, requests_per_minute: float = None, max_concurrency: int = None) -> list:
+    """Generate multiple images from a JSON file, concurrently (see run_batch)."""
     with open(prompts_file) as f:
         prompts = json.load(f)
 
-    results = []
+    # Unnamed images get an index, since concurrent calls share a timestamp
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    jobs = []
     for i, item in enumerate(prompts, 1):
-        prompt = item.get('prompt') or item
-        filename = item.get('fileName') or item.get('filename')
+        if isinstance(item, str):
+            item = {'prompt': item}
+        filename = item.get('fileName') or item.get('filename') or f"nano-banana-{stamp}-{i:02d}.png"
+        jobs.append({'prompt': item['prompt'], 'filename': filename})
 
-        print(f"\n{'='*50}")
-        print(f"Image {i}/{len(prompts)}")
+    print(f"\n🍌 Batch: {len(jobs)} image(s), up to {max_concurrency or CONFIG['max_concurrency']} at once, "
+          f"{requests_per_minute if requests_per_minute is not None else CONFIG['requests_per_minute']} requests/min")
 
-        try:
-            result = generate_image(prompt, filename)
-            results.append(result)
-        except Exception as e:
-            print(f"❌ Failed: {e}")
-            results.append({'error': str(e), 'prompt': prompt})
-
-        # Rate limiting
-        if i < len(prompts):
-            import time
-            time.sleep(2)
-
-    return results
+    return run_batch(jobs, requests_per_minute, max_concurrency)
 
 
 def show_setup():
@@ -275,9 +338,22 @@ def main():
     parser.add_argument('--batch', metavar='FILE', help='Generate from JSON prompts file')
     parser.add_argument('--output', '-o', metavar='NAME', help='Output filename')
     parser.add_argument('--setup', action='store_true', help='Show setup instructions')
+    parser.add_argument('--rpm', type=float, default=CONFIG['requests_per_minute'],
+                        help=f"Batch requests per minute, 0 for unlimited (default: {CONFIG['requests_per_minute']})")
+    parser.add_argument('--concurrency', type=int, default=CONFIG['max_concurrency'],
+                        help=f"Batch requests in flight at once (default: {CONFIG['max_concurrency']})")
+    parser.add_argument('--api-base', metavar='URL', help='generateContent endpoint base URL (e.g. a local mock)')
 
     args = parser.parse_args()
 
+    if args.rpm < 0:
+        parser.error('--rpm must be 0 (unlimited) or positive')
+    if args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+
+    if args.api_base:
+        CONFIG['api_base'] = args.api_base.rstrip('/')
+
     if args.setup:
         show_setup()
         return
@@ -289,7 +365,7 @@ def main():
         sys.exit(1)
 
     if args.batch:
-        results = batch_generate(args.batch)
+        results = batch_generate(args.batch, args.rpm, args.concurrency)
         print(f"\n📊 Batch complete: {len([r for r in results if 'error' not in r])}/{len(results)} successful")
         return
 